@@ -2,6 +2,12 @@
 """
 Handle background (invisible) tasks for the telescope UI
 
+BackgroundKwds handles keywords and checks the connection and clock.
+
+LagMonitor measures how late the event loop runs a periodic timer
+and reports what the code is doing when the event loop is blocked.
+TUI.Main starts one using startLagMonitor; use getLagMonitor to get it.
+
 History:
 2003-02-27 ROwen    Error messages now go to the log, not stderr.
 2003-03-05 ROwen    Modified to use simplified KeyVariables.
@@ -29,7 +35,11 @@ History:
                     If the clock appears to be keeping UTC or TAI then the clock is assumed to be keeping that time perfectly.
 2015-11-03 ROwen    Replace "== None" with "is None" and "!= None" with "is not None" to modernize the code.
 """
+import collections
+import sys
+import threading
 import time
+import traceback
 import opscore.utility.timer
 import opscore.actor.keyvar
 import RO.Astro.Tm
@@ -39,6 +49,29 @@ import RO.PhysConst
 import TUI.Models
 import TUI.PlaySound
 
+# environment variable: if set, LagMonitor appends a report of each stall to this file
+LagReportEnvVar = "STUI_LAG_REPORT"
+
+# the LagMonitor started by startLagMonitor; None if none
+_lagMonitor = None
+
+def getLagMonitor():
+    """Return the LagMonitor started by startLagMonitor, or None if none
+    """
+    return _lagMonitor
+
+def startLagMonitor(**kargs):
+    """Create and start a LagMonitor that is returned by getLagMonitor,
+    stopping the previous one, if any.
+
+    Keyword arguments are passed to LagMonitor. Return the new LagMonitor.
+    """
+    global _lagMonitor
+    if _lagMonitor is not None:
+        _lagMonitor.stop()
+    _lagMonitor = LagMonitor(**kargs)
+    return _lagMonitor
+
 class BackgroundKwds(object):
     """Processes various keywords that are handled in the background.
     
@@ -198,6 +231,178 @@ class BackgroundKwds(object):
             self.didSetUTCMinusTAI = True
                 
 
+class LagMonitor(object):
+    """Measure event loop lag and report stalls.
+
+    STUI does everything (network I/O, keyword parsing, plotting, image decoding...)
+    in one thread, so code that takes a long time freezes the user interface.
+    This runs a periodic timer in the event loop and measures how late it fires (the lag),
+    keeping statistics and a histogram.
+
+    A watchdog thread checks for stalls: times when the timer is more than stallTime late.
+    During a stall it captures the stack of the main thread, i.e. the code that is blocking
+    the event loop. When the stall ends, the stall is logged using tuiModel.logMsg
+    (with a summary of the stack), the full stack is written to stderr and, if reportPath
+    is specified, a report of the stall is appended to that file.
+
+    To see the data from the Python window:
+        import TUI.BackgroundTasks
+        lagMonitor = TUI.BackgroundTasks.getLagMonitor()
+        print(lagMonitor.getReport())
+        lagMonitor.writeReport(filePath)
+    """
+    # upper edges of the histogram bins (sec); the final bin is for larger lags
+    HistBinEdges = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+
+    def __init__(self,
+        interval = 0.1,
+        stallTime = 0.5,
+        reportPath = None,
+        maxStalls = 100,
+    ):
+        """Create and start a LagMonitor
+
+        Inputs:
+        - interval: interval between timer ticks (sec)
+        - stallTime: report a stall if the timer is this late (sec); if None stalls are not detected
+        - reportPath: path of file to which to append a report of each stall; None if none
+        - maxStalls: maximum number of stalls to remember (for getReport)
+        """
+        self.interval = float(interval)
+        self.stallTime = float(stallTime) if stallTime else None
+        self.reportPath = reportPath
+        self.tuiModel = TUI.Models.getModel("tui")
+
+        self.numSamples = 0
+        self.lagSum = 0.0
+        self.maxLag = 0.0
+        self.histogram = [0] * (len(self.HistBinEdges) + 1)
+        # recent stalls: a collection of (start time, duration (sec), stack as a list of strings)
+        self.stallList = collections.deque(maxlen=maxStalls)
+
+        self._expTime = None # expected time of next tick
+        self._stallData = None # data captured by the watchdog thread: (expected tick time, stack)
+        self._stallLock = threading.Lock()
+        self._mainThreadIdent = threading.current_thread().ident
+        self._tickTimer = opscore.utility.timer.Timer()
+        self._stopEvent = threading.Event()
+        self._scheduleTick()
+
+        if self.stallTime:
+            watchdogThread = threading.Thread(target=self._watchdog, name="LagMonitor")
+            watchdogThread.daemon = True
+            watchdogThread.start()
+
+    def stop(self):
+        """Stop monitoring
+        """
+        self._tickTimer.cancel()
+        self._stopEvent.set()
+
+    @property
+    def meanLag(self):
+        """Mean lag (sec), or None if no data
+        """
+        if not self.numSamples:
+            return None
+        return self.lagSum / self.numSamples
+
+    def getReport(self):
+        """Return a report as a string
+        """
+        lineList = ["Event loop lag: %d samples at %0.2f sec intervals; mean %0.4f sec; max %0.4f sec" % \
+            (self.numSamples, self.interval, self.meanLag or 0.0, self.maxLag)]
+        lineList.append("Histogram:")
+        lowEdge = 0.0
+        for highEdge, count in zip(self.HistBinEdges + (None,), self.histogram):
+            if highEdge is None:
+                lineList.append("  > %5.2f sec: %d" % (lowEdge, count))
+            else:
+                lineList.append("  %5.2f - %5.2f sec: %d" % (lowEdge, highEdge, count))
+                lowEdge = highEdge
+        lineList.append("%d recent stalls of more than %s sec" % (len(self.stallList), self.stallTime))
+        for stallData in self.stallList:
+            lineList.append("")
+            lineList.append(self._formatStall(*stallData))
+        return "\n".join(lineList)
+
+    def writeReport(self, filePath):
+        """Write a report (see getReport) to a file
+        """
+        with open(filePath, "w") as outFile:
+            outFile.write(self.getReport() + "\n")
+
+    def _formatStall(self, startTime, duration, stackList):
+        """Format a stall as a string
+        """
+        return "Stall of %0.2f sec at %s; stack when stalled:\n%s" % \
+            (duration, time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(startTime)), "".join(stackList))
+
+    def _scheduleTick(self):
+        self._expTime = time.time() + self.interval
+        self._tickTimer.start(self.interval, self._tick)
+
+    def _tick(self):
+        """Timer tick: record the lag and report a stall, if the watchdog detected one
+        """
+        lag = max(0.0, time.time() - self._expTime)
+        self.numSamples += 1
+        self.lagSum += lag
+        self.maxLag = max(self.maxLag, lag)
+        binInd = len(self.HistBinEdges)
+        for ind, highEdge in enumerate(self.HistBinEdges):
+            if lag <= highEdge:
+                binInd = ind
+                break
+        self.histogram[binInd] += 1
+
+        with self._stallLock:
+            stallData = self._stallData
+            self._stallData = None
+        if stallData:
+            self._reportStall(stallData[0], lag, stallData[1])
+        self._scheduleTick()
+
+    def _reportStall(self, startTime, duration, stackList):
+        """Log a stall and add it to the report
+        """
+        self.stallList.append((startTime, duration, stackList))
+        stackSummary = stackList[-1].strip().split("\n")[0] if stackList else "?"
+        # use the innermost TUI frame, if any
+        for stackStr in reversed(stackList):
+            if "TUI" in stackStr:
+                stackSummary = stackStr.strip().split("\n")[0]
+                break
+        self.tuiModel.logMsg(
+            "User interface was blocked for %0.1f sec; %s" % (duration, stackSummary),
+            severity = RO.Constants.sevWarning,
+        )
+        stallStr = self._formatStall(startTime, duration, stackList)
+        sys.stderr.write(stallStr + "\n")
+        if self.reportPath:
+            try:
+                with open(self.reportPath, "a") as outFile:
+                    outFile.write(stallStr + "\n")
+            except Exception as e:
+                sys.stderr.write("Could not write lag report %s: %s\n" % (self.reportPath, e))
+
+    def _watchdog(self):
+        """Watch for stalls and capture the stack of the main thread; runs in a separate thread
+        """
+        checkInterval = min(0.1, self.stallTime / 2.0)
+        while not self._stopEvent.wait(checkInterval):
+            expTime = self._expTime
+            if time.time() - expTime < self.stallTime:
+                continue
+            with self._stallLock:
+                if self._stallData and self._stallData[0] == expTime:
+                    # already captured this stall
+                    continue
+                frame = sys._current_frames().get(self._mainThreadIdent)
+                stackList = traceback.format_stack(frame) if frame else []
+                self._stallData = (expTime, stackList)
+
+
 if __name__ == "__main__":
     import TUI.Base.TestDispatcher
     
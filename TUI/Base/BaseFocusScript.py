@@ -17,6 +17,9 @@ Note:
         The user is expected to acquire a suitable star before resuming.
   2) Take the focus sweep.
     Once this phase begins all inputs are ignored.
+    If Pipeline Sweep is checked, the focus is moved to the next position
+    as soon as each exposure has been read out, while the star is still being measured;
+    the log reports the sweep time and an estimate of the time this saved.
 
 History:
 2006-11-07 ROwen    From DIS:Focus, which was from NICFPS:Focus.
@@ -121,8 +124,8 @@ History:
 2015-11-03 ROwen    Replace "== None" with "is None" and "!= None" with "is not None" to modernize the code.
 """
 import inspect
-import math
 import random # for debug
+import time
 import numpy
 import Tkinter
 import RO.Wdg
@@ -130,6 +133,7 @@ import RO.CnvUtil
 import RO.Constants
 import RO.StringUtil
 import TUI.Models
+import TUI.Base.FocusFit
 import TUI.Inst.ExposeModel
 
 import matplotlib
@@ -214,6 +218,33 @@ def makeStarData(
     fwhm = float(fwhm)
     return [[typeChar, 1, xyPos[0], xyPos[1], 1.0, 1.0, fwhm * 5, 1, fwhm, fwhm, 0, 0, ampl, sky, ampl]]
 
+class _PipelinedFocusMove(object):
+    """A focus move started while the previous exposure is being measured
+    
+    Inputs:
+    - focPos: focus position (um)
+    """
+    def __init__(self, focPos):
+        self.focPos = float(focPos)
+        self.cmdVar = None
+        self.startTime = None
+        self.doneTime = None
+    
+    def start(self, sr):
+        """Start moving the focus (without backlash compensation)
+        """
+        self.startTime = time.time()
+        self.cmdVar = sr.startCmd(
+            actor = "tcc",
+            cmdStr = "set focus=%0.0f" % (self.focPos,),
+            callFunc = self._cmdCallback,
+        )
+
+    def _cmdCallback(self, cmdVar):
+        if cmdVar.isDone:
+            self.doneTime = time.time()
+
+
 class BaseFocusScript(object):
     """Basic focus script object.
     
@@ -254,7 +285,11 @@ class BaseFocusScript(object):
     WinSizeMult = 2.5 # window radius = centroid radius * WinSizeMult
     FocGraphMargin = 5 # margin on graph for x axis limits, in um
     MaxFocSigmaFac = 0.5 # maximum allowed sigma of best fit focus as a multiple of focus range
+    FitClipSigma = 5.0 # reject measurements this many std. dev. from the fit to the others; None to keep all
     MinFocusIncr = 50 # minimum focus increment, in um
+    DefPipelineSweep = False # default for Pipeline Sweep: move focus while measuring the previous exposure?
+    ExposurePollMS = 100 # interval at which to check for a finished exposure when pipelining (ms)
+    MaxConcurrentCentroids = 3 # maximum number of candidate stars to centroid at once when finding a star
     def __init__(self,
         sr,
         gcamActor,
@@ -443,6 +478,17 @@ class BaseFocusScript(object):
         )
         self.gr.gridWdg(None, self.moveBestFocus, colSpan = 3, sticky="w")
         
+        # create the pipeline sweep checkbox
+        self.pipelineSweepWdg = RO.Wdg.Checkbutton(
+            master = sr.master,
+            text = "Pipeline Sweep",
+            defValue = self.DefPipelineSweep,
+            relief = "flat",
+            helpText = "Move focus to the next position while measuring each sweep exposure?",
+            helpURL = self.helpURL,
+        )
+        self.gr.gridWdg(None, self.pipelineSweepWdg, colSpan = 3, sticky="w")
+        
         graphCol =  self.gr.getNextCol()
         graphRowSpan = self.gr.getNextRow()
 
@@ -1002,22 +1048,36 @@ class BaseFocusScript(object):
             self.sr.showMsg(errMsg, RO.Constants.sevWarning)
         self.focusIncrWdg.set(focusIncr, isCurrent = isOK)
 
-    def waitCentroid(self):
+    def waitCentroid(self, exposureDoneFunc=None):
         """Take an exposure and centroid using 1x1 binning.
         
         If the centroid is found, sets sr.value to the FWHM.
         Otherwise sets sr.value to None.
+        
+        Inputs:
+        - exposureDoneFunc: a function to call (with no arguments) as soon as the exposure
+            has been read out (as reported by the files keyword), while the star is still being measured;
+            None if none
         """
         sr = self.sr
         centroidCmdStr = "centroid on=%0.1f,%0.1f cradius=%0.1f %s" % \
             (self.relStarPos[0], self.relStarPos[1], self.centroidRadPix, self.formatExposeArgs())
-        yield sr.waitCmd(
+        centroidCmdDict = dict(
            actor = self.gcamActor,
            cmdStr = centroidCmdStr,
            keyVars = (self.guideModel.files, self.guideModel.star),
            checkFail = False,
         )
-        cmdVar = sr.value
+        if exposureDoneFunc is None:
+            yield sr.waitCmd(**centroidCmdDict)
+            cmdVar = sr.value
+        else:
+            cmdVar = sr.startCmd(**centroidCmdDict)
+            while not cmdVar.isDone and not cmdVar.getKeyVarData(self.guideModel.files):
+                yield sr.waitMS(self.ExposurePollMS)
+            exposureDoneFunc()
+            if not cmdVar.isDone:
+                yield sr.waitCmdVars([cmdVar], checkFail=False)
         self.didTakeImage = True
         if sr.debug:
             starData = makeStarData("c", self.relStarPos)
@@ -1088,6 +1148,11 @@ class BaseFocusScript(object):
         and sr.value to the star FWHM.
         Otherwise log a warning and set sr.value to None.
         
+        Candidate stars (those not too bright) are centroided in the order given,
+        but up to MaxConcurrentCentroids centroid commands are sent at once.
+        The first candidate that is successfully centroided is used;
+        results for the remaining candidates are ignored.
+        
         Inputs:
         - filePath: image file path on hub, relative to image root
             (e.g. concatenate items 2:4 of the guider Files keyword)
@@ -1098,22 +1163,31 @@ class BaseFocusScript(object):
         if self.maxFindAmpl is None:
             raise RuntimeError("Find disabled; maxFindAmpl=None")
         
-        for starData in starDataList:
-            starXYPos = starData[2:4]
-            starAmpl = starData[14]
-            if (starAmpl is None) or (starAmpl > self.maxFindAmpl):
-                continue
-                
+        candXYPosList = [starData[2:4] for starData in starDataList
+            if (starData[14] is not None) and (starData[14] <= self.maxFindAmpl)]
+        maxConcurrent = max(1, int(self.MaxConcurrentCentroids))
+        pendingList = [] # list of (star x,y position, centroid cmdVar), in order of preference
+        nextCandInd = 0
+        while pendingList or nextCandInd < len(candXYPosList):
+            # start more centroid commands, unless the result for the next candidate is already in
+            while len(pendingList) < maxConcurrent and nextCandInd < len(candXYPosList) \
+                and not (pendingList and pendingList[0][1].isDone):
+                starXYPos = candXYPosList[nextCandInd]
+                nextCandInd += 1
+                centroidCmdStr = "centroid file=%s on=%0.1f,%0.1f cradius=%0.1f" % \
+                    (filePath, starXYPos[0], starXYPos[1], self.centroidRadPix)
+                cmdVar = sr.startCmd(
+                   actor = self.gcamActor,
+                   cmdStr = centroidCmdStr,
+                   keyVars = (self.guideModel.star,),
+                   checkFail = False,
+                )
+                pendingList.append((starXYPos, cmdVar))
+
+            starXYPos, cmdVar = pendingList.pop(0)
             sr.showMsg("Centroiding star at %0.1f, %0.1f" % tuple(starXYPos))
-            centroidCmdStr = "centroid file=%s on=%0.1f,%0.1f cradius=%0.1f" % \
-                (filePath, starXYPos[0], starXYPos[1], self.centroidRadPix)
-            yield sr.waitCmd(
-               actor = self.gcamActor,
-               cmdStr = centroidCmdStr,
-               keyVars = (self.guideModel.star,),
-               checkFail = False,
-            )
-            cmdVar = sr.value
+            if not cmdVar.isDone:
+                yield sr.waitCmdVars([cmdVar], checkFail=False)
             if sr.debug:
                 starData = makeStarData("f", starXYPos)
             else:
@@ -1155,14 +1229,28 @@ class BaseFocusScript(object):
         self.setGraphRange(extremeFocPos=extremeFocPos)
         numMeas = 0
         self.focPosToRestore = centerFocPos
+        doPipeline = self.pipelineSweepWdg.getBool()
+        sweepStartTime = time.time()
+        self.pipelineTimeSaved = 0.0
+        nextFocusMove = None
         for focInd in range(numFocPos):
             focPos = float(startFocPos + (focInd*focusIncr))
 
-            doBacklashComp = (focInd == 0)
-            yield self.waitSetFocus(focPos, doBacklashComp)
+            if nextFocusMove is None:
+                doBacklashComp = (focInd == 0)
+                yield self.waitSetFocus(focPos, doBacklashComp)
+            else:
+                # the sweep moves in one direction, so backlash compensation is only needed
+                # for the first position, which is never pipelined
+                yield self.waitPipelinedFocusMove(nextFocusMove, measDoneTime)
+                nextFocusMove = None
             sr.showMsg("Exposing for %s sec at focus %0.0f %s" % \
                 (self.expTime, focPos, MicronStr))
-            yield self.waitCentroid()
+            if doPipeline and focInd + 1 < numFocPos:
+                nextFocusMove = _PipelinedFocusMove(startFocPos + ((focInd + 1) * focusIncr))
+                yield self.waitCentroid(exposureDoneFunc=RO.Alg.GenericCallback(nextFocusMove.start, sr))
+            else:
+                yield self.waitCentroid()
             starMeas = sr.value
             if sr.debug:
                 starMeas.fwhm = 0.0001 * (focPos - centerFocPos) ** 2
@@ -1174,7 +1262,15 @@ class BaseFocusScript(object):
             if starMeas.fwhm is not None:
                 focPosFWHMList.append((focPos, starMeas.fwhm))
                 self.graphFocusMeas(focPosFWHMList, extremeFWHM=extremeFWHM)
+            measDoneTime = time.time()
         
+        sweepTime = time.time() - sweepStartTime
+        if doPipeline:
+            self.logWdg.addMsg("Sweep took %0.0f sec; pipelining saved %0.0f sec" % \
+                (sweepTime, self.pipelineTimeSaved))
+        else:
+            self.logWdg.addMsg("Sweep took %0.0f sec" % (sweepTime,))
+
         # Fit a curve to the data
         numMeas = len(focPosFWHMList)
         if numMeas < 3:
@@ -1182,31 +1278,28 @@ class BaseFocusScript(object):
         focList, fwhmList = list(zip(*focPosFWHMList))
         focPosArr = numpy.array(focList, dtype=float)
         fwhmArr  = numpy.array(fwhmList, dtype=float)
-        weightArr = numpy.ones(numMeas, dtype=float)
-        if numMeas > 3:
-            coeffs, dumYFit, dumYBand, fwhmSigma, dumCorrMatrix = polyfitw(focPosArr, fwhmArr, weightArr, 2, True)
-        elif numMeas == 3:
-            # too few points to measure fwhmSigma
-            coeffs = polyfitw(focPosArr, fwhmArr, weightArr, 2, False)
-            fwhmSigma = None
-        
-        # Make sure fit curve has a minimum
-        if coeffs[2] <= 0.0:
-            raise sr.ScriptError("could not find minimum focus")
-        
+        try:
+            bestFocus = TUI.Base.FocusFit.fitBestFocus(focPosArr, fwhmArr, clipSigma=self.FitClipSigma)
+        except ValueError as e:
+            raise sr.ScriptError("could not find minimum focus: %s" % (RO.StringUtil.strFromException(e),))
+        coeffs = bestFocus.polyFit.coeffs
+        isRejectedArr = numpy.logical_not(bestFocus.polyFit.isUsedArr)
+        for focPos, fwhm in zip(focPosArr[isRejectedArr], fwhmArr[isRejectedArr]):
+            self.logWdg.addMsg("Warning: rejected outlier at focus %0.0f %s: FWHM = %0.1f pixels" % \
+                (focPos, MicronStr, fwhm), severity=RO.Constants.sevWarning)
+
         # find the best focus position
-        bestEstFocPos = (-1.0*coeffs[1])/(2.0*coeffs[2])
-        bestEstFWHM = coeffs[0]+coeffs[1]*bestEstFocPos+coeffs[2]*bestEstFocPos*bestEstFocPos
+        bestEstFocPos = bestFocus.focPos
+        bestEstFWHM = bestFocus.fwhm
         extremeFocPos.addVal(bestEstFocPos)
         extremeFWHM.addVal(bestEstFWHM)
         self.logFitFWHM("Fit", bestEstFocPos, bestEstFWHM)
 
         # compute and log standard deviation, if possible
-        if fwhmSigma is not None:
-            focSigma = math.sqrt(fwhmSigma / coeffs[2])
-            self.logFitFWHM(u"Fit \N{GREEK SMALL LETTER SIGMA}", focSigma, fwhmSigma)
+        focSigma = bestFocus.focSigma
+        if focSigma is not None:
+            self.logFitFWHM(u"Fit \N{GREEK SMALL LETTER SIGMA}", focSigma, bestFocus.fwhmSigma)
         else:
-            focSigma = None
             self.logWdg.addMsg(u"Warning: too few points to compute \N{GREEK SMALL LETTER SIGMA}")
 
         # plot fit as a curve and best fit focus as a point
@@ -1255,6 +1348,28 @@ class BaseFocusScript(object):
         self.focPosToRestore = None
         self.centerFocPosWdg.set(int(round(bestEstFocPos)))
     
+    def waitPipelinedFocusMove(self, focusMove, measDoneTime):
+        """Wait for a pipelined focus move to finish and the focus to settle.
+        
+        Add the time saved by pipelining the move to self.pipelineTimeSaved:
+        the time between starting the move and the later of the end of the measurement
+        and the end of settling.
+        
+        Inputs:
+        - focusMove: a started _PipelinedFocusMove
+        - measDoneTime: time at which the previous exposure was measured, logged and graphed
+        """
+        sr = self.sr
+        sr.showMsg("Moving focus to %0.0f %s" % (focusMove.focPos, MicronStr))
+        if not focusMove.cmdVar.isDone:
+            yield sr.waitCmdVars([focusMove.cmdVar])
+        doneTime = focusMove.doneTime or time.time()
+        settledTime = doneTime + (self.FocusWaitMS / 1000.0)
+        waitMS = int((settledTime - time.time()) * 1000.0)
+        if waitMS > 0:
+            yield sr.waitMS(waitMS)
+        self.pipelineTimeSaved += max(0.0, min(measDoneTime, settledTime) - focusMove.startTime)
+
     def waitSetFocus(self, focPos, doBacklashComp=False):
         """Adjust focus.
 
@@ -1603,16 +1718,22 @@ class ImagerFocusScript(BaseFocusScript):
             retStr += " overscan=0,0"
         return retStr
     
-    def waitCentroid(self):
+    def waitCentroid(self, exposureDoneFunc=None):
         """Take an exposure and centroid using 1x1 binning.
         
         If the centroid is found, sets sr.value to the FWHM.
         Otherwise sets sr.value to None.
+        
+        Inputs:
+        - exposureDoneFunc: a function to call (with no arguments) as soon as the exposure
+            has been read out, before the star is measured; None if none
         """
         sr = self.sr
         
         yield self.waitExpose()
         filePath = sr.value
+        if exposureDoneFunc is not None:
+            exposureDoneFunc()
         
         centroidCmdStr = "centroid file=%s on=%0.1f,%0.1f cradius=%0.1f" % \
             (filePath, self.relStarPos[0], self.relStarPos[1], self.centroidRadPix)
@@ -1705,6 +1826,8 @@ def polyfitw(x, y, w, ndegree, return_fit=False):
     """
     Performs a weighted least-squares polynomial fit with optional error estimates.
 
+    Retained for compatibility; new code should use TUI.Base.FocusFit.polyFit.
+
     Inputs:
         x: 
             The independent variable vector.
@@ -1743,41 +1866,9 @@ def polyfitw(x, y, w, ndegree, return_fit=False):
                     Mark Rivers.  
                     Python version, May 2002, Mark Rivers
     """
-    n = min(len(x), len(y)) # size = smaller of x,y
-    m = ndegree + 1             # number of elements in coeff vector
-    a = numpy.zeros((m,m), float)  # least square matrix, weighted matrix
-    b = numpy.zeros(m, float)  # will contain sum w*y*x^j
-    z = numpy.ones(n, float)   # basis vector for constant term
-
-    a[0,0] = numpy.sum(w)
-    b[0] = numpy.sum(w*y)
-
-    for p in range(1, 2*ndegree+1):      # power loop
-        z = z*x # z is now x^p
-        if (p < m):  b[p] = numpy.sum(w*y*z)  # b is sum w*y*x^j
-        sum = numpy.sum(w*z)
-        for j in range(max(0,(p-ndegree)), min(ndegree,p)+1):
-            a[j,p-j] = sum
-
-    a = numpy.linalg.inv(a)
-    c = numpy.dot(b, a)
+    fitData = TUI.Base.FocusFit.polyFit(x, y, w, degree=ndegree)
     if not return_fit:
-        return c         # exit if only fit coefficients are wanted
-
-    # compute optional output parameters.
-    yfit = numpy.zeros(n, float)+c[0]  # one-sigma error estimates, init
-    for k in range(1, ndegree +1):
-        yfit = yfit + c[k]*(x**k)  # sum basis vectors
-    var = numpy.sum((yfit-y)**2 )/(n-m)  # variance estimate, unbiased
-    sigma = numpy.sqrt(var)
-    yband = numpy.zeros(n, float) + a[0,0]
-    z = numpy.ones(n, float)
-    for p in range(1,2*ndegree+1):      # compute correlated error estimates on y
-        z = z*x      # z is now x^p
-        sum = 0.
-        for j in range(max(0, (p - ndegree)), min(ndegree, p)+1):
-            sum = sum + a[j,p-j]
-        yband = yband + sum * z      # add in all the error sources
-    yband = yband*var
-    yband = numpy.sqrt(yband)
-    return c, yfit, yband, sigma, a
+        return fitData.coeffs
+    if fitData.covMat is None:
+        raise ValueError("too few points to compute error estimates")
+    return fitData.coeffs, fitData.yFit, fitData.yBand, fitData.sigma, fitData.covMat / fitData.sigma**2
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""Measure the time taken by keyVar callbacks.
+
+When running, the profiler times every callback of every keyVar (of every model),
+and records the number of calls, the total time and the maximum time
+for each (actor, keyword, callback owner). The callback owner is the class and method name
+of a bound method, or the module and function name of a function.
+
+To profile from startup, set environment variable STUI_PROFILE_CALLBACKS to any non-empty value;
+TUI.Models.TUIModel.Model then starts the profiler. You may also start, stop and reset
+the profiler at any time using the Callback Profile window or the Python window, e.g.:
+
+    import TUI.Base.CallbackProfiler
+    TUI.Base.CallbackProfiler.start()
+    ...
+    TUI.Base.CallbackProfiler.printReport(sortBy="maxTime")
+"""
+import collections
+import functools
+import os
+import sys
+import time
+import opscore.actor.keyvar
+import RO.AddCallback
+
+__all__ = ["ProfileEnvVar", "CallbackStats", "SortKeys", "isEnabled", "isRunning",
+    "start", "stop", "reset", "getStatsList", "getReport", "printReport"]
+
+ProfileEnvVar = "STUI_PROFILE_CALLBACKS"
+
+CallbackStats = collections.namedtuple("CallbackStats",
+    ["actor", "keyword", "owner", "numCalls", "totalTime", "maxTime"])
+
+# sort keys for getStatsList: dict of name: (function of CallbackStats, reverse)
+_SortDict = collections.OrderedDict((
+    ("totalTime", (lambda stats: stats.totalTime, True)),
+    ("maxTime", (lambda stats: stats.maxTime, True)),
+    ("meanTime", (lambda stats: stats.totalTime / stats.numCalls, True)),
+    ("numCalls", (lambda stats: stats.numCalls, True)),
+    ("keyword", (lambda stats: (stats.actor, stats.keyword, stats.owner), False)),
+    ("owner", (lambda stats: (stats.owner, stats.actor, stats.keyword), False)),
+))
+SortKeys = tuple(_SortDict.keys())
+
+class _CallbackProfiler(object):
+    """Time keyVar callbacks; see module help for details.
+
+    While running, replaces opscore.actor.keyvar.KeyVar._basicDoCallbacks
+    with a version that times each callback.
+    """
+    def __init__(self):
+        self.statsDict = {} # dict of (actor, keyword, owner): [numCalls, totalTime, maxTime]
+        self._ownBasicDoCallbacks = None # KeyVar's own _basicDoCallbacks (if not inherited)
+        self.isRunning = False
+
+    def start(self):
+        if self.isRunning:
+            return
+        KeyVar = opscore.actor.keyvar.KeyVar
+        self._ownBasicDoCallbacks = KeyVar.__dict__.get("_basicDoCallbacks")
+        statsDict = self.statsDict
+
+        def profiledBasicDoCallbacks(keyVar, *args, **kwargs):
+            # same as RO.AddCallback.BaseMixin._basicDoCallbacks, but timing each callback
+            if not keyVar._enableCallbacks:
+                return
+            try:
+                keyVar._enableCallbacks = False
+                for func in keyVar._callbacks[:]:
+                    t0 = time.time()
+                    RO.AddCallback.safeCall2(str(keyVar), func, *args, **kwargs)
+                    dTime = time.time() - t0
+                    statsKey = (keyVar.actor, keyVar.name, _getOwnerName(func))
+                    statsList = statsDict.get(statsKey)
+                    if statsList is None:
+                        statsDict[statsKey] = [1, dTime, dTime]
+                    else:
+                        statsList[0] += 1
+                        statsList[1] += dTime
+                        if dTime > statsList[2]:
+                            statsList[2] = dTime
+            finally:
+                keyVar._enableCallbacks = True
+
+        KeyVar._basicDoCallbacks = profiledBasicDoCallbacks
+        self.isRunning = True
+
+    def stop(self):
+        if not self.isRunning:
+            return
+        KeyVar = opscore.actor.keyvar.KeyVar
+        if self._ownBasicDoCallbacks is not None:
+            KeyVar._basicDoCallbacks = self._ownBasicDoCallbacks
+        else:
+            del KeyVar._basicDoCallbacks
+        self.isRunning = False
+
+    def reset(self):
+        self.statsDict.clear()
+
+
+def _getOwnerName(func):
+    """Return a name describing the owner of a callback function
+    """
+    # unwrap functools.partial and RO.Alg.GenericCallback
+    while True:
+        if isinstance(func, functools.partial):
+            func = func.func
+            continue
+        wrappedFunc = None
+        for attrName, attrValue in getattr(func, "__dict__", {}).items():
+            if attrName.endswith("__callback"):
+                wrappedFunc = attrValue
+                break
+        if wrappedFunc is None:
+            break
+        func = wrappedFunc
+
+    funcName = getattr(func, "__name__", None)
+    if funcName is None:
+        # a callable object (use __class__ instead of type() to support old-style classes)
+        return "%s.%s" % (func.__class__.__module__, func.__class__.__name__)
+    funcSelf = getattr(func, "__self__", None)
+    if funcSelf is not None:
+        ownerClass = funcSelf if isinstance(funcSelf, type) else funcSelf.__class__
+        return "%s.%s.%s" % (ownerClass.__module__, ownerClass.__name__, funcName)
+    return "%s.%s" % (getattr(func, "__module__", "?"), funcName)
+
+
+_Profiler = _CallbackProfiler()
+
+def isEnabled():
+    """Return True if callback profiling at startup has been requested.
+    """
+    return bool(os.environ.get(ProfileEnvVar))
+
+def isRunning():
+    """Return True if the profiler is running
+    """
+    return _Profiler.isRunning
+
+def start():
+    """Start profiling (or continue, if already running); data recorded so far is retained
+    """
+    _Profiler.start()
+
+def stop():
+    """Stop profiling; data recorded so far is retained
+    """
+    _Profiler.stop()
+
+def reset():
+    """Discard all recorded data
+    """
+    _Profiler.reset()
+
+def getStatsList(sortBy="totalTime"):
+    """Return a list of CallbackStats, one per (actor, keyword, callback owner)
+
+    Inputs:
+    - sortBy: one of SortKeys
+    """
+    keyFunc, reverse = _SortDict[sortBy]
+    statsList = [CallbackStats(actor, keyword, owner, *statsData)
+        for (actor, keyword, owner), statsData in list(_Profiler.statsDict.items())]
+    statsList.sort(key=keyFunc, reverse=reverse)
+    return statsList
+
+def getReport(sortBy="totalTime", maxItems=None):
+    """Return a report as a string
+
+    Inputs:
+    - sortBy: one of SortKeys
+    - maxItems: maximum number of callbacks to list; None for all
+    """
+    statsList = getStatsList(sortBy=sortBy)
+    lineList = ["   Calls   Total Sec  Mean msec   Max msec  Keyword  Owner"]
+    for stats in statsList[0:maxItems]:
+        lineList.append("%8d  %10.4f  %9.3f  %9.3f  %s.%s  %s" % (stats.numCalls, stats.totalTime,
+            stats.totalTime * 1000.0 / stats.numCalls, stats.maxTime * 1000.0,
+            stats.actor, stats.keyword, stats.owner))
+    return "\n".join(lineList)
+
+def printReport(sortBy="totalTime", maxItems=25):
+    """Print a report to stdout; see getReport for details
+    """
+    sys.stdout.write(getReport(sortBy=sortBy, maxItems=maxItems) + "\n")
@@ -0,0 +1,442 @@
+#!/usr/bin/env python
+"""Measure how many keyword replies per second TUI can absorb.
+
+The benchmark loads all of TUI's standard windows and builds and shows every one of them,
+so that all of their keyVar callbacks are registered. It then feeds the replies of a busy
+stretch of a night (see getStdReplyStreams) straight into the dispatcher's dispatchReplyStr,
+as fast as possible, in chunks, letting Tk process events (including redraws) between chunks.
+
+It reports:
+- replies/sec sustained (including the time Tk spends processing events between chunks)
+- time spent dispatching replies and time spent in keyVar callbacks, per actor
+    (each actor has one model), and the keyVars whose callbacks take the most time
+    (callbacks are timed using TUI.Base.CallbackProfiler)
+- Tk event loop lag: how late a periodic timer fires
+
+The results are saved as a JSON file so that releases can be compared.
+
+To run the benchmark:
+    python DispatcherBenchmark.py [--duration=<sec>] [--tccRate=<Hz>] [--outDir=<dir>]
+On linux without a display the benchmark re-runs itself using xvfb-run (if available),
+so it runs in a virtual display.
+
+To compare saved results:
+    python DispatcherBenchmark.py --compare <file1> <file2> ...
+
+The keyword data is based on the data in the TestData modules; if an actor's keywords change,
+update the corresponding reply stream.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import TUI.Base.CallbackProfiler
+import TUI.LoadStdModules
+import TUI.Models.TUIModel
+import TUI.Version
+
+__all__ = ["ReplyStream", "getStdReplyStreams", "DispatcherBenchmark", "formatResults", "formatComparison"]
+
+# number of items in each ranked section of the report
+_MaxReportItems = 15
+
+class ReplyStream(object):
+    """A periodic stream of replies from one actor.
+
+    Inputs:
+    - actor: name of actor
+    - period: interval between updates (sec of simulated time)
+    - dataFunc: function that returns the replies for one update;
+        it receives one argument: the update number (starting from 0)
+        and must return a list of reply data strings (each of the form "key1=value1; key2=value2...")
+    - msgCode: message code; one of :>iwef! (opscore.actor.keyvar.AllCodes)
+    - cmdr: commander (program.username)
+    - cmdID: command ID (an integer)
+    """
+    def __init__(self, actor, period, dataFunc, msgCode="i", cmdr=".hub", cmdID=0):
+        self.actor = actor
+        self.period = float(period)
+        self.dataFunc = dataFunc
+        self.msgCode = msgCode
+        self.cmdr = cmdr
+        self.cmdID = int(cmdID)
+
+    def getReplies(self, duration):
+        """Return a list of (time, actor, reply string) for all updates in the specified duration (sec)
+        """
+        replyList = []
+        for updateNum in range(int(duration / self.period)):
+            updateTime = updateNum * self.period
+            for dataStr in self.dataFunc(updateNum):
+                replyStr = "%s %s %s %s %s" % (self.cmdr, self.cmdID, self.actor, self.msgCode, dataStr)
+                replyList.append((updateTime, self.actor, replyStr))
+        return replyList
+
+
+def _tccPosData(updateNum):
+    """Telescope position and axis status, as output while tracking
+    """
+    az = -340.0 + updateNum * 0.004
+    alt = 45.0 + updateNum * 0.002
+    rot = 10.0 - updateNum * 0.003
+    tai = 4494436859.66 + updateNum
+    return [
+        "AxePos=%0.4f, %0.4f, %0.4f; TCCPos=%0.4f, %0.4f, %0.4f" % (az, alt, rot, az, alt, rot),
+        "AzStat=%0.4f, 0.004, %0.2f, 0x801; AltStat=%0.4f, 0.002, %0.2f, 0x801; RotStat=%0.4f, -0.003, %0.2f, 0x801" % \
+            (az, tai, alt, tai, rot, tai),
+    ]
+
+def _tccOffsetData(updateNum):
+    """Offsets and focus, as output for each guide correction
+    """
+    offset = 0.001 * math.sin(updateNum * 0.1)
+    return [
+        "ObjArcOff=%0.5f, 0.0, 1000.0, %0.5f, 0.0, 1000.0" % (offset, -offset),
+        "GuideOff=0.0, 0.0, 1000.0, 0.0, 0.0, 1000.0, %0.5f, 0.0, 1000.0; SecFocus=%0.1f; scaleFac=%0.7f" % \
+            (offset, 570 + 10 * offset, 1.0 + offset * 1e-3),
+    ]
+
+# number of guide probes on a cartridge
+_NumGuideProbes = 17
+
+def _guiderData(updateNum):
+    """Guider data for one guide exposure: probe data for each guide probe and guide corrections
+    """
+    replyList = ["gprobeBits=%s" % (", ".join(["0x4"] * (_NumGuideProbes - 1) + ["0x2"]),)]
+    for probeNum in range(1, _NumGuideProbes + 1):
+        fwhm = 1.5 + 0.1 * math.sin(updateNum * 0.3 + probeNum)
+        focusOffset = (-400.0, 0.0, 400.0)[probeNum % 3]
+        replyList.append("probe=%d, %d, 0x04, %0.2f, %0.2f, %0.2f, %0.1f, %0.1f, %0.2f, %0.2f, %0.2f, %d" % \
+            (updateNum, probeNum, 0.1, -0.1, fwhm, focusOffset, 25000.0 + 100 * probeNum, 14.5, 14.4, 0.1, 0))
+    change = 0.1 * math.sin(updateNum * 0.2)
+    replyList.append(
+        "axisError=%0.2f, %0.2f, %0.2f; axisChange=%0.2f, %0.2f, %0.2f, enabled; " % \
+            (change * 1.4, -change * 1.4, change, change, -change, change) + \
+        "focusError=%0.1f; focusChange=%0.1f, enabled; scaleError=%0.6f; scaleChange=%0.6f, enabled; seeing=%0.1f" % \
+            (change * 14, change * 10, change * 1e-5, change * 1e-5, 1.5 + change)
+    )
+    return replyList
+
+def _gcameraData(updateNum):
+    """Guide camera exposure state
+    """
+    return ["exposureState=integrating, 5, %d" % (updateNum % 10,)]
+
+def _apogeeQLData(updateNum):
+    """APOGEE quick look data for one up-the-ramp read
+    """
+    readNum = 1 + updateNum % 47
+    expNum = 120000 + updateNum // 47
+    return [
+        "utrData=%08d, %d, %0.1f, -99.05, 174.10, -98.70, 171.90, 15, 0.51, 0.50, 1.0, 633.0, 6, 6, 4.0, , Object, B" % \
+            (expNum, readNum, readNum * 10.6),
+    ]
+
+def _cmdsData(updateNum):
+    """Command started and finished, alternately
+    """
+    uniqueCmdID = 10000 + updateNum // 2
+    if updateNum % 2 == 0:
+        return ["CmdQueued=%d, %0.2f, 'APO.observer', %d, tcc, 6, 'thread status'" % \
+            (uniqueCmdID, 1497240517.32 + updateNum, updateNum // 2)]
+    return ["CmdDone=%d, ':'" % (uniqueCmdID,)]
+
+def getStdReplyStreams(tccRate=1.0):
+    """Return a list of ReplyStreams for the replies of a busy night
+
+    Inputs:
+    - tccRate: rate of TCC position updates (Hz)
+    """
+    return [
+        ReplyStream("tcc", 1.0 / tccRate, _tccPosData, cmdr=".tcc"),
+        ReplyStream("tcc", 10.0, _tccOffsetData, cmdr=".tcc"),
+        ReplyStream("guider", 10.0, _guiderData, cmdr=".guider"),
+        ReplyStream("gcamera", 1.0, _gcameraData, cmdr=".gcamera"),
+        ReplyStream("apogeeql", 10.6, _apogeeQLData, cmdr=".apogeeql"),
+        ReplyStream("cmds", 0.5, _cmdsData, cmdr=".hub"),
+    ]
+
+
+def _getCallbackTimes():
+    """Return the keyVar callback data recorded so far by TUI.Base.CallbackProfiler, per keyVar,
+    as a dict of (actor, keyword name): [number of callback calls, time (sec)]
+    """
+    timeDict = {}
+    for stats in TUI.Base.CallbackProfiler.getStatsList():
+        timeList = timeDict.setdefault((stats.actor, stats.keyword), [0, 0.0])
+        timeList[0] += stats.numCalls
+        timeList[1] += stats.totalTime
+    return timeDict
+
+
+class _LagRecorder(object):
+    """Record Tk event loop lag: the delay of a periodic timer beyond its scheduled time
+    """
+    def __init__(self, tkRoot, interval):
+        self.tkRoot = tkRoot
+        self.interval = float(interval)
+        self.lagList = []
+        self._afterID = None
+        self._expTime = None
+
+    def start(self):
+        self._schedule()
+
+    def stop(self):
+        if self._afterID is not None:
+            self.tkRoot.after_cancel(self._afterID)
+            self._afterID = None
+
+    def _schedule(self):
+        self._expTime = time.time() + self.interval
+        self._afterID = self.tkRoot.after(int(self.interval * 1000), self._timerFired)
+
+    def _timerFired(self):
+        self.lagList.append(max(0.0, time.time() - self._expTime))
+        self._schedule()
+
+
+class DispatcherBenchmark(object):
+    """Feed replies to the dispatcher as fast as possible and measure the performance.
+
+    Inputs:
+    - tuiModel: the TUI model
+    - replyStreams: a list of ReplyStreams
+    - duration: duration of simulated time to dispatch (sec); this sets the number of replies
+    - chunkSize: number of replies to dispatch between letting Tk process events
+    - lagInterval: interval at which to measure event loop lag (sec)
+    - doneFunc: function to call when the benchmark is done; it receives one argument: this object
+
+    Call start to start the benchmark; it runs in the Tk event loop.
+    When done, the results are in self.results (see getResults).
+    """
+    def __init__(self, tuiModel, replyStreams, duration, chunkSize=50, lagInterval=0.05, doneFunc=None):
+        self.tuiModel = tuiModel
+        self.tkRoot = tuiModel.tkRoot
+        self.dispatcher = tuiModel.dispatcher
+        self.duration = float(duration)
+        self.chunkSize = int(chunkSize)
+        self.doneFunc = doneFunc
+        self.results = None
+
+        # merge the streams in order of simulated time
+        replyList = []
+        for replyStream in replyStreams:
+            replyList += replyStream.getReplies(self.duration)
+        replyList.sort(key=lambda item: item[0])
+        self._replyList = [item[1:] for item in replyList]
+
+        self._profilerWasRunning = False # was TUI.Base.CallbackProfiler already running?
+        self._callbackTimesAtStart = {} # _getCallbackTimes() when the benchmark started
+        self._callbackTimeDict = {} # callback data recorded during the benchmark; see _getCallbackTimes
+        self._lagRecorder = _LagRecorder(self.tkRoot, lagInterval)
+        self._dispatchTimeDict = {} # dict of actor: time spent in dispatchReplyStr (sec)
+        self._nextInd = 0
+        self._startTime = None
+
+    def start(self):
+        """Start the benchmark
+        """
+        self._nextInd = 0
+        self._dispatchTimeDict = {}
+        # time keyVar callbacks using CallbackProfiler, keeping any data it has already recorded
+        self._profilerWasRunning = TUI.Base.CallbackProfiler.isRunning()
+        self._callbackTimesAtStart = _getCallbackTimes()
+        TUI.Base.CallbackProfiler.start()
+        self._lagRecorder.start()
+        self._startTime = time.time()
+        self._dispatchChunk()
+
+    def _dispatchChunk(self):
+        """Dispatch the next chunk of replies, then let Tk process events
+        """
+        dispatchTimeDict = self._dispatchTimeDict
+        endInd = min(self._nextInd + self.chunkSize, len(self._replyList))
+        for actor, replyStr in self._replyList[self._nextInd:endInd]:
+            t0 = time.time()
+            self.dispatcher.dispatchReplyStr(replyStr)
+            dispatchTimeDict[actor] = dispatchTimeDict.get(actor, 0.0) + time.time() - t0
+        self._nextInd = endInd
+
+        # wait for Tk to be idle (e.g. done redrawing) before continuing
+        if self._nextInd < len(self._replyList):
+            self.tkRoot.after_idle(self.tkRoot.after, 0, self._dispatchChunk)
+        else:
+            self.tkRoot.after_idle(self.tkRoot.after, 0, self._finish)
+
+    def _finish(self):
+        """Stop measuring and compute the results
+        """
+        elapsedTime = time.time() - self._startTime
+        self._lagRecorder.stop()
+        self._callbackTimeDict = dict()
+        for key, (numCalls, callbackTime) in _getCallbackTimes().items():
+            numCallsAtStart, callbackTimeAtStart = self._callbackTimesAtStart.get(key, (0, 0.0))
+            if numCalls > numCallsAtStart:
+                self._callbackTimeDict[key] = [numCalls - numCallsAtStart, callbackTime - callbackTimeAtStart]
+        if not self._profilerWasRunning:
+            TUI.Base.CallbackProfiler.stop()
+        self.results = self.getResults(elapsedTime)
+        if self.doneFunc:
+            self.doneFunc(self)
+
+    def getResults(self, elapsedTime):
+        """Return the results as a dict that can be saved as JSON
+        """
+        callbackTimeByActor = {}
+        callbackTimeByKeyVar = {}
+        for (actor, keyName), (numCalls, callbackTime) in self._callbackTimeDict.items():
+            callbackTimeByActor[actor] = callbackTimeByActor.get(actor, 0.0) + callbackTime
+            callbackTimeByKeyVar["%s.%s" % (actor, keyName)] = [numCalls, callbackTime]
+
+        lagList = sorted(self._lagRecorder.lagList)
+        if lagList:
+            lagDict = dict(
+                numSamples = len(lagList),
+                mean = sum(lagList) / len(lagList),
+                p95 = lagList[int(0.95 * (len(lagList) - 1))],
+                max = lagList[-1],
+            )
+        else:
+            lagDict = dict(numSamples = 0, mean = None, p95 = None, max = None)
+
+        numReplies = len(self._replyList)
+        return dict(
+            version = TUI.Version.VersionStr,
+            date = time.strftime("%Y-%m-%dT%H:%M:%S"),
+            platform = TUI.Models.TUIModel.getPlatform(),
+            pythonVersion = sys.version.split()[0],
+            duration = self.duration,
+            chunkSize = self.chunkSize,
+            numReplies = numReplies,
+            elapsedTime = elapsedTime,
+            repliesPerSec = numReplies / elapsedTime if elapsedTime > 0 else None,
+            dispatchTimeByActor = self._dispatchTimeDict,
+            callbackTimeByActor = callbackTimeByActor,
+            callbackTimeByKeyVar = callbackTimeByKeyVar,
+            lag = lagDict,
+        )
+
+
+def _fmtSec(val):
+    """Format a time (sec), which may be None
+    """
+    if val is None:
+        return "   ?"
+    return "%0.4f" % (val,)
+
+def formatResults(results):
+    """Return benchmark results as a report string
+    """
+    lineList = [
+        "%s %s dispatcher benchmark on %s, python %s, run %s" % (TUI.Version.ApplicationName,
+            results["version"], results["platform"], results["pythonVersion"], results["date"]),
+        "%d replies (%0.0f sec of simulated time) in %0.2f sec: %0.1f replies/sec" % \
+            (results["numReplies"], results["duration"], results["elapsedTime"], results["repliesPerSec"] or 0),
+        "Event loop lag (sec): mean %s; 95%% %s; max %s (%d samples)" % (_fmtSec(results["lag"]["mean"]),
+            _fmtSec(results["lag"]["p95"]), _fmtSec(results["lag"]["max"]), results["lag"]["numSamples"]),
+        "",
+        "Actor             Dispatch Sec  Callback Sec",
+    ]
+    dispatchTimeByActor = results["dispatchTimeByActor"]
+    callbackTimeByActor = results["callbackTimeByActor"]
+    for actor in sorted(dispatchTimeByActor.keys(), key=lambda actor: dispatchTimeByActor[actor], reverse=True):
+        lineList.append("%-16s  %12.4f  %12.4f" % (actor, dispatchTimeByActor[actor], callbackTimeByActor.get(actor, 0.0)))
+
+    keyVarItems = sorted(results["callbackTimeByKeyVar"].items(), key=lambda item: item[1][1], reverse=True)
+    lineList += [
+        "",
+        "Slowest of %d keyVars:" % (len(keyVarItems),),
+        "Callback Sec    Calls  KeyVar",
+    ]
+    for keyVarName, (numCalls, callbackTime) in keyVarItems[0:_MaxReportItems]:
+        lineList.append("%12.4f  %7d  %s" % (callbackTime, numCalls, keyVarName))
+    return "\n".join(lineList)
+
+def formatComparison(resultsList):
+    """Return a report string comparing the main results of several benchmark runs
+    """
+    lineList = ["Version             Date                 Replies/Sec  Mean Lag  Max Lag"]
+    for results in resultsList:
+        lineList.append("%-18s  %-19s  %11.1f  %8s  %7s" % (results["version"], results["date"],
+            results["repliesPerSec"] or 0, _fmtSec(results["lag"]["mean"]), _fmtSec(results["lag"]["max"])))
+    return "\n".join(lineList)
+
+def _findExecutable(name):
+    """Return the path to an executable on the PATH, or None if not found
+    """
+    for dirPath in os.environ.get("PATH", "").split(os.pathsep):
+        filePath = os.path.join(dirPath, name)
+        if os.path.isfile(filePath) and os.access(filePath, os.X_OK):
+            return filePath
+    return None
+
+def _loadAllWindows(tuiModel):
+    """Load all standard windows, then build and show each one
+    """
+    for errMsg in TUI.LoadStdModules.loadAll():
+        sys.stderr.write(errMsg + "\n")
+    tlSet = tuiModel.tlSet
+    for name in tlSet.getNames():
+        try:
+            tlSet.makeVisible(name)
+        except Exception as e:
+            sys.stderr.write("Could not show window %s: %s\n" % (name, e))
+
+def _runBenchmark(args):
+    """Run the benchmark, print the report and save the results
+    """
+    tuiModel = TUI.Models.TUIModel.Model()
+    _loadAllWindows(tuiModel)
+
+    def doneFunc(benchmark):
+        results = benchmark.results
+        print(formatResults(results))
+        fileName = "DispatcherBenchmark_%s_%s.json" % (TUI.Version.VersionName, time.strftime("%Y-%m-%dT%H-%M-%S"))
+        filePath = os.path.join(args.outDir, fileName)
+        with open(filePath, "w") as outFile:
+            json.dump(results, outFile, indent=4, sort_keys=True)
+        print("Results saved as %s" % (filePath,))
+        tuiModel.reactor.stop()
+
+    benchmark = DispatcherBenchmark(
+        tuiModel = tuiModel,
+        replyStreams = getStdReplyStreams(tccRate=args.tccRate),
+        duration = args.duration,
+        chunkSize = args.chunkSize,
+        doneFunc = doneFunc,
+    )
+    # give windows a chance to finish drawing before starting
+    tuiModel.tkRoot.after(1000, benchmark.start)
+    tuiModel.reactor.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure how many keyword replies per second TUI can absorb")
+    parser.add_argument("--duration", type=float, default=600.0,
+        help="duration of simulated time to dispatch (sec)")
+    parser.add_argument("--tccRate", type=float, default=1.0, help="rate of TCC position updates (Hz)")
+    parser.add_argument("--chunkSize", type=int, default=50,
+        help="number of replies to dispatch between letting Tk process events")
+    parser.add_argument("--outDir", default=".", help="directory in which to save the results")
+    parser.add_argument("--compare", nargs="+", metavar="FILE", help="compare saved results instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        resultsList = []
+        for filePath in args.compare:
+            with open(filePath, "r") as inFile:
+                resultsList.append(json.load(inFile))
+        print(formatComparison(resultsList))
+        sys.exit(0)
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        xvfbRunPath = _findExecutable("xvfb-run")
+        if xvfbRunPath:
+            os.execv(xvfbRunPath, [xvfbRunPath, "--auto-servernum", sys.executable] + sys.argv)
+        sys.stderr.write("No display and xvfb-run not found\n")
+        sys.exit(1)
+
+    _runBenchmark(args)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+"""Fit focus curves: weighted polynomial fits with outlier rejection and error estimates.
+
+Used by focus scripts (TUI.Base.BaseFocusScript), which fit FWHM vs. focus position
+with a parabola, and by the guider focus plot (TUI.Inst.Guide.FocusPlotWdg),
+which fits a line to RMS^2 - C * offset^2 vs. guide probe focus offset.
+
+polyFit performs a weighted least squares polynomial fit. The fit is vectorized
+and is computed in a centered, scaled variable, so it is well conditioned
+even for focus positions of many thousands of microns. It returns the parameter covariance
+and may reject outliers by iterative sigma clipping (a single bad centroid or guide probe
+can otherwise badly skew the fit). A least squares fit is pulled toward an outlier,
+hiding it, so each point is tested using its leave-one-out residual (the residual of the point
+from a fit to the other points), in units of the standard deviation of that fit
+(an "externally studentized residual"); both are computed without refitting.
+At most one point is rejected per iteration, and points are only rejected
+if at least two degrees of freedom would remain to estimate the scatter.
+
+fitBestFocus fits a parabola to FWHM vs. focus position and returns the best focus
+(the minimum of the parabola) and its uncertainty, computed from the parameter covariance.
+
+Run this module to check the fit against a straightforward implementation
+and to time it.
+"""
+import collections
+import math
+import numpy
+
+__all__ = ["PolyFit", "BestFocus", "polyFit", "polyVal", "fitBestFocus"]
+
+# minimum standard deviation used for sigma clipping, relative to the largest y value;
+# this prevents rejecting points from an exact fit due to roundoff error
+_MinRelSigma = 1.0e-10
+
+# result of polyFit:
+# - coeffs: polynomial coefficients, constant term first: y = coeffs[0] + coeffs[1]*x + ...
+# - covMat: covariance matrix of the coefficients, scaled by the variance of the fit;
+#     None if there are too few points to estimate the variance
+# - sigma: standard deviation of the fit residuals, in y units (weighted by sqrt(w));
+#     None if there are too few points to estimate it
+# - yFit: the fit evaluated at each point (including rejected points)
+# - yBand: 1-sigma uncertainty of yFit; None if sigma is None
+# - isUsedArr: boolean array: True for each point used in the fit, False for each rejected point
+PolyFit = collections.namedtuple("PolyFit",
+    ["coeffs", "covMat", "sigma", "yFit", "yBand", "isUsedArr"])
+
+# result of fitBestFocus:
+# - focPos: best focus position
+# - fwhm: FWHM of the fit at the best focus position
+# - focSigma: 1-sigma uncertainty of focPos; None if there are too few points to estimate it
+# - fwhmSigma: standard deviation of the FWHM residuals; None if there are too few points to estimate it
+# - polyFit: the PolyFit from which the best focus was computed
+BestFocus = collections.namedtuple("BestFocus",
+    ["focPos", "fwhm", "focSigma", "fwhmSigma", "polyFit"])
+
+def polyVal(coeffs, x):
+    """Evaluate a polynomial whose coefficients are ordered constant term first
+
+    Inputs:
+    - coeffs: polynomial coefficients, constant term first
+    - x: a value or array of values at which to evaluate the polynomial
+    """
+    return numpy.polyval(numpy.asarray(coeffs)[::-1], x)
+
+def polyFit(x, y, w=None, degree=2, clipSigma=None, maxReject=None):
+    """Weighted least squares polynomial fit with optional sigma clipping
+
+    Inputs:
+    - x: independent variable (array-like)
+    - y: dependent variable (array-like); the same length as x
+    - w: weights (array-like): the same length as x, or None for equal weights;
+        for errors sigma_i use w_i = 1/sigma_i^2
+    - degree: degree of the polynomial
+    - clipSigma: reject points whose leave-one-out residual exceeds clipSigma times
+        the standard deviation of the fit to the other points; None to reject nothing
+    - maxReject: maximum number of points to reject; None for as many as possible
+        (at least degree + 3 points are always kept)
+
+    Returns a PolyFit.
+
+    Raises ValueError if the inputs have different lengths, there are fewer than degree + 1
+    points with positive weight, or the x values do not have enough distinct values.
+    """
+    xArr = numpy.asarray(x, dtype=float)
+    yArr = numpy.asarray(y, dtype=float)
+    if w is None:
+        wArr = numpy.ones(len(xArr), dtype=float)
+    else:
+        wArr = numpy.asarray(w, dtype=float)
+    if not (xArr.shape == yArr.shape == wArr.shape) or xArr.ndim != 1:
+        raise ValueError("x, y and w must be 1-dimensional arrays of the same length")
+    numCoeffs = degree + 1
+
+    isUsedArr = wArr > 0
+    if isUsedArr.sum() < numCoeffs:
+        raise ValueError("need at least %d points with positive weight to fit degree %d" % \
+            (numCoeffs, degree))
+
+    # fit in t = (x - xCtr) / xScale to keep the normal equations well conditioned
+    xCtr = xArr[isUsedArr].mean()
+    xScale = numpy.abs(xArr[isUsedArr] - xCtr).max()
+    if xScale == 0:
+        xScale = 1.0
+    vanderArr = ((xArr - xCtr) / xScale)[:, numpy.newaxis] ** numpy.arange(numCoeffs)
+
+    numRejected = 0
+    minUsed = degree + 3
+    if maxReject is None:
+        maxReject = len(xArr)
+    while True:
+        tCoeffs, tUnscaledCov = _linearFit(vanderArr, yArr, wArr, isUsedArr)
+        yFit = numpy.dot(vanderArr, tCoeffs)
+        numUsed = isUsedArr.sum()
+        if clipSigma is None or numRejected >= maxReject or numUsed <= minUsed:
+            break
+        # leverage and externally studentized residual of each used point
+        weightedResidArr = (yArr - yFit) * numpy.sqrt(wArr)
+        leverageArr = wArr * numpy.einsum("ij,jk,ik->i", vanderArr, tUnscaledCov, vanderArr)
+        leaveOneOutArr = numpy.where(isUsedArr, 1.0 - leverageArr, 1.0)
+        chiSq = numpy.sum(weightedResidArr[isUsedArr]**2)
+        leaveOneOutVarArr = (chiSq - weightedResidArr**2 / leaveOneOutArr) / (numUsed - numCoeffs - 1)
+        minSigma = _MinRelSigma * numpy.abs(yArr[isUsedArr]).max()
+        leaveOneOutSigmaArr = numpy.sqrt(numpy.maximum(leaveOneOutVarArr, minSigma**2))
+        studResidArr = numpy.abs(weightedResidArr) / (leaveOneOutSigmaArr * numpy.sqrt(leaveOneOutArr))
+        worstInd = numpy.argmax(numpy.where(isUsedArr, studResidArr, -1.0))
+        if studResidArr[worstInd] <= clipSigma:
+            break
+        isUsedArr = isUsedArr.copy()
+        isUsedArr[worstInd] = False
+        numRejected += 1
+
+    # convert coefficients and covariance from t to x: coeffs = transMat . tCoeffs
+    powArr = numpy.arange(numCoeffs)
+    transMat = numpy.zeros((numCoeffs, numCoeffs), dtype=float)
+    for k in powArr:
+        for j in range(k + 1):
+            transMat[j, k] = _binomial(k, j) * (-xCtr) ** (k - j) / xScale ** k
+    coeffs = numpy.dot(transMat, tCoeffs)
+
+    numDOF = isUsedArr.sum() - numCoeffs
+    if numDOF > 0:
+        residArr = (yArr - yFit)[isUsedArr]
+        variance = numpy.sum(wArr[isUsedArr] * residArr**2) / numDOF
+        sigma = math.sqrt(variance)
+        tCovMat = tUnscaledCov * variance
+        covMat = numpy.dot(numpy.dot(transMat, tCovMat), transMat.T)
+        yBand = numpy.sqrt(numpy.einsum("ij,jk,ik->i", vanderArr, tCovMat, vanderArr))
+    else:
+        sigma = None
+        covMat = None
+        yBand = None
+
+    return PolyFit(
+        coeffs = coeffs,
+        covMat = covMat,
+        sigma = sigma,
+        yFit = yFit,
+        yBand = yBand,
+        isUsedArr = isUsedArr,
+    )
+
+def fitBestFocus(focPos, fwhm, w=None, clipSigma=None, maxReject=None):
+    """Fit a parabola to FWHM vs. focus position and compute the best focus
+
+    Inputs:
+    - focPos: focus positions (array-like)
+    - fwhm: FWHM measured at each focus position (array-like)
+    - w, clipSigma, maxReject: see polyFit
+
+    Returns a BestFocus. The focus uncertainty is propagated from the covariance
+    of the linear and quadratic coefficients.
+
+    Raises ValueError if the data cannot be fit (see polyFit) or the fit has no minimum.
+    """
+    fitData = polyFit(focPos, fwhm, w=w, degree=2, clipSigma=clipSigma, maxReject=maxReject)
+    c0, c1, c2 = fitData.coeffs
+    if c2 <= 0.0:
+        raise ValueError("fit curve has no minimum")
+    bestFocPos = -c1 / (2.0 * c2)
+    bestFWHM = c0 + (c1 * bestFocPos) + (c2 * bestFocPos**2)
+
+    if fitData.covMat is not None:
+        # gradient of bestFocPos with respect to (c1, c2)
+        gradArr = numpy.array((-1.0 / (2.0 * c2), c1 / (2.0 * c2**2)))
+        focVar = numpy.dot(gradArr, numpy.dot(fitData.covMat[1:, 1:], gradArr))
+        focSigma = math.sqrt(max(focVar, 0.0))
+    else:
+        focSigma = None
+
+    return BestFocus(
+        focPos = bestFocPos,
+        fwhm = bestFWHM,
+        focSigma = focSigma,
+        fwhmSigma = fitData.sigma,
+        polyFit = fitData,
+    )
+
+def _linearFit(vanderArr, yArr, wArr, isUsedArr):
+    """Solve the weighted normal equations for the used points
+
+    Returns (coeffs, unscaled covariance matrix: the inverse of the normal matrix)
+    """
+    usedWArr = numpy.where(isUsedArr, wArr, 0.0)
+    weightedVander = vanderArr * usedWArr[:, numpy.newaxis]
+    normMat = numpy.dot(weightedVander.T, vanderArr)
+    try:
+        unscaledCov = numpy.linalg.inv(normMat)
+    except numpy.linalg.LinAlgError:
+        raise ValueError("x values do not have enough distinct values to fit")
+    coeffs = numpy.dot(unscaledCov, numpy.dot(weightedVander.T, yArr))
+    return coeffs, unscaledCov
+
+def _binomial(n, k):
+    """Return the binomial coefficient n choose k
+    """
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+if __name__ == "__main__":
+    import timeit
+
+    def loopPolyFit(x, y, w, degree):
+        """Straightforward weighted polynomial fit (as formerly used by BaseFocusScript)
+        """
+        numCoeffs = degree + 1
+        a = numpy.zeros((numCoeffs, numCoeffs), float)
+        b = numpy.zeros(numCoeffs, float)
+        z = numpy.ones(len(x), float)
+        a[0, 0] = numpy.sum(w)
+        b[0] = numpy.sum(w * y)
+        for p in range(1, 2 * degree + 1):
+            z = z * x
+            if p < numCoeffs:
+                b[p] = numpy.sum(w * y * z)
+            pSum = numpy.sum(w * z)
+            for j in range(max(0, p - degree), min(degree, p) + 1):
+                a[j, p - j] = pSum
+        return numpy.dot(b, numpy.linalg.inv(a))
+
+    # a simulated focus sweep
+    rng = numpy.random.RandomState(42)
+    focArr = numpy.linspace(-500.0, 500.0, 9) + 1500.0
+    trueFWHMArr = 1.0 + 1.0e-5 * (focArr - 1550.0)**2
+    fwhmArr = trueFWHMArr + rng.normal(0.0, 0.05, len(focArr))
+
+    refCoeffs = loopPolyFit(focArr, fwhmArr, numpy.ones(len(focArr)), 2)
+    newFit = polyFit(focArr, fwhmArr, degree=2)
+    print("max fit difference from reference: %0.2g arcsec" % \
+        (numpy.abs(polyVal(refCoeffs, focArr) - polyVal(newFit.coeffs, focArr)).max(),))
+    numpyCov = numpy.polyfit(focArr, fwhmArr, 2, cov=True)[1][::-1, ::-1]
+    print("max relative covariance difference from numpy.polyfit: %0.2g" % \
+        (numpy.abs((newFit.covMat - numpyCov) / numpyCov).max(),))
+
+    bestFocus = fitBestFocus(focArr, fwhmArr)
+    print("best focus = %0.1f +/- %0.1f (true = 1550)" % (bestFocus.focPos, bestFocus.focSigma))
+
+    badFWHMArr = fwhmArr.copy()
+    badFWHMArr[6] += 2.0
+    badFocus = fitBestFocus(focArr, badFWHMArr)
+    clipFocus = fitBestFocus(focArr, badFWHMArr, clipSigma=3.0)
+    print("with one bad point: best focus = %0.1f unclipped; %0.1f clipped (rejected %s)" % \
+        (badFocus.focPos, clipFocus.focPos, numpy.nonzero(~clipFocus.polyFit.isUsedArr)[0]))
+
+    numReps = 2000
+    for name, func in (
+        ("loop fit (coeffs only)", lambda: loopPolyFit(focArr, fwhmArr, numpy.ones(len(focArr)), 2)),
+        ("polyFit", lambda: polyFit(focArr, fwhmArr, degree=2)),
+        ("polyFit, clipped", lambda: polyFit(focArr, badFWHMArr, degree=2, clipSigma=3.0)),
+        ("fitBestFocus, clipped", lambda: fitBestFocus(focArr, badFWHMArr, clipSigma=3.0)),
+    ):
+        sec = timeit.timeit(func, number=numReps)
+        print("%-25s %6.1f usec/fit" % (name, sec * 1.0e6 / numReps))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""Call a function (typically a redraw method) once when Tk is next idle, however often it is requested.
+
+Many widgets redraw themselves from keyVar callbacks. When several related keywords
+arrive in a burst (e.g. one reply with many keywords, or many replies read at once)
+a widget that redraws in each callback redraws many times, though only the last redraw is seen.
+
+Instead a callback can update its data and call IdleCaller.schedule (or simply call the IdleCaller,
+so it can be used directly as a keyVar callback). The function is then called once,
+when Tk has processed pending events, no matter how many times it was scheduled.
+
+Example:
+    self._redrawCaller = TUI.Base.IdleCaller.IdleCaller(self, self.redraw)
+    ...
+    def _fooCallback(self, keyVar):
+        self.fooData = keyVar[0]
+        self._redrawCaller.schedule()
+"""
+import Tkinter
+
+__all__ = ["IdleCaller"]
+
+class IdleCaller(object):
+    """Call a function when Tk is next idle; requests made while a call is pending are coalesced.
+
+    Inputs:
+    - master: a Tk widget; if it has been destroyed when the call is due, the function is not called
+    - callFunc: function to call; it is called with no arguments
+    """
+    def __init__(self, master, callFunc):
+        self._master = master
+        self._callFunc = callFunc
+        self._afterID = None
+
+    def __call__(self, *args, **kwargs):
+        """Schedule a call; all arguments are ignored, so this can be used as a callback function
+        """
+        self.schedule()
+
+    def schedule(self):
+        """Schedule a call, if one is not already pending
+        """
+        if self._afterID is None:
+            self._afterID = self._master.after_idle(self._doCall)
+
+    def cancel(self):
+        """Cancel the pending call, if any
+        """
+        if self._afterID is not None:
+            try:
+                self._master.after_cancel(self._afterID)
+            except Tkinter.TclError:
+                pass
+            self._afterID = None
+
+    def callNow(self):
+        """Cancel the pending call, if any, and call the function now
+        """
+        self.cancel()
+        self._callFunc()
+
+    @property
+    def isPending(self):
+        """Return True if a call is pending
+        """
+        return self._afterID is not None
+
+    def _doCall(self):
+        self._afterID = None
+        try:
+            if not self._master.winfo_exists():
+                return
+        except Tkinter.TclError:
+            return
+        self._callFunc()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Call a function once when any of a group of keyVars changes.
+
+A widget that displays data from several keyVars often registers one update method
+as a callback on each of them. When an actor outputs a status block the method is then
+called once per keyVar, redoing the full update each time. KeyVarGroup instead
+records which keyVars changed and calls the function once, when Tk is next idle
+(see TUI.Base.IdleCaller), with the changed keyVars, so the widget can update only
+what is affected.
+
+Example:
+    self.keyVarGroup = TUI.Base.KeyVarGroup.KeyVarGroup(
+        master = self,
+        keyVarList = (model.temps, model.tempNames, model.tempAlarms),
+        callFunc = self._updTemps,
+    )
+    ...
+    def _updTemps(self, changedKeyVars):
+        ...
+"""
+import TUI.Base.IdleCaller
+
+__all__ = ["KeyVarGroup"]
+
+class KeyVarGroup(object):
+    """Call a function once when Tk is next idle after any of a group of keyVars changes.
+
+    Inputs:
+    - master: a Tk widget; if it has been destroyed when the call is due, the function is not called
+    - keyVarList: the keyVars to watch
+    - callFunc: function to call; it receives one argument: a list of the keyVars that changed
+        since it was last called, in the order they appear in keyVarList (each listed once)
+    - callNow: if True, call callFunc now with all keyVars (as keyVar.addCallback does)
+    """
+    def __init__(self, master, keyVarList, callFunc, callNow=False):
+        self.keyVarList = tuple(keyVarList)
+        self._callFunc = callFunc
+        # IDs of keyVars that have changed since the last call;
+        # keyVars are identified by id because they may not be hashable
+        self._changedIDSet = set()
+        self._idleCaller = TUI.Base.IdleCaller.IdleCaller(master, self._doCall)
+        for keyVar in self.keyVarList:
+            keyVar.addCallback(self._keyVarCallback, callNow=False)
+        if callNow:
+            self.callNow()
+
+    def callNow(self):
+        """Call callFunc now with all keyVars, cancelling the pending call, if any
+        """
+        self._changedIDSet = set(id(keyVar) for keyVar in self.keyVarList)
+        self._idleCaller.callNow()
+
+    def removeCallbacks(self):
+        """Stop watching the keyVars and cancel the pending call, if any
+        """
+        for keyVar in self.keyVarList:
+            keyVar.removeCallback(self._keyVarCallback, doRaise=False)
+        self._idleCaller.cancel()
+        self._changedIDSet = set()
+
+    def _keyVarCallback(self, keyVar):
+        """A keyVar changed; record it and schedule a call
+        """
+        self._changedIDSet.add(id(keyVar))
+        self._idleCaller.schedule()
+
+    def _doCall(self):
+        changedIDSet = self._changedIDSet
+        self._changedIDSet = set()
+        changedKeyVars = [keyVar for keyVar in self.keyVarList if id(keyVar) in changedIDSet]
+        self._callFunc(changedKeyVars)
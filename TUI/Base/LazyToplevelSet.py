@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""A ToplevelSet that can defer building a window until it is first wanted.
+
+A lazy window is registered by name along with a function that builds it.
+If the window is to be visible at startup (according to the geometry file or its default)
+it is built immediately; otherwise it is built the first time it is needed,
+e.g. when the user picks it from a menu or some code calls getToplevel or makeVisible.
+Until then none of its code runs: its module need not even be imported,
+so its widgets are not built and its keyVar callbacks are not registered.
+
+Warning: a lazy window records nothing until it is built, so do not register a window
+as lazy if it must accumulate data (e.g. log messages) while hidden.
+"""
+import RO.Wdg
+
+__all__ = ["LazyToplevelSet"]
+
+class LazyToplevelSet(RO.Wdg.ToplevelSet):
+    """A ToplevelSet that supports lazy windows; see module help for details.
+
+    Inputs are the same as RO.Wdg.ToplevelSet.
+    """
+    def __init__(self, *args, **kargs):
+        # dict of name: (build function, names of all windows it builds)
+        # for lazy windows that have not yet been built
+        self._lazyDict = {}
+        # if True then getToplevel returns a _LazyToplevelStandIn for unbuilt lazy windows
+        self._useStandIns = False
+        RO.Wdg.ToplevelSet.__init__(self, *args, **kargs)
+
+    def addLazyToplevel(self, name, buildFunc, defVisible=False):
+        """Register a lazy window.
+
+        Inputs:
+        - name: unique identifier for the Toplevel (see createToplevel)
+        - buildFunc: function that builds the window by calling createToplevel with this name;
+            it receives one argument: this ToplevelSet
+        - defVisible: default value for visible (as for createToplevel);
+            the window is built immediately if it is to be visible
+
+        Raise RuntimeError if a window with this name already exists.
+        """
+        self.addLazyToplevels([(name, defVisible)], buildFunc)
+
+    def addLazyToplevels(self, nameVisList, buildFunc):
+        """Register a group of lazy windows that are all built by one function.
+
+        Inputs:
+        - nameVisList: a list of (name, defVisible), one per window; see addLazyToplevel
+        - buildFunc: function that builds all of the windows by calling createToplevel once per window;
+            it receives one argument: this ToplevelSet
+
+        All the windows are built together: immediately if any is to be visible,
+        else the first time any of them is needed.
+
+        Raise RuntimeError if a window with any of these names already exists.
+        """
+        nameTuple = tuple(name for name, defVisible in nameVisList)
+        for name in nameTuple:
+            if name in self._lazyDict or self.getToplevel(name):
+                raise RuntimeError("toplevel %r already exists" % (name,))
+        for name, defVisible in nameVisList:
+            self.defVisDict[name] = bool(defVisible)
+            self._lazyDict[name] = (buildFunc, nameTuple)
+        for name in nameTuple:
+            if self.getDesVisible(name):
+                self._buildLazyToplevel(name)
+                break
+
+    def getNames(self, prefix=""):
+        """Return all window names of windows that start with the specified prefix
+        (or all names if prefix omitted), including lazy windows that have not yet been built.
+
+        The names are in alphabetical order, ignoring case.
+        The list includes toplevels that have been destroyed.
+        """
+        nameList = list(set(self.tlDict.keys()) | set(self._lazyDict.keys()))
+        nameList.sort(key=lambda s: s.lower())
+        if not prefix:
+            return nameList
+        return [name for name in nameList if name.startswith(prefix)]
+
+    def getToplevel(self, name):
+        """Return the named Toplevel, or None of it does not exist.
+
+        If the named Toplevel is a lazy window that has not been built, it is built.
+        """
+        if name in self._lazyDict:
+            if self._useStandIns:
+                return _LazyToplevelStandIn(self, name)
+            self._buildLazyToplevel(name)
+        return RO.Wdg.ToplevelSet.getToplevel(self, name)
+
+    def isBuilt(self, name):
+        """Return True unless name is a lazy window that has not yet been built.
+        """
+        return name not in self._lazyDict
+
+    def writeGeomVisFile(self, fileName=None, readFirst=True):
+        """Write toplevel geometry and visiblity info to a file
+        that readGeomVisFile can read.
+
+        Lazy windows that have not been built are not built;
+        the data recorded for them is that from the geometry file (if any).
+        """
+        self._useStandIns = True
+        try:
+            RO.Wdg.ToplevelSet.writeGeomVisFile(self, fileName=fileName, readFirst=readFirst)
+        finally:
+            self._useStandIns = False
+
+    def _buildLazyToplevel(self, name):
+        """Build a lazy window, and any other lazy windows built by the same function.
+
+        Raise RuntimeError if the build function did not create all of the windows.
+        """
+        buildFunc, nameTuple = self._lazyDict[name]
+        for groupName in nameTuple:
+            del self._lazyDict[groupName]
+        buildFunc(self)
+        missingNames = [groupName for groupName in nameTuple if groupName not in self.tlDict]
+        if missingNames:
+            raise RuntimeError("building lazy toplevel %r did not create %s" % \
+                (name, ", ".join(repr(groupName) for groupName in missingNames)))
+
+
+class _LazyToplevelStandIn(object):
+    """Supplies geometry file data for a lazy window that has not been built;
+    only supports the methods used by RO.Wdg.ToplevelSet.writeGeomVisFile.
+    """
+    def __init__(self, tlSet, name):
+        self.tlSet = tlSet
+        self.name = name
+
+    def getGeometry(self):
+        return self.tlSet.fileGeomDict.get(self.name, "")
+
+    def getVisible(self):
+        return False
+
+    def getDoSaveState(self):
+        return bool(self.tlSet.fileState.get(self.name))
+
+    def getStateIsDefault(self):
+        return self.tlSet.fileState.get(self.name, {}), False
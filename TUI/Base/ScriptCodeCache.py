@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""Cache compiled code for script files.
+
+getScriptCode returns the compiled code for a python source file,
+reusing previously compiled code if the file's modification time and size are unchanged.
+Compiled code is cached in memory and (by default) on disk in
+TUI.TUIPaths.getScriptCacheDir(), so that opening or reloading an unchanged script
+skips reading, parsing and compiling it, even in a new session.
+
+Files modified within the last few seconds are not cached,
+since a further edit might not change the modification time.
+"""
+import hashlib
+import marshal
+import os
+import sys
+import time
+try:
+    from importlib.util import MAGIC_NUMBER as _MagicNumber
+except ImportError:
+    import imp
+    _MagicNumber = imp.get_magic()
+import RO.StringUtil
+import TUI.TUIPaths
+
+__all__ = ["getScriptCode"]
+
+# files modified more recently than this (sec) are not cached
+_MinMTimeAge = 2.0
+
+# dict of absolute path: (modification time, size, code object)
+_CodeDict = {}
+
+def getScriptCode(filePath, useDiskCache=True):
+    """Return the compiled code for a python source file.
+
+    Inputs:
+    - filePath: path to python source file; the code is compiled with this file name
+    - useDiskCache: if True, look for (and save) compiled code on disk as well as in memory
+
+    Raises the usual exceptions if the file cannot be read or compiled.
+    """
+    absPath = os.path.abspath(filePath)
+    fileStat = os.stat(absPath)
+    mtime = fileStat.st_mtime
+    size = fileStat.st_size
+
+    cachedData = _CodeDict.get(absPath)
+    if cachedData and cachedData[0:2] == (mtime, size):
+        return cachedData[2]
+
+    cachePath = None
+    if useDiskCache:
+        cachePath = _getCachePath(absPath)
+        codeObj = _readCacheFile(cachePath, absPath, mtime, size)
+        if codeObj is not None:
+            _CodeDict[absPath] = (mtime, size, codeObj)
+            return codeObj
+
+    with open(filePath, "rb") as fp:
+        sourceStr = fp.read()
+    codeObj = compile(sourceStr, filePath, "exec")
+
+    # cache the code, unless the file was modified very recently or while it was being read
+    if os.path.getmtime(absPath) == mtime and mtime + _MinMTimeAge < time.time():
+        _CodeDict[absPath] = (mtime, size, codeObj)
+        if cachePath:
+            _writeCacheFile(cachePath, absPath, mtime, size, codeObj)
+    return codeObj
+
+def _getCachePath(absPath):
+    """Return the path of the disk cache file for a script, or None if it cannot be determined
+    """
+    try:
+        cacheDir = TUI.TUIPaths.getScriptCacheDir()
+    except Exception:
+        return None
+    if not isinstance(absPath, bytes):
+        absPath = absPath.encode("utf-8")
+    return os.path.join(cacheDir, hashlib.md5(absPath).hexdigest() + ".code")
+
+def _readCacheFile(cachePath, absPath, mtime, size):
+    """Return compiled code from a disk cache file, or None if not available or out of date
+    """
+    if not cachePath or not os.path.isfile(cachePath):
+        return None
+    try:
+        with open(cachePath, "rb") as fp:
+            magic, cachedPath, cachedMTime, cachedSize, codeObj = marshal.load(fp)
+    except Exception:
+        return None
+    if (magic, cachedPath, cachedMTime, cachedSize) != (_MagicNumber, absPath, mtime, size):
+        return None
+    return codeObj
+
+def _writeCacheFile(cachePath, absPath, mtime, size, codeObj):
+    """Write compiled code to a disk cache file; report failure on stderr but otherwise ignore it
+    """
+    try:
+        cacheDir = os.path.dirname(cachePath)
+        if not os.path.isdir(cacheDir):
+            os.makedirs(cacheDir)
+        # write to a temporary file, then rename, so a partial file is never read
+        tempPath = cachePath + ".tmp"
+        with open(tempPath, "wb") as fp:
+            marshal.dump((_MagicNumber, absPath, mtime, size, codeObj), fp)
+        if os.path.exists(cachePath):
+            os.remove(cachePath)
+        os.rename(tempPath, cachePath)
+    except Exception as e:
+        sys.stderr.write("Could not cache compiled script %s: %s\n" % (absPath, RO.StringUtil.strFromException(e)))
@@ -0,0 +1,114 @@
+"""Versions of RO.Wdg labels that skip redundant updates.
+
+Most keyword callbacks set their widgets whenever the keyword is output, even if nothing changed
+(e.g. the TCC status widgets are set once per second, though most values are static).
+RO.Wdg.Label.set already ignores unchanged isCurrent and severity, but always sets the text,
+which is a Tcl "configure" call and may re-layout the widget.
+
+The labels in this module remember the displayed text and do not set it again if it is unchanged.
+Module functions getLabelUpdateCounts and resetLabelUpdateCounts report how many updates were skipped.
+
+Warning: set the text of these labels using set (or clear); if you set the text
+using configure or wdg["text"] = ..., the cached text is discarded, which is safe but slower.
+"""
+__all__ = ['ChangeFilterLabelMixin', 'BoolLabel', 'StrLabel', 'IntLabel', 'FloatLabel', 'DMSLabel',
+    'getLabelUpdateCounts', 'resetLabelUpdateCounts']
+
+import sys
+import RO.Wdg
+
+# counts of calls to set for all labels in this module: number of calls, number that changed nothing
+_UpdateCounts = [0, 0]
+
+def getLabelUpdateCounts():
+    """Return (number of calls to set, number of calls to set that were skipped because nothing changed)
+    for all labels in this module
+    """
+    return tuple(_UpdateCounts)
+
+def resetLabelUpdateCounts():
+    """Reset the counts returned by getLabelUpdateCounts
+    """
+    _UpdateCounts[:] = [0, 0]
+
+
+class ChangeFilterLabelMixin(object):
+    """Mixin for RO.Wdg.Label and subclasses that skips redundant updates.
+
+    Inherit from this class AND THEN from RO.Wdg.Label or one of its subclasses.
+    """
+    _displayedText = None # text displayed by the widget; None if unknown
+
+    def set(self,
+        value,
+        isCurrent = True,
+        severity = None,
+    **kargs):
+        """Set the value; do nothing if the displayed text, isCurrent and severity would not change.
+
+        Inputs are as for RO.Wdg.Label.set.
+        """
+        _UpdateCounts[0] += 1
+        if bool(isCurrent) == self.getIsCurrent() \
+            and severity in (None, self.getSeverity()) \
+            and self._formatValue(value) == self._displayedText:
+            _UpdateCounts[1] += 1
+            self._value = value
+            return
+        RO.Wdg.Label.set(self, value, isCurrent=isCurrent, severity=severity)
+
+    def configure(self, cnf=None, **kargs):
+        if "text" in kargs or (cnf and "text" in cnf):
+            self._displayedText = None
+        return RO.Wdg.Label.configure(self, cnf, **kargs)
+    config = configure
+
+    def __setitem__(self, key, value):
+        if key == "text":
+            self._displayedText = None
+        RO.Wdg.Label.__setitem__(self, key, value)
+
+    def _formatValue(self, value):
+        """Return value formatted for display
+        """
+        if value is None:
+            return ""
+        try:
+            return self._formatFunc(value)
+        except Exception as e:
+            sys.stderr.write("format of value %r failed with error: %s\n" % (value, e))
+            return "?%r?" % (value,)
+
+    def _updateText(self):
+        """Update the displayed value, if changed. Ignores isCurrent and severity.
+        """
+        text = self._formatValue(self._value)
+        if text != self._displayedText:
+            RO.Wdg.Label.configure(self, text=text)
+            self._displayedText = text
+
+
+class BoolLabel(ChangeFilterLabelMixin, RO.Wdg.BoolLabel):
+    """RO.Wdg.BoolLabel that skips redundant updates
+    """
+    pass
+
+class StrLabel(ChangeFilterLabelMixin, RO.Wdg.StrLabel):
+    """RO.Wdg.StrLabel that skips redundant updates
+    """
+    pass
+
+class IntLabel(ChangeFilterLabelMixin, RO.Wdg.IntLabel):
+    """RO.Wdg.IntLabel that skips redundant updates
+    """
+    pass
+
+class FloatLabel(ChangeFilterLabelMixin, RO.Wdg.FloatLabel):
+    """RO.Wdg.FloatLabel that skips redundant updates
+    """
+    pass
+
+class DMSLabel(ChangeFilterLabelMixin, RO.Wdg.DMSLabel):
+    """RO.Wdg.DMSLabel that skips redundant updates
+    """
+    pass
@@ -22,6 +22,7 @@ import RO.AddCallback
 import RO.Wdg
 import opscore.actor
 from .StatusBar import StatusBar
+from ..ScriptCodeCache import getScriptCode
 import importlib
 
 # compute _StateSevDict which contains
@@ -494,7 +495,7 @@ class ScriptFileWdg(_BaseUserScriptWdg):
         """
 #       print "_getScriptFuncs(%s)" % isFirst
         scriptLocals = {"__file__": self.fullPath}
-        exec(compile(open(self.filename, "rb").read(), self.filename, 'exec'), scriptLocals)
+        exec(getScriptCode(self.filename), scriptLocals)
         
         retDict = {}
         helpURL = scriptLocals.get("HelpURL")
@@ -1,3 +1,4 @@
+from .Label import *
 from .StatusBar import *
 from .FocusWdg import *
 from .ScriptWdg import *
@@ -18,6 +18,7 @@ History:
 import Tkinter
 import RO.Constants
 import RO.Wdg
+import TUI.Base.KeyVarGroup
 import TUI.Models
 
 _DataWidth = 7 # width of data columns
@@ -162,17 +163,23 @@ class TelemetryWdgSet(object):
         # (name, current temperature, minimum temperature, maximum temperature)
         self.tempWdgSet = []
 
-        self.model.arrayPower.addCallback(self._updTelemetry, callNow = False)
-        self.model.vacuum.addCallback(self._updTelemetry, callNow = False)
-        self.model.vacuumAlarm.addCallback(self._updTelemetry, callNow = False)
-        self.model.vacuumThreshold.addCallback(self._updTelemetry, callNow = False)
-        self.model.ln2Level.addCallback(self._updTelemetry, callNow = False)
-        self.model.ln2Alarm.addCallback(self._updTelemetry, callNow = False)
-        self.model.ln2Threshold.addCallback(self._updTelemetry, callNow = False)
-        self.model.tempNames.addCallback(self._updTelemetry, callNow = False)
-        self.model.temps.addCallback(self._updTelemetry, callNow = False)
-        self.model.tempAlarms.addCallback(self._updTelemetry, callNow = False)
-        self.model.tempThresholds.addCallback(self._updTelemetry, callNow = False)
+        # dict of section name: (severity, isCurrent) for the summary
+        self._sectionStateDict = {}
+        # sections of telemetry: (section name, update method, keyVars)
+        self._sectionList = (
+            ("arrayPower", self._updArrayPower, (self.model.arrayPower,)),
+            ("vacuum", self._updVacuum,
+                (self.model.vacuum, self.model.vacuumAlarm, self.model.vacuumThreshold)),
+            ("ln2", self._updLN2,
+                (self.model.ln2Level, self.model.ln2Alarm, self.model.ln2Threshold)),
+            ("temps", self._updTemps,
+                (self.model.tempNames, self.model.temps, self.model.tempAlarms, self.model.tempThresholds)),
+        )
+        self.keyVarGroup = TUI.Base.KeyVarGroup.KeyVarGroup(
+            master = master,
+            keyVarList = [keyVar for sectionInfo in self._sectionList for keyVar in sectionInfo[2]],
+            callFunc = self._updTelemetry,
+        )
         
         self.showHideWdg.addCallback(self._doShowHide, callNow = True)
     
@@ -241,29 +248,46 @@ class TelemetryWdgSet(object):
         }
         self.gridder.showHideWdg (**argDict)
 
-    def _updTelemetry(self, *args, **kargs):
-        """Update telemetry data"""
-        allCurrent = True
-        allSeverity = RO.Constants.sevNormal
-        
-        # array power; note that ? is the normal state so only Off is bad
+    def _updTelemetry(self, changedKeyVars=None):
+        """Update telemetry data
 
-        allCurrent = allCurrent and self.model.arrayPower.isCurrent
+        Inputs:
+        - changedKeyVars: keyVars that have changed; only sections using these keyVars
+            (and sections not yet shown) are updated. If None then all sections are updated.
+        """
+        changedIDSet = None if changedKeyVars is None else set(id(keyVar) for keyVar in changedKeyVars)
+        for sectionName, updFunc, keyVarList in self._sectionList:
+            if changedIDSet is None or sectionName not in self._sectionStateDict \
+                or any(id(keyVar) in changedIDSet for keyVar in keyVarList):
+                self._sectionStateDict[sectionName] = updFunc()
+
+        allSeverity = max(severity for severity, isCurrent in self._sectionStateDict.values())
+        allCurrent = all(isCurrent for severity, isCurrent in self._sectionStateDict.values())
+        summaryStr = {
+            RO.Constants.sevNormal: "OK",
+            RO.Constants.sevWarning: "Warning",
+            RO.Constants.sevError: "Bad",
+        }.get(allSeverity, "?")
+        self.summaryWdg.set(summaryStr, isCurrent = allCurrent, severity = allSeverity)
 
+    def _updArrayPower(self):
+        """Update array power widgets; return (severity, isCurrent)
+        """
+        # note that ? is the normal state so only Off is bad
+        isCurrent = self.model.arrayPower.isCurrent
         arrayStr = {False: "Off", True: "On"}.get(self.model.arrayPower[0], "?")
         if arrayStr == "Off":
             arraySev = RO.Constants.sevWarning
         else:
             arraySev = RO.Constants.sevNormal
         self.arrayPowerWdgSet[0].setSeverity(arraySev)
-        self.arrayPowerWdgSet[1].set(arrayStr,
-            isCurrent = self.model.arrayPower.isCurrent, severity = arraySev)
-        allSeverity = max(allSeverity, arraySev)
-        
-        # vacuum
-        
-        allCurrent = allCurrent and \
-            self.model.vacuum.isCurrent and \
+        self.arrayPowerWdgSet[1].set(arrayStr, isCurrent = isCurrent, severity = arraySev)
+        return arraySev, isCurrent
+
+    def _updVacuum(self):
+        """Update vacuum widgets; return (severity, isCurrent)
+        """
+        isCurrent = self.model.vacuum.isCurrent and \
             self.model.vacuumAlarm.isCurrent and \
             self.model.vacuumThreshold.isCurrent
 
@@ -276,15 +300,15 @@ class TelemetryWdgSet(object):
             isCurrent = self.model.vacuum.isCurrent, severity = vacuumSev)
         self.vacuumWdgSet[2].set(self.model.vacuumThreshold[0],
             isCurrent = self.model.vacuumThreshold.isCurrent, severity = vacuumSev)
-        allSeverity = max(allSeverity, vacuumSev)
         
         # alternate vacuum gauge (which has no associated alarm or limits)
         self.altVacuumWdgSet[1].set(self.model.vacuumAlt[0], isCurrent = self.model.vacuumAlt)
+        return vacuumSev, isCurrent
 
-        # liquid nitrogen
-        
-        allCurrent = allCurrent and \
-            self.model.ln2Level.isCurrent and \
+    def _updLN2(self):
+        """Update liquid nitrogen widgets; return (severity, isCurrent)
+        """
+        isCurrent = self.model.ln2Level.isCurrent and \
             self.model.ln2Alarm.isCurrent and \
             self.model.ln2Threshold.isCurrent
 
@@ -296,18 +320,19 @@ class TelemetryWdgSet(object):
         self.ln2WdgSet[1].set(self.model.ln2Level[0], isCurrent = self.model.ln2Level.isCurrent, severity = ln2Sev)
         self.ln2WdgSet[2].set(self.model.ln2Threshold[0],
                      isCurrent = self.model.ln2Threshold.isCurrent, severity = ln2Sev)
-        allSeverity = max(allSeverity, ln2Sev)
-        
-        # temperatures
+        return ln2Sev, isCurrent
 
+    def _updTemps(self):
+        """Update temperature widgets; return (severity, isCurrent)
+        """
         tempNames = self.model.tempNames
         temps = self.model.temps
         tempAlarms = self.model.tempAlarms
         tempThresholds = self.model.tempThresholds
 
         if () in (tempNames, temps, tempAlarms):
-            return
-        allCurrent = allCurrent and tempNames.isCurrent and temps.isCurrent and \
+            return RO.Constants.sevNormal, False
+        isCurrent = tempNames.isCurrent and temps.isCurrent and \
             tempAlarms.isCurrent and tempThresholds.isCurrent
 
         if not (len(temps) == len(tempNames) == len(tempAlarms) == len(tempThresholds)):
@@ -319,7 +344,7 @@ class TelemetryWdgSet(object):
             for wdgSet in self.tempWdgSet:
                 for wdg in wdgSet:
                     wdg.setNotCurrent()
-            return
+            return RO.Constants.sevNormal, False
             
         tempSet = list(zip(tempNames, temps, tempThresholds))
         isCurrSet = tempNames.isCurrent, temps.isCurrent, tempThresholds.isCurrent
@@ -329,6 +354,7 @@ class TelemetryWdgSet(object):
             self._addTempWdgRow()
         
         # set widgets
+        tempSev = RO.Constants.sevNormal
         for ii in range(len(tempSet)):
             wdgSet = self.tempWdgSet[ii]
             infoSet = tempSet[ii]
@@ -338,17 +364,10 @@ class TelemetryWdgSet(object):
             if tCurr is not None:
                 if tempAlarms[ii]:
                     sevSet = [RO.Constants.sevError] * 4
-                    allSeverity = max(allSeverity, RO.Constants.sevError)
+                    tempSev = RO.Constants.sevError
 
             for wdg, info, isCurr, severity in zip(wdgSet, infoSet, isCurrSet, sevSet):
                 wdg.set(info, isCurrent = isCurr, severity = severity)
-
-        summaryStr = {
-            RO.Constants.sevNormal: "OK",
-            RO.Constants.sevWarning: "Warning",
-            RO.Constants.sevError: "Bad",
-        }.get(allSeverity, "?")
-        self.summaryWdg.set(summaryStr, isCurrent = allCurrent, severity = allSeverity)
     
         # delete extra widgets, if any
         for ii in range(len(tempSet), len(self.tempWdgSet)):
@@ -356,7 +375,7 @@ class TelemetryWdgSet(object):
             for wdg in wdgSet:
                 wdg.grid_forget()
                 del(wdg)
-
+        return tempSev, isCurrent
 
 if __name__ == '__main__':
     import TUI.Base.Wdg
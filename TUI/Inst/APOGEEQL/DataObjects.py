@@ -21,10 +21,28 @@ History:
                     - added sharedValue setter.
                     - added __iter__ and __len__ methods.
 """
-class DataList(object):
+import bisect
+import collections
+import RO.AddCallback
+
+# types of change reported by DataList callbacks
+Insert = "insert"   # an item was inserted
+Replace = "replace" # an item replaced an item with the same unique value
+Reset = "reset"     # the list was cleared, or was cleared and then had one item added
+
+# Description of a change to a DataList, as reported to its callback functions:
+# - changeType: one of Insert, Replace or Reset
+# - index: index of the inserted or replaced item; None for Reset
+# - item: the inserted or replacement item; None for Reset
+# - oldItem: the replaced item; None for Insert and Reset
+DataListChange = collections.namedtuple("DataListChange", "changeType index item oldItem")
+
+class DataList(RO.AddCallback.BaseMixin):
     """Hold a sorted collection of data items having the same value of one attribute and a unique value of another.
+
+    The items are kept sorted as they are added, and each change is reported to the callback functions.
     """
-    def __init__(self, sharedName, uniqueName):
+    def __init__(self, sharedName, uniqueName, callFunc=None):
         """Create a DataList
         
         @param[in] sharedName: name of data item attribute whose value will be the same for all items;
@@ -32,11 +50,16 @@ class DataList(object):
         @param[in] uniqueName: name of data item attribute whose value will be unique for all items;
             if an item is added with a duplicate unique value, the old item is replaced.
             Also used to sort the data returned by getList.
+        @param[in] callFunc: function to call when the list changes; it receives two arguments:
+            this DataList and a DataListChange describing the change.
+            If you add a callback with callNow=True, it is called with a Reset change.
         """
         self._sharedName = sharedName
         self._uniqueName = uniqueName
         self._sharedValue = None
         self._itemDict = dict()    # dict of uniqueValue: data item
+        self._uniqueValueList = [] # unique values of the items, in sorted order
+        RO.AddCallback.BaseMixin.__init__(self, callFunc=callFunc)
     
     def addItem(self, item):
         """Add a data item
@@ -49,23 +72,34 @@ class DataList(object):
         """
         sharedValue = getattr(item, self._sharedName)
         uniqueValue = getattr(item, self._uniqueName)
-        didReset = False
         if sharedValue != self._sharedValue:
-            self._itemDict = dict()
             self._sharedValue = sharedValue
-            didReset = True
+            self._itemDict = {uniqueValue: item}
+            self._uniqueValueList = [uniqueValue]
+            self._doCallbacks()
+            return True
+
+        index = bisect.bisect_left(self._uniqueValueList, uniqueValue)
+        oldItem = self._itemDict.get(uniqueValue)
         self._itemDict[uniqueValue] = item
-        return didReset
+        if oldItem is None:
+            self._uniqueValueList.insert(index, uniqueValue)
+            self._doCallbacks(DataListChange(Insert, index, item, None))
+        else:
+            self._doCallbacks(DataListChange(Replace, index, item, oldItem))
+        return False
     
     def clear(self):
         """Clear the data list
         """
         self._itemDict = dict()
+        self._uniqueValueList = []
+        self._doCallbacks()
     
     def getList(self):
         """Return the data items as a list sorted by their unique values.
         """
-        return [self._itemDict[k] for k in sorted(self._itemDict.keys())]
+        return [self._itemDict[k] for k in self._uniqueValueList]
     
     @property
     def sharedName(self):
@@ -94,11 +128,25 @@ class DataList(object):
         self._sharedValue = sharedValue
         self.clear()
     
+    def _doCallbacks(self, change=None):
+        """Call the callback functions
+
+        @param[in] change: a DataListChange; if None then a Reset change is reported
+        """
+        if change is None:
+            change = DataListChange(Reset, None, None, None)
+        self._basicDoCallbacks(self, change)
+
+    def __getitem__(self, ind):
+        """Return the item at the specified index (in order of unique value)
+        """
+        return self._itemDict[self._uniqueValueList[ind]]
+
     def __iter__(self):
         return iter(self.getList())
 
     def __len__(self):
-        return len(self._itemDict)
+        return len(self._uniqueValueList)
         
 
 class ExpData(object):
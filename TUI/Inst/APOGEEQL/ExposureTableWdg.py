@@ -17,6 +17,7 @@ import math
 import Tkinter
 import RO.Constants
 import RO.Wdg
+import TUI.Base.IdleCaller
 import TUI.Models
 from . import DataObjects
 
@@ -25,23 +26,38 @@ def fmt2(f1, f2):
     """
     return "%.1f/%.1f" % (f1, f2)
 
+# text widget tag for predicted exposures
+_PredTag = "pred"
+
 class ExposureTableWdg(Tkinter.Frame):
     def __init__(self, master, width=40, helpURL=None):
         """Create an exposure table
+
+        The table is drawn from scratch when the plate ID or exposure type changes;
+        otherwise only the rows for new or replaced exposures and the totals are updated.
         """
         Tkinter.Frame.__init__(self, master)
 
         self.expDataList = DataObjects.DataList(
             sharedName = "plateIDExpType",
             uniqueName = "expNum",
+            callFunc = self._expDataListCallback,
         )
         self.predExpDataList = DataObjects.DataList(
             sharedName = "plateIDExpType",
             uniqueName = "expNum",
+            callFunc = self._predExpDataListCallback,
         )
+        # net exposure time and sum of snrGoal^2 of predicted exposures, updated as exposures are added
+        self._netPredExpTime = 0
+        self._netPredSNRSq = 0
+        # is exposure data displayed?
+        self._showingData = False
+
+        # redraw when idle, to handle bursts of data efficiently
+        self._redrawCaller = TUI.Base.IdleCaller.IdleCaller(self, self.redraw)
 
         qlModel = TUI.Models.getModel("apogeeql")
-        qlModel.exposureData.addCallback(self._exposureDataCallback)
         
         self.headerWdg = RO.Wdg.Text(
             master = self,
@@ -64,6 +80,8 @@ class ExposureTableWdg(Tkinter.Frame):
         )
         self.logWdg.grid(row=1, column=0, sticky="news")
         self.logWdg.text.configure(font="Courier")
+        warningColorPref = RO.Wdg.WdgPrefs.getSevPrefDict()[RO.Constants.sevWarning]
+        warningColorPref.addCallback(self._updPredColor, callNow=True)
         self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
@@ -78,7 +96,6 @@ class ExposureTableWdg(Tkinter.Frame):
             return
         self.predExpDataList.addItem(DataObjects.PredExpData(keyVar))
         self.expDataList.sharedValue = self.predExpDataList.sharedValue
-        self.redraw()
     
     def _exposureDataCallback(self, keyVar):
         """New exposureData seen
@@ -87,14 +104,121 @@ class ExposureTableWdg(Tkinter.Frame):
             return
         self.expDataList.addItem(DataObjects.ExpData(keyVar))
         self.predExpDataList.sharedValue = self.expDataList.sharedValue
-        self.redraw()
 
-    
+    def _expDataListCallback(self, dataList, change):
+        """self.expDataList changed; update the affected row and the totals
+        """
+        if self._needRedraw(change):
+            return
+
+        lineNum = change.index + 1
+        if change.changeType == DataObjects.Insert:
+            self._insertLine(lineNum, self._formatExpData(change.item))
+        else:
+            self._replaceLine(lineNum, self._formatExpData(change.item))
+        if change.index == len(self.expDataList) - 1:
+            # the net values come from the last exposure
+            self._showTotals()
+
+    def _predExpDataListCallback(self, dataList, change):
+        """self.predExpDataList changed; update the affected row and the totals
+        """
+        if self._needRedraw(change):
+            return
+
+        lineNum = self._predStartLineNum + change.index
+        if change.changeType == DataObjects.Insert:
+            if len(self.predExpDataList) == 1:
+                # add a line for Done+Pred totals
+                self._insertLine(lineNum, "", tags=(_PredTag,))
+            self._insertLine(lineNum, self._formatPredExpData(change.item), tags=(_PredTag,))
+        else:
+            self._replaceLine(lineNum, self._formatPredExpData(change.item), tags=(_PredTag,))
+            self._netPredExpTime -= change.oldItem.expTime
+            self._netPredSNRSq -= change.oldItem.snrGoal**2
+        self._netPredExpTime += change.item.expTime
+        self._netPredSNRSq += change.item.snrGoal**2
+        self._showTotals()
+
+    def _needRedraw(self, change):
+        """Return True if the table must be redrawn from scratch to show this change,
+        in which case a redraw is scheduled
+        """
+        if change.changeType == DataObjects.Reset or not self._showingData or self._redrawCaller.isPending:
+            self._redrawCaller.schedule()
+            return True
+        return False
+
+    @property
+    def _predStartLineNum(self):
+        """Text line number of the first predicted exposure
+        """
+        return len(self.expDataList) + 3
+
+    def _formatExpData(self, d):
+        """Format a table row for an ExpData
+        """
+        return "%2d  %8s %7.1f %3d   %3s   %5.1f" % \
+            (d.expNum, d.expName, d.expTime, d.nReads, d.namedDitherPosition, d.snr)
+
+    def _formatPredExpData(self, d):
+        """Format a table row for a PredExpData
+        """
+        return "%2d  %8s %7.1f %3d   %3s   %5.1f" % \
+            (d.expNum, d.expName, d.expTime, d.nReads, d.namedDitherPosition, d.snrGoal)
+
+    def _appendLine(self, text, tags=()):
+        """Append a line of text to the table
+        """
+        self.logWdg.text.insert("end", text + "\n", tags)
+
+    def _insertLine(self, lineNum, text, tags=()):
+        """Insert a line of text in the table before the specified line number (1 is the first line)
+        """
+        self.logWdg.text.insert("%d.0" % (lineNum,), text + "\n", tags)
+
+    def _replaceLine(self, lineNum, text, tags=()):
+        """Replace the line of text at the specified line number (1 is the first line)
+        """
+        startInd = "%d.0" % (lineNum,)
+        self.logWdg.text.delete(startInd, "%s lineend" % (startInd,))
+        self.logWdg.text.insert(startInd, text, tags)
+
+    def _showTotals(self):
+        """Show Net Done and (if there are predicted exposures) Done+Pred
+        """
+        netRealExpTime = 0
+        netRealSNR = 0
+        if self.expDataList:
+            lastExpData = self.expDataList[-1]
+            netRealExpTime = lastExpData.netExpTime
+            netRealSNR = lastExpData.netSNR
+        self._replaceLine(len(self.expDataList) + 1, "Net Done     %7.1f             %5.1f" % \
+            (netRealExpTime, netRealSNR),
+        )
+
+        if self.predExpDataList:
+            totalExpTime = netRealExpTime + self._netPredExpTime
+            totalSNR = math.sqrt(netRealSNR**2 + max(self._netPredSNRSq, 0))
+            self._replaceLine(self._predStartLineNum + len(self.predExpDataList),
+                "Done+Pred    %7.1f             %5.1f" % (totalExpTime, totalSNR),
+                tags=(_PredTag,),
+            )
+
+    def _updPredColor(self, color, colorPref=None):
+        """Set the color of predicted exposures
+        """
+        self.logWdg.text.tag_configure(_PredTag, foreground=color)
+
     def redraw(self):
+        """Display the current data
+        """
+        self._redrawCaller.cancel()
         self.headerWdg.delete("1.0", "end")
         self.logWdg.clearOutput()
 
-        if self.expDataList or self.predExpDataList:
+        self._showingData = bool(self.expDataList or self.predExpDataList)
+        if self._showingData:
             plateID, expType = self.expDataList.sharedValue
             self.headerWdg.insert("end", "%s Exposures for Plate %s\n" % (expType, plateID), "title")
             self.headerWdg.insert("end", "\nNum   Name     Time  Reads Dither S/N", "header")
@@ -102,43 +226,22 @@ class ExposureTableWdg(Tkinter.Frame):
             self.headerWdg.insert("end", "No Exposure Data", "title")
             return
         
-        netRealExpTime = 0
-        netRealSNR = 0
-        if self.expDataList:
-            for d in self.expDataList:
-                self.logWdg.addOutput("%2d  %8s %7.1f %3d   %3s   %5.1f\n" % \
-                    (d.expNum, d.expName, d.expTime, d.nReads, d.namedDitherPosition, d.snr),
-                )
-                netRealExpTime = d.netExpTime
-                netRealSNR = d.netSNR
-
-        self.logWdg.addOutput("Net Done     %7.1f             %5.1f\n\n" % \
-            (netRealExpTime, netRealSNR),
-            severity=RO.Constants.sevNormal,
-        )
-        
-        if self.predExpDataList:
-            netPredExpTime = 0
-            netPredSNRSq = 0
+        for d in self.expDataList:
+            self._appendLine(self._formatExpData(d))
+        self._appendLine("") # Net Done
+        self._appendLine("")
 
+        self._netPredExpTime = 0
+        self._netPredSNRSq = 0
+        if self.predExpDataList:
             for d in self.predExpDataList:
-                self.logWdg.addOutput("%2d  %8s %7.1f %3d   %3s   %5.1f\n" % \
-                    (d.expNum, d.expName, d.expTime, d.nReads, d.namedDitherPosition, d.snrGoal),
-                    severity=RO.Constants.sevWarning,
-                )
-                netPredExpTime += d.expTime
-                netPredSNRSq += d.snrGoal**2
-            
-            totalExpTime = netRealExpTime + netPredExpTime
-            totalSNR = math.sqrt(netRealSNR**2 + netPredSNRSq)
-
-            self.logWdg.addOutput("Done+Pred    %7.1f             %5.1f" % \
-                (totalExpTime, totalSNR),
-                severity=RO.Constants.sevWarning,
-            )
+                self._appendLine(self._formatPredExpData(d), tags=(_PredTag,))
+                self._netPredExpTime += d.expTime
+                self._netPredSNRSq += d.snrGoal**2
+            self._appendLine("", tags=(_PredTag,)) # Done+Pred
+        self._showTotals()
         
 
-
 if __name__ == '__main__':
     root = RO.Wdg.PythonTk()
 
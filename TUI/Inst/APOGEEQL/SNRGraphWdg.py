@@ -30,9 +30,13 @@ import numpy
 import matplotlib
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import RO.Wdg
+import TUI.Base.IdleCaller
 import TUI.Models
 from . import DataObjects
 
+# initial length of the arrays of read data; the arrays grow as needed
+_InitialNumReads = 64
+
 class HVLine(object):
     """A horizontal or vertical line on a matplotlib Axes object
     
@@ -56,22 +60,31 @@ class HVLine(object):
     
     def show(self, value):
         """Show a line with the specified value; None clears the line
+
+        Return True if the line changed, False if the line is already shown at this value
         """
-        self.clear()
         if value is None:
-            return
+            return self.clear()
+        if self.line and value == self.currValue:
+            return False
 
+        self.clear()
         self.line = self.lineFunc(value, **self.lineKeyArgs)
         self.currValue = value
+        return True
     
     def clear(self):
         """Clear the line
+
+        Return True if a line was cleared, False if no line was shown
         """
-        if self.line:
-            try:
-                self.axes.lines.remove(self.line)
-            finally:
-                self.line = None
+        if not self.line:
+            return False
+        try:
+            self.axes.lines.remove(self.line)
+        finally:
+            self.line = None
+        return True
         
 
 class SNRGraphWdg(Tkinter.Frame):
@@ -91,12 +104,20 @@ class SNRGraphWdg(Tkinter.Frame):
         - marker: marker shape, e.g. "+"
         - markersize
         - markeredgewidth (basically thickness)
+
+        The data and fit lines are animated: they are drawn over a saved background (using blitting)
+        when a read is added, and the whole graph is only drawn when the axes or static lines change.
         """
         Tkinter.Frame.__init__(self, master)
 
+        # read number and S/N^2 of the reads in utrReadDataList; only the first _numReads elements are used
+        self._readNumArr = numpy.zeros(_InitialNumReads)
+        self._snrSqArr = numpy.zeros(_InitialNumReads)
+        self._numReads = 0
         self.utrReadDataList = DataObjects.DataList(
             sharedName = "expNum",
             uniqueName = "readNum",
+            callFunc = self._utrReadDataListCallback,
         )
         qlModel = TUI.Models.getModel("apogeeql")
         
@@ -108,13 +129,21 @@ class SNRGraphWdg(Tkinter.Frame):
         self.grid_columnconfigure(0, weight=1)
 
         self.axes = self.figure.add_subplot(1, 1, 1)
-        self.dataLine = matplotlib.lines.Line2D([], [], linestyle="", marker="+")
-        self.fitLine = matplotlib.lines.Line2D([], [], linestyle="dotted")
+        self.dataLine = matplotlib.lines.Line2D([], [], linestyle="", marker="+", animated=True)
+        self.fitLine = matplotlib.lines.Line2D([], [], linestyle="dotted", animated=True)
         self.axes.add_line(self.dataLine)
         self.axes.add_line(self.fitLine)
         self.snrGoalLine = HVLine(self.axes, isHoriz=True, color="green")
         self.estReadsLine = HVLine(self.axes, isHoriz=False, color="green")
         self.axes.set_title("S/N^2 at H=12.0 vs. UTR Read")
+
+        # graph without the animated lines, saved after each full draw; None until the first draw
+        self._background = None
+        self.canvas.mpl_connect("draw_event", self._drawEventCallback)
+
+        # redraw when idle, to handle bursts of data efficiently
+        self._drawCaller = TUI.Base.IdleCaller.IdleCaller(self, self.canvas.draw)
+        self._utrPlotCaller = TUI.Base.IdleCaller.IdleCaller(self, self._plotUTRData)
         
         qlModel.exposureData.addCallback(self._exposureDataCallback)
         qlModel.snrAxisRange.addCallback(self._snrAxisRangeCallback)
@@ -125,17 +154,22 @@ class SNRGraphWdg(Tkinter.Frame):
         """
         snrGoal = keyVar[5]
         if snrGoal is None or snrGoal <= 0:
-            self.snrGoalLine.clear()
+            didChange = self.snrGoalLine.clear()
         else:
-            self.snrGoalLine.show(snrGoal**2)
+            didChange = self.snrGoalLine.show(snrGoal**2)
+        if didChange:
+            self._drawCaller.schedule()
             
     def _snrAxisRangeCallback(self, keyVar):
         """snrAxisRange has been updated
         """
         if None in keyVar:
             return
-        self.axes.set_ylim(keyVar[0]**2, keyVar[1]**2, auto=False)
-        self.canvas.draw()
+        yLim = (keyVar[0]**2, keyVar[1]**2)
+        if tuple(self.axes.get_ylim()) == yLim:
+            return
+        self.axes.set_ylim(yLim[0], yLim[1], auto=False)
+        self._drawCaller.schedule()
 
     def _utrDataCallback(self, keyVar):
         """utrData keyVar callback
@@ -143,50 +177,108 @@ class SNRGraphWdg(Tkinter.Frame):
         if keyVar[0] is None:
             return
         self.utrReadDataList.addItem(DataObjects.UTRData(keyVar))
-        dataList = self.utrReadDataList.getList()
-        
-        numList = [elt.readNum for elt in dataList]
-        snrSqList = [elt.snr**2 for elt in dataList]
+        self._utrPlotCaller.schedule()
+
+    def _utrReadDataListCallback(self, dataList, change):
+        """utrReadDataList changed; update the arrays of read data
+        """
+        if change.changeType == DataObjects.Reset:
+            self._numReads = 0
+            for utrData in dataList:
+                self._insertRead(self._numReads, utrData)
+        elif change.changeType == DataObjects.Insert:
+            self._insertRead(change.index, change.item)
+        else:
+            self._readNumArr[change.index] = change.item.readNum
+            self._snrSqArr[change.index] = change.item.snr**2
+
+    def _insertRead(self, ind, utrData):
+        """Insert the data for one read into the arrays of read data, growing them if necessary
+        """
+        numReads = self._numReads
+        if numReads >= len(self._readNumArr):
+            self._readNumArr = numpy.resize(self._readNumArr, 2 * numReads)
+            self._snrSqArr = numpy.resize(self._snrSqArr, 2 * numReads)
+        if ind < numReads:
+            # reads normally arrive in order, so this is rare
+            self._readNumArr[ind+1:numReads+1] = self._readNumArr[ind:numReads].copy()
+            self._snrSqArr[ind+1:numReads+1] = self._snrSqArr[ind:numReads].copy()
+        self._readNumArr[ind] = utrData.readNum
+        self._snrSqArr[ind] = utrData.snr**2
+        self._numReads = numReads + 1
+
+    def _plotUTRData(self):
+        """Plot the UTR data and fit
+
+        Draw the whole graph if the x axis or the estimated reads line changed,
+        else only draw the data and fit lines.
+        """
+        numReads = self._numReads
         estReads = None
         nReads = None
         fitCoeffs = None
-        self.dataLine.set_data(numList, snrSqList)
-        if numList:
-            estReads = dataList[-1].numReadsToTarget
-            nReads = dataList[-1].nReads
-            fitCoeffs = dataList[-1].snrTotalLinFitCoeffs
-            xMin = numList[0]
-            xMax = max(numList[-1], estReads, nReads)
+        self.dataLine.set_data(self._readNumArr[0:numReads], self._snrSqArr[0:numReads])
+        if numReads > 0:
+            lastUTRData = self.utrReadDataList[-1]
+            estReads = lastUTRData.numReadsToTarget
+            nReads = lastUTRData.nReads
+            fitCoeffs = lastUTRData.snrTotalLinFitCoeffs
+            xMin = self._readNumArr[0]
+            xMax = max(self._readNumArr[numReads-1], estReads, nReads)
         else:
             xMin = 1
             xMax = 1
         xMin = xMin - 0.49
         xMax = xMax + 0.49
-        self.axes.set_xlim(xMin, xMax)
+        needDraw = False
+        if tuple(self.axes.get_xlim()) != (xMin, xMax):
+            self.axes.set_xlim(xMin, xMax)
+            needDraw = True
 
         # show a horizontal line for the estimated number of reads, if present and > 0
         if estReads is None or estReads <= 0:
-            self.estReadsLine.clear()
+            needDraw |= self.estReadsLine.clear()
         else:
-            self.estReadsLine.show(estReads)
+            needDraw |= self.estReadsLine.show(estReads)
             
-        # code to draw fit line goes here.
-        # dataList is empty then set line data to the empty list; otherwise:
-        # evaluate fit over range xMin to xMax
-        # set data and display it
+        # the fit is linear, so evaluating it at the ends of the x range suffices
         if fitCoeffs is None:
             fitReadNumArr = []
             fitSnrSqArr = []
         else:
-            dx = (xMax - xMin) / 100.0
-            fitReadNumArr = numpy.arange(xMin, xMax, dx)
+            fitReadNumArr = numpy.array((xMin, xMax))
             fitSnrSqArr = fitReadNumArr * fitCoeffs[1] + fitCoeffs[0]
 #         print "fitCoeffs=", fitCoeffs
 #         print "fitReadNumArr=", fitReadNumArr
 #         print "fitSnrSqArr=", fitSnrSqArr
         self.fitLine.set_data(fitReadNumArr, fitSnrSqArr)
 
-        self.canvas.draw()
+        if needDraw or self._drawCaller.isPending or self._background is None:
+            self._drawCaller.callNow()
+        else:
+            self._blitAnimated()
+
+    def _blitAnimated(self):
+        """Draw the data and fit lines over the saved background
+        """
+        self.canvas.restore_region(self._background)
+        self._drawAnimated()
+        self.canvas.blit(self.axes.bbox)
+
+    def _drawAnimated(self):
+        """Draw the animated lines (the data and fit lines)
+        """
+        self.axes.draw_artist(self.dataLine)
+        self.axes.draw_artist(self.fitLine)
+
+    def _drawEventCallback(self, event=None):
+        """The graph was drawn; save the background and draw the animated lines
+
+        The canvas draws the animated lines before displaying the graph
+        because this is called by the figure at the end of its draw method.
+        """
+        self._background = self.canvas.copy_from_bbox(self.axes.bbox)
+        self._drawAnimated()
 
 
 if __name__ == '__main__':
@@ -24,6 +24,7 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTk, NavigationToolbar2
 
 import RO.Constants
 import RO.StringUtil
+import TUI.Base.FocusFit
 import TUI.Base.Wdg.StatusBar
 from . import GuideImage
 
@@ -31,6 +32,9 @@ _HelpURL = "Instruments/FocusPlotWin.html"
 
 ShowToolbar = False # show matplotlib toolbar on graph?
 
+# reject probes this many std. dev. from the fit to the other probes; None to keep all probes
+FitClipSigma = 5.0
+
 class FocusPlotWdg(Tkinter.Frame):
     def __init__(self,
         master,
@@ -101,6 +105,10 @@ class FocusPlotWdg(Tkinter.Frame):
         fitArrays = self.fitFocus(focusOffsetArr, fwhmArr, fitsObj)
         if fitArrays is not None:
             self.plotAxis.plot(fitArrays[0], fitArrays[1], color='blue', linestyle="-", label="best fit")
+            isRejectedArr = numpy.logical_not(fitArrays[2])
+            if isRejectedArr.any():
+                self.plotAxis.plot(focusOffsetArr[isRejectedArr], fwhmArr[isRejectedArr], linestyle="",
+                    marker="x", markersize=12, color="red", markeredgewidth=1, label="rejected")
 
         # add seeing
         try:
@@ -171,7 +179,10 @@ class FocusPlotWdg(Tkinter.Frame):
         - fwhmArr: array of FWHM values (arcsec)
         - nPoints: number of points desired in the returned fit arrays
         
-        Returns [newFocusOffArr, fitFWHMArr] if the fit succeeds; None otherwise
+        Probes that are outliers (see FitClipSigma) are rejected.
+
+        Returns [newFocusOffArr, fitFWHMArr, isUsedArr] if the fit succeeds, where isUsedArr
+        is True for each probe used in the fit; None otherwise
         """
         if len(focusOffsetArr) < 2:
             self.statusBar.setMsg("Cannot fit data: too few data points",
@@ -195,15 +206,15 @@ class FocusPlotWdg(Tkinter.Frame):
     
             yArr = rmsArr**2 - (C * focusOffsetArr**2)
             
-            fitCoeff = numpy.polyfit(focusOffsetArr, yArr, 1)
+            fitData = TUI.Base.FocusFit.polyFit(focusOffsetArr, yArr, degree=1, clipSigma=FitClipSigma)
     
             fitFocusOffsetArr = numpy.linspace(min(focusOffsetArr), max(focusOffsetArr), nPoints)
-            fitYArr = (fitFocusOffsetArr * fitCoeff[0]) + fitCoeff[1]
+            fitYArr = TUI.Base.FocusFit.polyVal(fitData.coeffs, fitFocusOffsetArr)
             fitRMSSqArr = fitYArr + (C * fitFocusOffsetArr**2)
             
             fitFWHM = numpy.sqrt(fitRMSSqArr) * (2.35 / micronsPerArcsec)
             
-            return [fitFocusOffsetArr, fitFWHM]
+            return [fitFocusOffsetArr, fitFWHM, fitData.isUsedArr]
         except Exception as e:
             self.statusBar.setMsg("Cannot fit data: %s" % (RO.StringUtil.strFromException(e),),
                 severity = RO.Constants.sevWarning, isTemp=True)
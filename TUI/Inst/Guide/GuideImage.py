@@ -30,13 +30,13 @@ History:
 2015-11-05 ROwen    Modernized "except" syntax.
 """
 import os
-try:
-    from astropy.io import fits
-except Exception:
-    import pyfits as fits
 import RO.StringUtil
+import TUI.LazyImport
 import TUI.Models
 
+# astropy is slow to import, so import it when first needed
+fits = TUI.LazyImport.LazyModule("astropy.io.fits", "pyfits")
+
 _DebugMem = False  # print a message when a file is deleted from disk?
 
 SDSSFmtType = "gproc"
@@ -246,7 +246,6 @@ import Tkinter
 import tkFileDialog
 import numpy
 import opscore.actor
-from opscore.utility import assembleImage
 import RO.Alg
 import RO.CanvasUtil
 import RO.Constants
@@ -260,6 +259,7 @@ import RO.Wdg
 import RO.Wdg.GrayImageDispWdg as GImDisp
 
 import TUI.Base.Wdg
+import TUI.LazyImport
 import TUI.Models
 import TUI.TUIMenu.DownloadsWindow
 from . import CmdInfo
@@ -269,6 +269,9 @@ from . import GuideImage
 from . import GuideStateWdg
 from . import MangaDitherWdg
 
+# assembleImage imports astropy, which is slow, so import it when first needed
+assembleImage = TUI.LazyImport.LazyModule("opscore.utility.assembleImage")
+
 _HelpPrefix = "Instruments/Guiding/index.html#"
 
 _MaxDist = 15
@@ -349,7 +352,7 @@ class GuideWdg(Tkinter.Frame):
         self.settingProbeEnableWdg = False
         self.currCmdInfoList = []
         self.focusPlotTL = None
-        self.plateViewAssembler = assembleImage.AssembleImage(relSize=0.5)
+        self.plateViewAssembler = None # created when first needed
         
         self.ftpSaveToPref = self.tuiModel.prefs.getPrefVar("Save To")
         downloadTL = self.tuiModel.tlSet.getToplevel(TUI.TUIMenu.DownloadsWindow.WindowName)
@@ -1605,6 +1608,8 @@ class GuideWdg(Tkinter.Frame):
         havePlateInfo = False
         if fitsIm:
             try:
+                if self.plateViewAssembler is None:
+                    self.plateViewAssembler = assembleImage.AssembleImage(relSize=0.5)
                 plateInfo = self.plateViewAssembler(fitsIm)
             except assembleImage.NoPlateInfo:
                 if self.plateBtn.getBool():
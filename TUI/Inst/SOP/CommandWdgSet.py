@@ -50,6 +50,7 @@ import RO.Astro.Tm
 import RO.PhysConst
 import RO.StringUtil
 import tkMessageBox
+import TUI.Base.KeyVarGroup
 import TUI.Models
 
 
@@ -352,6 +353,11 @@ class CommandWdgSet(ItemWdgSet):
         # ordered dictionary of stages for which state is expected: stage base name: stage (or None for a fake stage)
         self.currStageDict = collections.OrderedDict()
         self.currCmdInfoList = []
+        # dict of stage name: grid row, for gridded real stages
+        self._stageRowDict = dict()
+        # (show Current and Default buttons, show Modify button); None if not yet set
+        self._adjustBtnState = None
+        self._commandStagesKeyVar = None
 
     def build(self, master, msgBar, statusBar, startColCommandFrame=0,
               callFunc=None, helpURL=None):
@@ -421,12 +427,17 @@ class CommandWdgSet(ItemWdgSet):
 
         if self.actor == "sop":
             sopModel = TUI.Models.getModel("sop")
-            commandStateKeyVar = getattr(sopModel, "%sState" % (self.name,))
-            commandStateKeyVar.addCallback(self._commandStateCallback)
+            keyVarList = [getattr(sopModel, "%sState" % (self.name,))]
             if len(self.stageDict) > 1:
                 # multiple stages; pay attention to which ones sop says to use
-                commandStagesKeyVar = getattr(sopModel, "%sStages" % (self.name,))
-                commandStagesKeyVar.addCallback(self._commandStagesCallback)
+                self._commandStagesKeyVar = getattr(sopModel, "%sStages" % (self.name,))
+                keyVarList.insert(0, self._commandStagesKeyVar)
+            self._keyVarGroup = TUI.Base.KeyVarGroup.KeyVarGroup(
+                master = self.wdg,
+                keyVarList = keyVarList,
+                callFunc = self._commandKeyVarsCallback,
+                callNow = True,
+            )
 
     def doAbort(self, wdg=None):
         """Abort the command
@@ -572,6 +583,20 @@ class CommandWdgSet(ItemWdgSet):
         if enableWdg:
             self.enableWdg()
 
+    def _commandKeyVarsCallback(self, changedKeyVars):
+        """Callback for the <command>Stages and <command>State keywords
+
+        Called once for all the changes in a reply (or burst of replies), with <command>Stages first,
+        so the stages are regridded (if necessary) before their states are set,
+        and the widgets are enabled once, at the end.
+        """
+        with self.setWdgContext():
+            for keyVar in changedKeyVars:
+                if keyVar is self._commandStagesKeyVar:
+                    self._commandStagesCallback(keyVar)
+                else:
+                    self._commandStateCallback(keyVar)
+
     def _commandStagesCallback(self, keyVar):
         """Callback for <command>Stages keyword
 
@@ -644,6 +669,8 @@ class CommandWdgSet(ItemWdgSet):
 
     def _gridStages(self, visibleStageNameList, isFirst=False):
         """Grid the specified stages in the specified order
+
+        Only stages and parameters whose position or visibility changes are gridded or ungridded.
         """
 #        print "%s._gridStages(%s)" % (self, visibleStageNameList)
         if (list(self.currStageDict.keys()) == visibleStageNameList) and not isFirst:
@@ -654,43 +681,61 @@ class CommandWdgSet(ItemWdgSet):
         if unknownNameSet:
             unknownNameList = [str(unk) for unk in unknownNameSet]
             raise RuntimeError("%s contains unknown stages %s" % (visibleStageNameList, unknownNameList))
+        oldVisibleStageNameSet = frozenset(self.currStageDict.keys())
 
-        # withdraw all stages and their parameters
-        for stage in self.stageDict.values():
-            if stage.isReal:
-                stage.stateWdg.grid_forget()
-                stage.controlWdg.grid_forget()
-                stage.removeCallback(self.enableWdg, doRaise=False)
-
-        # update currStageDict and grid visible real stages
+        # compute the new row of each visible real stage and update currStageDict
         self.currStageDict.clear()
-        hasParameters = self._hasNonstageParameters
-        stageRow = 0
+        newStageRowDict = dict()
         for stageName in visibleStageNameList:
             stage = self.stageDict[stageName]
             self.currStageDict[stageName] = stage
             if stage.isReal:
+                newStageRowDict[stageName] = len(newStageRowDict)
+
+        # withdraw real stages that are no longer visible
+        for stage in self.stageDict.values():
+            if stage.isReal and stage.name not in newStageRowDict:
+                if stage.name in self._stageRowDict:
+                    stage.stateWdg.grid_forget()
+                    stage.controlWdg.grid_forget()
+                stage.removeCallback(self.enableWdg, doRaise=False)
+
+        # grid real stages that are newly visible or have moved
+        for stageName, stageRow in newStageRowDict.items():
+            stage = self.stageDict[stageName]
+            if self._stageRowDict.get(stageName) != stageRow:
                 stage.stateWdg.grid(row=stageRow, column=0, sticky="w")
                 stage.controlWdg.grid(row=stageRow, column=1, sticky="w")
-                stageRow += 1
-                stage.addCallback(self.enableWdg)
+            stage.addCallback(self.enableWdg)
+        self._stageRowDict = newStageRowDict
 
+        # show parameters associated with visible stages; hide the others
+        hasParameters = self._hasNonstageParameters
         visibleStageNameSet = frozenset(visibleStageNameList)
         for param in self.stageParameterList:
-            if param.stageNameSet & visibleStageNameSet:
+            isVisible = bool(param.stageNameSet & visibleStageNameSet)
+            wasVisible = bool(param.stageNameSet & oldVisibleStageNameSet)
+            if isVisible:
                 hasParameters = True
+            if isVisible == wasVisible and not isFirst:
+                continue
+            if isVisible:
                 param.regridWdg()
             else:
                 param.ungridWdg()
 
         hasAdjustments = hasParameters or len(self.currStageDict) > 1
+        adjustBtnState = (hasAdjustments, hasAdjustments and self.actor == "sop")
+        if adjustBtnState == self._adjustBtnState:
+            return
+        self._adjustBtnState = adjustBtnState
         if hasAdjustments:
             self.currentBtn.grid()
             self.defaultBtn.grid()
         else:
             self.currentBtn.grid_remove()
             self.defaultBtn.grid_remove()
-        if hasAdjustments and self.actor == "sop":
+        if adjustBtnState[1]:
             self.modifyBtn.grid()
         else:
             self.modifyBtn.grid_remove()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Defer importing modules until they are first used.
+
+LazyModule is a stand-in for a module that imports the module
+the first time one of its attributes is accessed. For example:
+
+    fits = LazyModule("astropy.io.fits", "pyfits")
+    ...
+    fitsIm = fits.open(filePath) # astropy.io.fits (or pyfits) is imported here
+
+whenImported registers a function to call just after a module is first imported,
+however that import happens. This is how TUI configures numpy and matplotlib
+without importing them at startup.
+"""
+import importlib
+import sys
+import threading
+
+__all__ = ["LazyModule", "whenImported"]
+
+class LazyModule(object):
+    """A stand-in for a module that is imported when first used.
+
+    Inputs:
+    - one or more module names (full dotted names): the first that can be imported is used;
+        if none can be imported, the ImportError from the first name is raised
+        (on first use, not when the LazyModule is created)
+    """
+    def __init__(self, *moduleNames):
+        if not moduleNames:
+            raise RuntimeError("must specify at least one module name")
+        # use object.__setattr__ and mangled names to avoid clashing with module attributes
+        object.__setattr__(self, "_LazyModule__moduleNames", moduleNames)
+        object.__setattr__(self, "_LazyModule__module", None)
+
+    def getModule(self):
+        """Return the module, importing it if necessary.
+        """
+        module = self.__module
+        if module is None:
+            firstExc = None
+            for moduleName in self.__moduleNames:
+                try:
+                    module = importlib.import_module(moduleName)
+                    break
+                except ImportError as e:
+                    if firstExc is None:
+                        firstExc = e
+            else:
+                raise firstExc
+            object.__setattr__(self, "_LazyModule__module", module)
+        return module
+
+    def isLoaded(self):
+        """Return True if the module has been imported (by this LazyModule).
+        """
+        return self.__module is not None
+
+    def __getattr__(self, name):
+        return getattr(self.getModule(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.getModule(), name, value)
+
+    def __repr__(self):
+        if self.__module is None:
+            return "LazyModule(%s)" % (", ".join(repr(name) for name in self.__moduleNames),)
+        return "LazyModule(%r)" % (self.__module,)
+
+
+class _PostImportFinder(object):
+    """A sys.meta_path finder that calls functions after a module is first imported.
+
+    It does not find modules itself; when asked for a module that has functions registered
+    it imports the module normally (with itself disabled), then calls the functions.
+    """
+    def __init__(self):
+        self.funcDict = {} # dict of module name: list of functions
+        self._localData = threading.local()
+
+    def find_module(self, fullname, path=None):
+        if fullname not in self.funcDict:
+            return None
+        inProgress = getattr(self._localData, "inProgress", set())
+        if fullname in inProgress:
+            return None
+        return self
+
+    def load_module(self, fullname):
+        inProgress = getattr(self._localData, "inProgress", None)
+        if inProgress is None:
+            inProgress = self._localData.inProgress = set()
+        inProgress.add(fullname)
+        try:
+            module = importlib.import_module(fullname)
+        finally:
+            inProgress.discard(fullname)
+        for func in self.funcDict.pop(fullname, ()):
+            func(module)
+        return module
+
+_PostImportFinderInstance = _PostImportFinder()
+sys.meta_path.insert(0, _PostImportFinderInstance)
+
+def whenImported(moduleName, func):
+    """Call a function just after a module is first imported.
+
+    Inputs:
+    - moduleName: full dotted name of module
+    - func: function to call; it receives one argument: the module
+
+    If the module has already been imported then func is called immediately.
+    """
+    module = sys.modules.get(moduleName)
+    if module is not None:
+        func(module)
+        return
+    _PostImportFinderInstance.funcDict.setdefault(moduleName, []).append(func)
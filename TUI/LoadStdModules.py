@@ -1,69 +1,73 @@
+"""Load TUI's standard windows.
+
+The standard window modules and their windows are listed in TUI.StdWindowManifest,
+which is generated by genLoadStdModules.py (see that file for more information).
+Using the manifest avoids searching for window modules at startup,
+and allows lazy windows to be registered without importing their modules.
+"""
+import functools
+import importlib
+try:
+    from importlib.util import find_spec as _findModule
+except ImportError:
+    from pkgutil import find_loader as _findModule
 import TUI.Models.TUIModel
-import TUI.TUIMenu.AboutWindow
-import TUI.TUIMenu.ConnectWindow
-import TUI.TUIMenu.DownloadsWindow
-import TUI.TUIMenu.LogWindow
-import TUI.TUIMenu.PreferencesWindow
-import TUI.TUIMenu.PythonWindow
-import TUI.TUIMenu.UsersWindow
-import TUI.Inst.APOGEE.APOGEEWindow
-import TUI.Inst.APOGEEQL.APOGEEQLWindow
-import TUI.Inst.BOSS.BOSSWindow
-import TUI.Inst.Guide.FocusPlotWindow
-import TUI.Inst.Guide.GuideWindow
-import TUI.Inst.GuideMonitor.BOSSMonitorWindow
-import TUI.Inst.GuideMonitor.FluxMonitorWindow
-import TUI.Inst.GuideMonitor.FocusMonitorWindow
-import TUI.Inst.GuideMonitor.GuideMonitorWindow
-import TUI.Inst.GuideMonitor.ScaleMonitorWindow
-import TUI.Inst.GuideMonitor.SeeingMonitorWindow
-import TUI.Inst.SOP.SOPWindow
-import TUI.Misc.Alerts.AlertsWindow
-import TUI.Misc.Interlocks.InterlocksWindow
-import TUI.Misc.MCP.MCPWindow
-import TUI.Misc.MessageWindow
-import TUI.TCC.FiducialsWdg.FiducialsWindow
-import TUI.TCC.FocalPlaneWindow
-import TUI.TCC.FocusWindow
-import TUI.TCC.MirrorStatusWindow
-import TUI.TCC.NudgerWindow
-import TUI.TCC.OffsetWdg.OffsetWindow
-import TUI.TCC.SkyWindow
-import TUI.TCC.SlewWdg.SlewWindow
-import TUI.TCC.StatusWdg.StatusWindow
+import TUI.StartupProfiler
+import TUI.StdWindowManifest
 
 def loadAll():
+    """Load TUI's standard windows, as listed in TUI.StdWindowManifest.
+
+    Windows of lazy modules are registered without importing the module
+    (see TUI.Base.LazyToplevelSet); other modules are imported and their windows added.
+
+    Also check that the manifest matches the package, without searching for window modules:
+    - each listed module must exist; missing modules are skipped
+    - each module that is loaded must add exactly the windows listed
+        (for lazy modules this is checked when the windows are built)
+
+    Return a list of problems found with the manifest (empty if none).
+    """
     tuiModel = TUI.Models.TUIModel.Model()
     tlSet = tuiModel.tlSet
-    TUI.TUIMenu.AboutWindow.addWindow(tlSet)
-    TUI.TUIMenu.ConnectWindow.addWindow(tlSet)
-    TUI.TUIMenu.DownloadsWindow.addWindow(tlSet)
-    TUI.TUIMenu.LogWindow.addWindow(tlSet)
-    TUI.TUIMenu.PreferencesWindow.addWindow(tlSet)
-    TUI.TUIMenu.PythonWindow.addWindow(tlSet)
-    TUI.TUIMenu.UsersWindow.addWindow(tlSet)
-    TUI.Inst.APOGEE.APOGEEWindow.addWindow(tlSet)
-    TUI.Inst.APOGEEQL.APOGEEQLWindow.addWindow(tlSet)
-    TUI.Inst.BOSS.BOSSWindow.addWindow(tlSet)
-    TUI.Inst.Guide.FocusPlotWindow.addWindow(tlSet)
-    TUI.Inst.Guide.GuideWindow.addWindow(tlSet)
-    TUI.Inst.GuideMonitor.BOSSMonitorWindow.addWindow(tlSet)
-    TUI.Inst.GuideMonitor.FluxMonitorWindow.addWindow(tlSet)
-    TUI.Inst.GuideMonitor.FocusMonitorWindow.addWindow(tlSet)
-    TUI.Inst.GuideMonitor.GuideMonitorWindow.addWindow(tlSet)
-    TUI.Inst.GuideMonitor.ScaleMonitorWindow.addWindow(tlSet)
-    TUI.Inst.GuideMonitor.SeeingMonitorWindow.addWindow(tlSet)
-    TUI.Inst.SOP.SOPWindow.addWindow(tlSet)
-    TUI.Misc.Alerts.AlertsWindow.addWindow(tlSet)
-    TUI.Misc.Interlocks.InterlocksWindow.addWindow(tlSet)
-    TUI.Misc.MCP.MCPWindow.addWindow(tlSet)
-    TUI.Misc.MessageWindow.addWindow(tlSet)
-    TUI.TCC.FiducialsWdg.FiducialsWindow.addWindow(tlSet)
-    TUI.TCC.FocalPlaneWindow.addWindow(tlSet)
-    TUI.TCC.FocusWindow.addWindow(tlSet)
-    TUI.TCC.MirrorStatusWindow.addWindow(tlSet)
-    TUI.TCC.NudgerWindow.addWindow(tlSet)
-    TUI.TCC.OffsetWdg.OffsetWindow.addWindow(tlSet)
-    TUI.TCC.SkyWindow.addWindow(tlSet)
-    TUI.TCC.SlewWdg.SlewWindow.addWindow(tlSet)
-    TUI.TCC.StatusWdg.StatusWindow.addWindow(tlSet)
+    errList = []
+    for moduleName, windowList, heavyDeps, isLazy in TUI.StdWindowManifest.WindowModuleList:
+        if not _moduleExists(moduleName):
+            errList.append("Standard window module %s not found" % (moduleName,))
+            continue
+
+        if isLazy:
+            tlSet.addLazyToplevels(
+                nameVisList = windowList,
+                buildFunc = functools.partial(_buildLazyWindows, moduleName),
+            )
+            continue
+
+        oldNameSet = set(tlSet.getNames())
+        with TUI.StartupProfiler.timeTask("%s.addWindow" % (moduleName,)):
+            windowModule = importlib.import_module(moduleName)
+            windowModule.addWindow(tlSet)
+        newNameSet = set(tlSet.getNames()) - oldNameSet
+        expNameSet = set(windowName for windowName, defVisible in windowList)
+        if newNameSet != expNameSet:
+            errList.append("Standard window module %s added windows %s; expected %s" % \
+                (moduleName, ", ".join(sorted(newNameSet)), ", ".join(sorted(expNameSet))))
+
+    if errList:
+        errList.append("TUI.StdWindowManifest is out of date; run genLoadStdModules.py to regenerate it")
+    return errList
+
+def _buildLazyWindows(moduleName, tlSet):
+    """Import a window module and add its windows to tlSet
+    """
+    with TUI.StartupProfiler.timeTask("%s.addWindow" % (moduleName,)):
+        windowModule = importlib.import_module(moduleName)
+        windowModule.addWindow(tlSet)
+
+def _moduleExists(moduleName):
+    """Return True if a module can be found (without importing it, though its package is imported)
+    """
+    try:
+        return _findModule(moduleName) is not None
+    except ImportError:
+        return False
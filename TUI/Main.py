@@ -69,16 +69,27 @@ import os
 import sys
 import time
 import Tkinter
-import numpy
-numpy.seterr(all="ignore") # suppress "Warning: invalid value encountered in divide"
-import matplotlib
-matplotlib.use("TkAgg")
-# controls the background of the axis label regions (which default to gray)
-matplotlib.rc("figure", facecolor="white")
-matplotlib.rc("axes", titlesize="medium") # default is large, which is too big
-matplotlib.rc("legend", fontsize="medium") # default is large, which is too big
+import TUI.LazyImport
+import TUI.StartupProfiler
+
+def _configNumpy(numpy):
+    numpy.seterr(all="ignore") # suppress "Warning: invalid value encountered in divide"
+
+def _configMatplotlib(matplotlib):
+    # "use" must be called before matplotlib.backends is imported;
+    # this is called as soon as matplotlib itself is imported, so it is early enough
+    matplotlib.use("TkAgg")
+    # controls the background of the axis label regions (which default to gray)
+    matplotlib.rc("figure", facecolor="white")
+    matplotlib.rc("axes", titlesize="medium") # default is large, which is too big
+    matplotlib.rc("legend", fontsize="medium") # default is large, which is too big
+
+# numpy and matplotlib are slow to import, so configure them when first imported
+TUI.LazyImport.whenImported("numpy", _configNumpy)
+TUI.LazyImport.whenImported("matplotlib", _configMatplotlib)
 
 import RO.Comm.Generic
+import RO.Constants
 RO.Comm.Generic.setFramework("tk")
 
 import TUI.Base.ScriptLoader
@@ -112,6 +123,9 @@ def runTUI():
     
     # set up background tasks
     backgroundHandler = TUI.BackgroundTasks.BackgroundKwds()
+    TUI.BackgroundTasks.startLagMonitor(
+        reportPath = os.environ.get(TUI.BackgroundTasks.LagReportEnvVar) or None,
+    )
 
     # get locations to look for windows
     addPathList = TUI.TUIPaths.getAddPaths()
@@ -119,21 +133,35 @@ def runTUI():
     # add additional paths to sys.path
     sys.path += addPathList
     
-    TUI.LoadStdModules.loadAll()
+    # start finding additional windows modules in the background
+    windowModuleFinder = TUI.WindowModuleUtil.WindowModuleFinder(addPathList)
+    
+    # load standard windows and report any problems with the standard window manifest
+    for errMsg in TUI.LoadStdModules.loadAll():
+        sys.stderr.write(errMsg + "\n")
+        tuiModel.logMsg(errMsg, severity=RO.Constants.sevError)
     
     # load additional windows modules
     for winPath in addPathList:
+        try:
+            moduleNameList = windowModuleFinder.getModuleNames(winPath)
+        except Exception as e:
+            tuiModel.logMsg(str(e), severity=RO.Constants.sevError)
+            continue
         TUI.WindowModuleUtil.loadWindows(
             path = winPath,
             tlSet = tuiModel.tlSet,
             logFunc = tuiModel.logMsg,
+            moduleNameList = moduleNameList,
         )
 
     # load scripts
-    TUI.Base.ScriptLoader.reopenScriptWindows()
+    with TUI.StartupProfiler.timeTask("reopenScriptWindows"):
+        TUI.Base.ScriptLoader.reopenScriptWindows()
     
     # add the main menu
-    TUI.MenuBar.MenuBar()
+    with TUI.StartupProfiler.timeTask("MenuBar"):
+        TUI.MenuBar.MenuBar()
     
     tuiModel.logMsg(
         "%s %s: ready to connect" % (TUI.Version.ApplicationName, TUI.Version.VersionName)
@@ -142,6 +170,7 @@ def runTUI():
     platformStr = getPlatform()
     sys.stdout.write("%s %s running on %s started %s\n" % \
                      (TUI.Version.ApplicationName, TUI.Version.VersionName, platformStr, startTimeStr))
+    TUI.StartupProfiler.stopAndReport()
     
     tuiModel.reactor.run()
 
@@ -44,6 +44,7 @@ import tkSimpleDialog
 import RO.Constants
 import RO.Wdg
 import RO.Wdg.WdgPrefs
+import TUI.Base.IdleCaller
 import TUI.Base.Wdg
 import TUI.Models
 import TUI.PlaySound
@@ -383,6 +384,9 @@ class AlertsWdg(Tkinter.Frame):
         )
         self.statusBar.grid(row=row, column=0, columnspan=maxCols, sticky="ew")
         
+        # display active alerts when idle, to handle bursts of alerts efficiently
+        self._displayActiveAlertsCaller = TUI.Base.IdleCaller.IdleCaller(self, self.displayActiveAlerts)
+
         self.alertsModel = TUI.Models.getModel("alerts")
         self.alertsModel.activeAlerts.addCallback(self._activeAlertsCallback, callNow=False)
         self.alertsModel.disabledAlertRules.addCallback(self._disabledAlertRulesCallback, callNow=False)
@@ -445,6 +449,7 @@ class AlertsWdg(Tkinter.Frame):
         self.sendCmd("instrumentState instrument=%s down" % (instName,))
 
     def displayActiveAlerts(self):
+        self._displayActiveAlertsCaller.cancel()
         alertList = []
         currTime = time.time()
         for alertInfo in self.alertDict.values():
@@ -656,7 +661,7 @@ class AlertsWdg(Tkinter.Frame):
         
         if not self._statusCmdRunning() and self._needStatus():
             self.tuiModel.reactor.callLater(0.5, self._getStatus)
-        self.displayActiveAlerts()
+        self._displayActiveAlertsCaller.schedule()
 
     def _alertCallback(self, keyVar):
 #         print "_alertCallback(%s)" % (keyVar,)
@@ -672,7 +677,7 @@ class AlertsWdg(Tkinter.Frame):
             del(self.alertDict[newAlertInfo.alertID])
         else:
             self.alertDict[newAlertInfo.alertID] = newAlertInfo
-        self.displayActiveAlerts()
+        self._displayActiveAlertsCaller.schedule()
         if newAlertInfo.isEnabled \
             and not newAlertInfo.isAcknowledged \
             and newAlertInfo.severity not in ("ok", "info"):
@@ -4,7 +4,7 @@ Includes the following items:
 - dispatcher: the keyword dispatcher (opscore.actor.CmdKeyVarDispatcher)
     note: the network connection is dispatcher.connection
 - prefs: the application preferences (TUI.TUIPrefs.TUIPrefs)
-- tlSet: the set of toplevels (windows) (RO.Wdg.ToplevelSet)
+- tlSet: the set of toplevels (windows) (TUI.Base.LazyToplevelSet.LazyToplevelSet)
 - root: the root application window (Tkinter.Toplevel);
     mostly used when one to execute some Tkinter command
     (all of which require an arbitrary Tkinter object)
@@ -77,6 +77,8 @@ import RO.Wdg
 import opscore.actor.model
 import opscore.actor.cmdkeydispatcher
 import Tkinter
+import TUI.Base.CallbackProfiler
+import TUI.Base.LazyToplevelSet
 import TUI.TUIPaths
 import TUI.TUIPrefs
 import TUI.Version
@@ -117,6 +119,10 @@ class Model(object):
             callKeyVarsOnDisconnect = True,
         )
         opscore.actor.model.Model.setDispatcher(self.dispatcher)
+
+        # optionally time keyVar callbacks from the start (see TUI.Base.CallbackProfiler)
+        if TUI.Base.CallbackProfiler.isEnabled():
+            TUI.Base.CallbackProfiler.start()
         
         # log source
         self.logSource = LogSource.LogSource(self.dispatcher)
@@ -133,7 +139,7 @@ class Model(object):
         
         # TUI window (topLevel) set;
         # this starts out empty; others add windows to it
-        self.tlSet = RO.Wdg.ToplevelSet(
+        self.tlSet = TUI.Base.LazyToplevelSet.LazyToplevelSet(
             fileName = TUI.TUIPaths.getGeomFile(),
             createFile = True,  # create file if it doesn't exist
         )
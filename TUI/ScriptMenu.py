@@ -28,6 +28,7 @@ History:
 2014-02-12 ROwen    Moved some code to TUI.Base.ScriptLoader so other users could get to it more easily.
 """
 import os
+import time
 import Tkinter
 import tkFileDialog
 import RO.Alg
@@ -36,6 +37,13 @@ from TUI.Base.ScriptLoader import getScriptDirs, ScriptLoader
 
 __all__ = ["getScriptMenu"]
 
+# minimum interval between checks of the scripts directories when the menu is posted (sec)
+_MinCheckInterval = 5.0
+
+# directories modified more recently than this (sec) are read again at the next check,
+# in case they change again within the resolution of the file system's modification time
+_MinMTimeAge = 2.0
+
 def getScriptMenu(master, fg=None):
     scriptDirs = getScriptDirs()
 
@@ -52,6 +60,9 @@ class _MenuNode:
     of a particular subdirectory is not. This sounds like a mistake to me;
     if a given subdir exists in any scripts dir, it should be checked every time
     in all scripts dirs.
+
+    Directories are only read if their modification time has changed since they were last read,
+    and only menus whose contents have changed are rebuilt.
     """
     def __init__(self, parentNode, label, pathList, fg=None):
         """Construct a _MenuNode
@@ -74,6 +85,7 @@ class _MenuNode:
         self.itemDict = {}
         self.subDict = RO.Alg.ListDict()
         self.subNodeList = []
+        self.dirMTimeList = None # modification time of each dir in pathList when last read
 
         self.fg = fg
 
@@ -85,21 +97,56 @@ class _MenuNode:
             tearoff = False,
 #           postcommand = self.checkMenu,
         )
-        self.parentNode.menu.add_cascade(
-            label = self.label,
-            menu = self.menu,
-        )
+
+    def setPathList(self, pathList):
+        """Set a new path list; the directories will be read at the next check
+        """
+        self.pathList = pathList
+        self.dirMTimeList = None
 
     def checkMenu(self, recurse=True):
         """Check contents of menu and rebuild if anything has changed.
         Return True if anything rebuilt.
         """
 #       print "%s checkMenu" % (self,)
+        didRebuild = False
+        dirMTimeList = self._getDirMTimeList()
+        if dirMTimeList != self.dirMTimeList:
+            didRebuild = self._readDirs()
+            # don't trust a very recent modification time; the dir may change again within its resolution
+            if None in dirMTimeList or time.time() - max(dirMTimeList + [0]) < _MinMTimeAge:
+                self.dirMTimeList = None
+            else:
+                self.dirMTimeList = dirMTimeList
+
+        if recurse:
+            for subNode in self.subNodeList:
+                subRebuilt = subNode.checkMenu(recurse=True)
+                didRebuild = didRebuild or subRebuilt
+
+        return didRebuild
+
+    def _getDirMTimeList(self):
+        """Return the modification time of each directory in pathList (None if not found)
+        """
+        dirMTimeList = []
+        for path in self.pathList:
+            try:
+                dirMTimeList.append(os.stat(path).st_mtime)
+            except OSError:
+                dirMTimeList.append(None)
+        return dirMTimeList
+
+    def _readDirs(self):
+        """Read the directories in pathList and rebuild the menu if the contents have changed.
+        Return True if the menu was rebuilt.
+        """
         newItemDict = {}
         newSubDict = RO.Alg.ListDict()
-        didRebuild = False
 
         for path in self.pathList:
+            if not os.path.isdir(path):
+                continue
             for baseName in os.listdir(path):
                 # reject files that would be invisible on unix
                 if baseName.startswith("."):
@@ -120,27 +167,24 @@ class _MenuNode:
 #               else:
 #                   print "checkMenu ignoring %r = %r" % (baseName, fullPath)
 
-        if (self.itemDict != newItemDict) or (self.subDict != newSubDict):
-            didRebuild = True
-            # rebuild contents
-#           print "checkMenu rebuild contents"
-            self.itemDict = newItemDict
-            self.subDict = newSubDict
-            self.menu.delete(0, "end")
-            self.subNodeList = []
-            self._fillMenu()
-#       else:
+        if (self.itemDict == newItemDict) and (self.subDict == newSubDict):
 #           print "checkMenu do not rebuild contents"
+            return False
 
-        if recurse:
-            for subNode in self.subNodeList:
-                subRebuilt = subNode.checkMenu(recurse=True)
-                didRebuild = didRebuild or subRebuilt
-
-        return didRebuild
+        # rebuild contents
+#       print "checkMenu rebuild contents"
+        self.itemDict = newItemDict
+        self.subDict = newSubDict
+        self.menu.delete(0, "end")
+        self._fillMenu()
+        return True
 
     def _fillMenu(self):
         """Fill the menu.
+
+        Existing sub-menu nodes are reused for subdirectories that still exist
+        (so they are only rebuilt if their own contents change);
+        the rest are destroyed.
         """
 #       print "%s _fillMenu"
 
@@ -157,13 +201,27 @@ class _MenuNode:
                                      fullPath=fullPath),
                 foreground=self.fg)
 
+        oldSubNodeDict = dict((subNode.label, subNode) for subNode in self.subNodeList)
+        self.subNodeList = []
         subdirList = list(self.subDict.keys())
         subdirList.sort()
 #       print "%s found subdirs: %s" % (self, subdirList)
         for subdir in subdirList:
             pathList = self.subDict[subdir]
+            subNode = oldSubNodeDict.pop(subdir, None)
+            if subNode is None:
 #               print "adding submenu %r: %r" % (subdir, pathList)
-            self.subNodeList.append(_MenuNode(self, subdir, pathList, fg=self.fg))
+                subNode = _MenuNode(self, subdir, pathList, fg=self.fg)
+            elif subNode.pathList != pathList:
+                subNode.setPathList(pathList)
+            self.menu.add_cascade(
+                label = subdir,
+                menu = subNode.menu,
+            )
+            self.subNodeList.append(subNode)
+
+        for subNode in oldSubNodeDict.values():
+            subNode.menu.destroy()
 
     def getLabels(self):
         """Return a list of labels all the way up to, but not including, the root node.
@@ -190,6 +248,7 @@ class _RootNode(_MenuNode):
         """
         self.master = master
         self.fg = fg
+        self._lastCheckTime = None
         _MenuNode.__init__(self, None, label, pathList, fg=fg)
         self.isAqua = (RO.TkUtil.getWindowingSystem() == RO.TkUtil.WSysAqua)
 
@@ -197,10 +256,19 @@ class _RootNode(_MenuNode):
         self.menu = Tkinter.Menu(
             self.master,
             tearoff = False,
-            postcommand = self.checkMenu,
+            postcommand = self._checkMenuWhenPosted,
             fg=self.fg
         )
 
+    def _checkMenuWhenPosted(self):
+        """Check the menu when it is posted, unless it was checked very recently
+        """
+        currTime = time.time()
+        if (self._lastCheckTime is not None) and (currTime - self._lastCheckTime < _MinCheckInterval):
+            return
+        self._lastCheckTime = currTime
+        self.checkMenu(recurse=True)
+
     def _fillMenu(self):
         """Fill the menu.
         """
@@ -34,7 +34,9 @@ History:
 2015-11-03 ROwen    Replace "== None" with "is None" and "!= None" with "is not None" to modernize the code.
 """
 import collections
+import functools
 import glob
+import math
 import os
 
 import numpy
@@ -66,6 +68,20 @@ HelpURL = "Scripts/BuiltInScripts/PointingData.html"
 
 EntryWidth = 6
 
+# star order names
+FileOrder = "File"
+MinSlewOrder = "Min Slew"
+
+# slew time model: default axis limits (min pos, max pos (deg), max vel (deg/sec), max accel (deg/sec^2))
+# for az, alt and rot, used if the TCC has not reported the limits (AzLim, AltLim and RotLim)
+DefAxisLimList = (
+    (-170.0, 450.0, 1.5, 0.15),
+    (0.0, 90.0, 1.5, 0.15),
+    (-360.0, 360.0, 3.0, 0.3),
+)
+SlewOverheadSec = 5.0 # estimated time per star in addition to slewing and settling (sec)
+ExpOverheadSec = 10.0 # estimated time per exposure in addition to exposure time (sec)
+
 # Dictionary of instrument position: TPOINT rotator name
 # See TPOINT manual section 4.5.2 "Option records" for the codes
 # See TCSpk manual section 3.1 for the difference between the left and right Nasmyth mount
@@ -175,6 +191,11 @@ class ScriptClass(object):
         sr.master.winfo_toplevel().resizable(True, True)
         sr.debug = Debug
         self.azAltList = None
+        self.plannedStarNums = [] # planned order of stars (star number = grid index + 1)
+        self.visitedStarNums = [] # stars measured or attempted, in order
+        self.runTimeNote = ""
+        self._plannedSkipSet = set() # stars to skip when the plan was made
+        self._recordFunc = None # function to record the last star measured; see recordPending
         self._nextPointTimer = Timer()
         self._gridDirs = getGridDirs()
         self.tccModel = TUI.Models.getModel("tcc")
@@ -246,6 +267,16 @@ class ScriptClass(object):
         )
         ctrlGr1.gridWdg("Rot Type", self.rotTypeWdg)
 
+        self.starOrderWdg = RO.Wdg.OptionMenu(
+            master = ctrlFrame1,
+            items = (FileOrder, MinSlewOrder),
+            defValue = FileOrder,
+            callFunc = self.updatePlan,
+            helpText = "order in which to measure stars: as in the grid file, or to minimize slewing",
+            helpURL = self.helpURL,
+        )
+        ctrlGr1.gridWdg("Star Order", self.starOrderWdg)
+
         # grid the second column;
         # use setDefCol instead of startNewCol because the grid frame is full width
         # use setNextRow to leave room for the grid frame
@@ -335,6 +366,8 @@ class ScriptClass(object):
 
         self.starsToSkipWdg = ListOfIntEntry(
             master = ctrlFrame2,
+            callFunc = self._starsToSkipCallback,
+            doneFunc = self._starsToSkipCallback,
             helpText = "list of stars to skip (pause to edit or press Skip Current Star)",
             helpURL = self.helpURL,
         )
@@ -512,6 +545,8 @@ class ScriptClass(object):
         self.window = None # LL pixel is 0, UL pixel is included
         self.currStarNum = 0
         self.numStarsWritten = 0 # number of star data items written to output
+        self.visitedStarNums = []
+        self._recordFunc = None
         for wdg in (self.missingStarsWdg, self.starsToSkipWdg, self.starsToRetryWdg, self.dataIDWdg):
             wdg.set("")
 
@@ -572,12 +607,50 @@ class ScriptClass(object):
                 ptDataFile.write("\n")
             ptDataFile.flush()
 
+            self.updatePlan()
             for starNum in self.starNumIter():
                 if starNum is None:
                     # pausing
                     yield
                 else:
                     yield self.waitMeasureOneStar(starNum=starNum, ptDataFile=ptDataFile)
+            self.recordPending()
+            self.plotGrid()
+
+    def end(self, sr):
+        """The script has ended; record the last star measured, if not yet done
+        """
+        self.recordPending()
+
+    def recordPending(self):
+        """Record the last star measured, if not yet done
+
+        To save time, waitMeasureOneStar does not write a star's data to the pointing data file
+        when the star is measured. Instead it does this (and updates the graph) after starting
+        the slew to the next star, by calling this method, which is also called when the run ends
+        and before pausing.
+        """
+        recordFunc = self._recordFunc
+        self._recordFunc = None
+        if recordFunc is not None:
+            recordFunc()
+
+    def _recordStar(self, ptErr, dataIDStr, ptDataFile):
+        """Write the data for a star to the pointing data file and show its data ID
+
+        Inputs:
+        - ptErr: pointing error, a PtErr
+        - dataIDStr: information about the star, appended as a comment
+        - ptDataFile: pointing data file; if closed, it is reopened for appending
+        """
+        dataStr = "%s  ! %s\n" % (ptErr.getPtDataStr(), dataIDStr)
+        if ptDataFile.closed:
+            with open(ptDataFile.name, "a") as reopenedFile:
+                reopenedFile.write(dataStr)
+        else:
+            ptDataFile.write(dataStr)
+            ptDataFile.flush()
+        self.dataIDWdg.set(dataIDStr)
 
     def setGrid(self, wdg=None):
         """Set a particular grid based on the selected name in self.gridWdg
@@ -613,36 +686,156 @@ class ScriptClass(object):
         self.azAltList["az"] = azList
         self.azAltList["alt"] = altList
         self.numStarsWdg.set(" %s stars" % (numPoints,))
-        self.azAltGraph.plotAzAltPoints(self.azAltList)
+        self.visitedStarNums = []
         for wdg in (self.missingStarsWdg, self.starsToSkipWdg, self.starsToRetryWdg):
             wdg.set("")
             wdg.setMaxVal(numPoints)
+        self.updatePlan()
+
+    def getCurrAzAlt(self):
+        """Return the current telescope az, alt (deg)
+
+        If the axis position is unknown, return the position of the last star visited,
+        or if no star has been visited, the position of the first star in the grid.
+        """
+        az, alt = self.tccModel.axePos[0:2]
+        if None not in (az, alt) and numpy.isfinite(az) and numpy.isfinite(alt):
+            return az, alt
+        ind = self.visitedStarNums[-1] - 1 if self.visitedStarNums else 0
+        return self.azAltList["az"][ind], self.azAltList["alt"][ind]
+
+    def getSlewTimeModel(self):
+        """Return a SlewTimeModel for the current TCC axis limits and selected rotation type
+        """
+        return SlewTimeModel(self.tccModel, self.rotTypeWdg.getString())
+
+    def orderStarNums(self, starNums, slewTimeModel=None):
+        """Return star numbers in the order they should be measured, starting from the current position
+
+        Inputs:
+        - starNums: collection of star numbers (grid index + 1)
+        - slewTimeModel: a SlewTimeModel; if None then one is constructed
+        """
+        starNums = sorted(starNums)
+        if self.starOrderWdg.getString() != MinSlewOrder or len(starNums) < 2:
+            return starNums
+        if slewTimeModel is None:
+            slewTimeModel = self.getSlewTimeModel()
+        startAz, startAlt = self.getCurrAzAlt()
+        indArr = numpy.array(starNums) - 1
+        order = orderForMinSlew(slewTimeModel, startAz, startAlt,
+            self.azAltList["az"][indArr], self.azAltList["alt"][indArr])
+        return [starNums[i] for i in order]
+
+    def predictRunTime(self, starNums, slewTimeModel):
+        """Return the predicted time (sec) to measure stars in the specified order,
+        starting from the current position
+
+        Inputs:
+        - starNums: star numbers (grid index + 1), in order
+        - slewTimeModel: a SlewTimeModel
+        """
+        if not starNums:
+            return 0.0
+        indArr = numpy.array(starNums) - 1
+        startAz, startAlt = self.getCurrAzAlt()
+        slewTime = slewTimeModel.getPathTime(startAz, startAlt,
+            self.azAltList["az"][indArr], self.azAltList["alt"][indArr])
+        expTime = self.expTimeWdg.getNumOrNone() or 0.0
+        numExp = self.numExpWdg.getNumOrNone() or 1
+        settleTime = self.settleTimeWdg.getNumOrNone() or 0.0
+        timePerStar = SlewOverheadSec + settleTime + (numExp * (expTime + ExpOverheadSec))
+        return slewTime + (timePerStar * len(starNums))
+
+    def updatePlan(self, wdg=None):
+        """Plan the order of the stars not yet visited, predict the run time and update the graph
+
+        Stars to skip are planned last (they are not measured, so they do not affect the order)
+        and are excluded from the predicted time.
+
+        Inputs:
+        - wdg: ignored (allows use as a widget callback)
+        """
+        if self.azAltList is None:
+            return
+        visitedSet = set(self.visitedStarNums)
+        if self.sr.isExecuting and self.currStarNum > 0:
+            # the current star has been taken from the plan, but may not yet be visited
+            visitedSet.add(self.currStarNum)
+        skipSet = self.starsToSkipWdg.intSet
+        self._plannedSkipSet = set(skipSet)
+        starNums = [starNum for starNum in range(1, len(self.azAltList) + 1)
+            if starNum not in visitedSet and starNum not in skipSet]
+        slewTimeModel = self.getSlewTimeModel()
+        measureStarNums = self.orderStarNums(starNums, slewTimeModel)
+        self.plannedStarNums = measureStarNums + sorted(skipSet - visitedSet)
+        fileTime = self.predictRunTime(starNums, slewTimeModel)
+        if self.starOrderWdg.getString() == MinSlewOrder:
+            plannedTime = self.predictRunTime(measureStarNums, slewTimeModel)
+            self.runTimeNote = "Predicted time: %s (file order: %s)" % \
+                (formatHrMin(plannedTime), formatHrMin(fileTime))
+        else:
+            self.runTimeNote = "Predicted time: %s" % (formatHrMin(fileTime),)
+        self.plotGrid()
+
+    def _starsToSkipCallback(self, wdg=None):
+        """Stars to skip may have changed; update the plan if so
+
+        Called for every change to the text (while editing, intSet is not updated)
+        and when editing is done.
+        """
+        if self.starsToSkipWdg.intSet != self._plannedSkipSet:
+            self.updatePlan()
+
+    def plotGrid(self):
+        """Plot the grid: stars visited, in order, then the planned stars (except stars to skip)
+        """
+        skipSet = self.starsToSkipWdg.intSet
+        plannedStarNums = [starNum for starNum in self.plannedStarNums if starNum not in skipSet]
+        starOrder = [starNum - 1 for starNum in self.visitedStarNums + plannedStarNums]
+        self.azAltGraph.plotAzAltPoints(self.azAltList, order=starOrder, note=self.runTimeNote)
 
     def starNumIter(self):
         """Return number of next star to measure (starNum = grid index + 1)
 
         If there are any stars in starsToRetryWdg that are not in starsToSkipWdg
-        then return the smallest of those, else return next star in grid
+        then return the first of those (the smallest, or the nearest if ordering for minimum slew),
+        else return the next star in the planned order (see updatePlan).
+        The plan is updated after retrying stars and when stars to skip are added or removed.
         """
-        indIter = iter(list(range(len(self.azAltList))))
+        self.plannedStarNums = [starNum for starNum in self.plannedStarNums
+            if starNum not in self.visitedStarNums]
+        plannedSkipSet = None # stars to skip when the plan was made; None to replan
         while True:
             try:
                 retryStarSet = self.starsToRetryWdg.intSet - self.starsToSkipWdg.intSet
                 if retryStarSet:
-                    retryStarList = sorted(retryStarSet)
-                    nextStarNum = retryStarList.pop(0)
+                    nextStarNum = self.orderStarNums(retryStarSet)[0]
                     self.starsToRetryWdg.removeInt(nextStarNum)
+                    # the telescope is no longer where the plan expected
+                    plannedSkipSet = None
                     yield nextStarNum
                 else:
-                    nextStarNum = next(indIter) + 1
-                    if nextStarNum in self.starsToSkipWdg.intSet:
+                    skipSet = self.starsToSkipWdg.intSet
+                    if skipSet != plannedSkipSet:
+                        # plan the stars not to skip (from the current position), then the stars to skip
+                        self.plannedStarNums = \
+                            self.orderStarNums(set(self.plannedStarNums) - skipSet) \
+                            + sorted(set(self.plannedStarNums) & skipSet)
+                        plannedSkipSet = set(skipSet)
+                    if not self.plannedStarNums:
+                        raise StopIteration()
+                    nextStarNum = self.plannedStarNums.pop(0)
+                    if nextStarNum in skipSet:
                         self.sr.showMsg("Skipping star %d" % (nextStarNum,))
                         self.missingStarsWdg.addInt(nextStarNum)
+                        self.visitedStarNums.append(nextStarNum)
                         continue
                     yield nextStarNum
             except StopIteration:
                 hasMissingStars = bool(self.missingStarsWdg.intSet - self.starsToSkipWdg.intSet)
                 if not self.attendedModeWdg.getBool() and hasMissingStars:
+                    self.recordPending()
                     yield self.sr.waitPause("Some stars missing; paused to allow retry",
                         severity=RO.Constants.sevWarning)
                 else:
@@ -734,6 +927,8 @@ class ScriptClass(object):
         i = starNum - 1
         rec = self.azAltList[i]
         self.currStarNum = starNum
+        if starNum not in self.visitedStarNums:
+            self.visitedStarNums.append(starNum)
         sr = self.sr
 
         try:
@@ -741,7 +936,6 @@ class ScriptClass(object):
             az = rec["az"]
             alt = rec["alt"]
             self.azAltList["state"][i] = self.azAltGraph.Measuring
-            self.azAltGraph.plotAzAltPoints(self.azAltList)
 
             minMag = self.getEntryNum(self.minMagWdg)
             maxMag = self.getEntryNum(self.maxMagWdg)
@@ -755,16 +949,18 @@ class ScriptClass(object):
                 checkFail = False,
             )
 
-            # slew to the pointing reference star
+            # slew to the pointing reference star, recording the previous star while slewing
             # use checkFail=False for all commands so the script can continue with the next star
-            yield sr.waitCmd(
+            cmdVar = sr.startCmd(
                 actor = "tcc",
                 cmdStr = "track %0.7f, %0.7f obs/pterr/rottype=%s/rotang=0/magRange=(%s, %s)" % \
                     (az, alt, rotType, minMag, maxMag),
                 keyVars = (self.tccModel.ptRefStar,),
                 checkFail = False,
             )
-            cmdVar = sr.value
+            self.recordPending()
+            self.plotGrid()
+            yield sr.waitCmdVars([cmdVar], checkFail=False)
             if cmdVar is None or cmdVar.didFail:
                 raise ScriptError("Slew to pointing reference star failed")
             ptRefStarValues = cmdVar.getLastKeyVarData(self.tccModel.ptRefStar)
@@ -822,7 +1018,8 @@ class ScriptClass(object):
             self.sr.showMsg(str(e), severity=RO.Constants.sevWarning)
             self.missingStarsWdg.addInt(starNum)
             self.azAltList["state"][i] = self.azAltGraph.Failed
-            self.azAltGraph.plotAzAltPoints(self.azAltList)
+            self.recordPending()
+            self.plotGrid()
             if self.attendedModeWdg.getBool():
                 self.starsToRetryWdg.addInt(starNum)
                 yield self.sr.waitPause("Star %s failed; paused so you can retry" % (starNum,),
@@ -831,18 +1028,16 @@ class ScriptClass(object):
 
         # log pointing error
         # do this after the last measurement of the star, so we have only one entry per star
-        # and record the value with the star most accurately centered (we hope)
+        # and record the value with the star most accurately centered (we hope);
+        # update the star lists now (they affect which star is next), but write the data
+        # and update the graph while slewing to the next star (see recordPending)
         currStarName = self.sr.getKeyVar(self.tccModel.objName, defVal="?")
         dataIDStr = "entry %d star %d %s" % (self.numStarsWritten + 1, self.currStarNum, currStarName)
-        dataStr = "%s  ! %s\n" % (ptErr.getPtDataStr(), dataIDStr)
-        ptDataFile.write(dataStr)
-        ptDataFile.flush()
         self.numStarsWritten += 1
-        self.dataIDWdg.set(dataIDStr)
         self.missingStarsWdg.removeInt(starNum)
         self.starsToRetryWdg.removeInt(starNum)
         self.azAltList["state"][i] = self.azAltGraph.Measured
-        self.azAltGraph.plotAzAltPoints(self.azAltList)
+        self._recordFunc = functools.partial(self._recordStar, ptErr, dataIDStr, ptDataFile)
 
 
 class AzAltGraph(Tkinter.Frame):
@@ -876,13 +1071,15 @@ class AzAltGraph(Tkinter.Frame):
         self.axis.set_yticks((0, 15, 30, 45, 60, 75, 90))
         self.axis.set_yticklabels([]) # ['75', '60', '45', '15', '0'])
 
-    def plotAzAltPoints(self, azAltPoints):
+    def plotAzAltPoints(self, azAltPoints, order=None, note=""):
         """Plot az/alt points
 
         Inputs:
         - azAltPoints: data in the form of a numpy array with named columns for az, alt and state,
             where state is one of Unmeasured, Measuring, Measured or Failed
             (use self.DType to construct the array)
+        - order: indices of the points in the order they are connected; if None then in array order
+        - note: text to show below the plot
         """
         self.axis.clear()
 
@@ -905,6 +1102,8 @@ class AzAltGraph(Tkinter.Frame):
 
 
         # plot connecting lines
+        if order is not None:
+            azAltPoints = azAltPoints[numpy.array(order, dtype=int)]
         az = azAltPoints["az"]
         alt = azAltPoints["alt"]
 
@@ -912,10 +1111,185 @@ class AzAltGraph(Tkinter.Frame):
         theta = numpy.deg2rad(numpy.subtract(270, az))
         self.axis.plot(theta, r, linestyle="-", linewidth=0.4, color="gray")
 
+        if note:
+            self.axis.text(0.5, -0.05, note, transform=self.axis.transAxes,
+                horizontalalignment="center", verticalalignment="top")
+
         self._setLimits()
         self.figCanvas.draw()
 
 
+class SlewTimeModel(object):
+    """Estimate the time to slew between az/alt positions
+
+    Each axis moves independently with a trapezoidal velocity profile (constant acceleration
+    to maximum velocity, then constant deceleration); the slew time is the time taken by the slowest axis.
+    The rotator is assumed to track the parallactic angle if rotType is Object, else to not move.
+    Azimuth is assumed to move the shortest way that is within the azimuth limits.
+    """
+    def __init__(self, tccModel, rotType):
+        """Construct a SlewTimeModel
+
+        Inputs:
+        - tccModel: TCC model; axis limits are read from keywords AzLim, AltLim and RotLim
+            (DefAxisLimList is used for any axis whose limits are unknown)
+        - rotType: rotation type; one of "Object", "Horizon" or "Mount"
+        """
+        self.axisLimList = []
+        for limKeyVar, defAxisLim in zip((tccModel.azLim, tccModel.altLim, tccModel.rotLim), DefAxisLimList):
+            axisLim = limKeyVar.valueList[0:4]
+            if len(axisLim) < 4 or None in axisLim or min(axisLim[2:4]) <= 0:
+                axisLim = defAxisLim
+            self.axisLimList.append(tuple(float(val) for val in axisLim))
+        self.rotTracksObj = rotType.lower() == "object"
+        self._sinLat = math.sin(math.radians(MeanLat))
+        self._cosLat = math.cos(math.radians(MeanLat))
+
+    def getAxisTime(self, axisInd, dist):
+        """Return the time (sec) for one axis to move a given distance
+
+        Inputs:
+        - axisInd: 0 for az, 1 for alt, 2 for rot
+        - dist: distance (deg); may be an array
+        """
+        vel, accel = self.axisLimList[axisInd][2:4]
+        dist = numpy.abs(dist)
+        return numpy.where(
+            dist > vel**2 / accel,
+            (dist / vel) + (vel / accel),
+            2.0 * numpy.sqrt(dist / accel),
+        )
+
+    def getRot(self, az, alt):
+        """Return the estimated rotator position (deg, relative to an arbitrary zero point)
+
+        Inputs:
+        - az: azimuth (deg, S=0, E=90); may be an array
+        - alt: altitude (deg); may be an array
+        """
+        if not self.rotTracksObj:
+            return numpy.zeros(numpy.shape(az))
+        # parallactic angle
+        azNRad = numpy.radians(numpy.add(az, 180.0))
+        altRad = numpy.radians(alt)
+        sinDec = (numpy.sin(altRad) * self._sinLat) + (numpy.cos(altRad) * self._cosLat * numpy.cos(azNRad))
+        return numpy.degrees(numpy.arctan2(
+            numpy.sin(azNRad) * self._cosLat * numpy.cos(altRad),
+            self._sinLat - (numpy.sin(altRad) * sinDec),
+        ))
+
+    def getTimeArr(self, fromAz, fromAlt, toAzArr, toAltArr):
+        """Return the slew time (sec) from one position to an array of positions,
+        or between corresponding elements of two arrays of positions
+
+        Azimuth is assumed to move the shortest way around, ignoring the azimuth limits.
+        """
+        azDist = numpy.abs(numpy.mod(numpy.subtract(toAzArr, fromAz) + 180.0, 360.0) - 180.0)
+        altDist = numpy.subtract(toAltArr, fromAlt)
+        rotDist = numpy.mod(self.getRot(toAzArr, toAltArr) - self.getRot(fromAz, fromAlt) + 180.0, 360.0) - 180.0
+        return numpy.maximum(numpy.maximum(
+            self.getAxisTime(0, azDist),
+            self.getAxisTime(1, altDist)),
+            self.getAxisTime(2, rotDist),
+        )
+
+    def getPathTime(self, startAz, startAlt, azArr, altArr):
+        """Return the total slew time (sec) to visit a sequence of positions
+
+        This models the azimuth wrap: each move is the shortest one that is within the azimuth limits.
+
+        Inputs:
+        - startAz, startAlt: starting position (deg); startAz is a mount azimuth, so it may be outside [0, 360)
+        - azArr, altArr: positions to visit (deg), in order
+        """
+        minAz, maxAz = self.axisLimList[0][0:2]
+        currAz = startAz
+        azDistList = []
+        for az in azArr:
+            # try the nearest wrap first, then the other wraps (nearest first)
+            nearAz = currAz + ((az - currAz + 180.0) % 360.0) - 180.0
+            for newAz in (nearAz, nearAz - 360.0, nearAz + 360.0):
+                if minAz <= newAz <= maxAz:
+                    break
+            else:
+                newAz = nearAz
+            azDistList.append(newAz - currAz)
+            currAz = newAz
+        fullAltArr = numpy.concatenate(([startAlt], altArr))
+        fullRotArr = self.getRot(numpy.concatenate(([startAz], azArr)), fullAltArr)
+        rotDistArr = numpy.mod(numpy.diff(fullRotArr) + 180.0, 360.0) - 180.0
+        return numpy.sum(numpy.maximum(numpy.maximum(
+            self.getAxisTime(0, numpy.array(azDistList)),
+            self.getAxisTime(1, numpy.diff(fullAltArr))),
+            self.getAxisTime(2, rotDistArr),
+        ))
+
+
+def orderForMinSlew(slewTimeModel, startAz, startAlt, azArr, altArr, maxPasses=50):
+    """Return an order in which to visit positions that approximately minimizes total slew time
+
+    Computes a nearest-neighbor path from the starting position, then improves it using 2-opt
+    (reversing sections of the path while that shortens it).
+
+    Inputs:
+    - slewTimeModel: a SlewTimeModel
+    - startAz, startAlt: starting position (deg)
+    - azArr, altArr: positions to visit (deg)
+    - maxPasses: maximum number of 2-opt passes
+
+    Returns a list of indices into azArr and altArr
+    """
+    numPos = len(azArr)
+    if numPos < 2:
+        return list(range(numPos))
+
+    # slew time matrix; index 0 is the starting position and index numPos + 1 is a dummy end,
+    # which costs nothing to reach, so the path can end anywhere
+    fullAzArr = numpy.concatenate(([startAz], azArr))
+    fullAltArr = numpy.concatenate(([startAlt], altArr))
+    timeArr = numpy.zeros((numPos + 2, numPos + 2))
+    timeArr[0:numPos + 1, 0:numPos + 1] = slewTimeModel.getTimeArr(
+        fullAzArr[:, numpy.newaxis], fullAltArr[:, numpy.newaxis], fullAzArr, fullAltArr)
+
+    # nearest neighbor path
+    path = [0]
+    isVisitedArr = numpy.zeros(numPos + 1, dtype=bool)
+    isVisitedArr[0] = True
+    for i in range(numPos):
+        nextInd = numpy.argmin(numpy.where(isVisitedArr, numpy.inf, timeArr[path[-1], 0:numPos + 1]))
+        path.append(nextInd)
+        isVisitedArr[nextInd] = True
+    path.append(numPos + 1)
+    path = numpy.array(path)
+
+    # 2-opt: reverse path[i:j+1] if that reduces the total time;
+    # the start and the dummy end stay in place
+    for passInd in range(maxPasses):
+        didImprove = False
+        for i in range(1, numPos):
+            jArr = numpy.arange(i + 1, numPos + 1)
+            a = path[i - 1]
+            b = path[i]
+            cArr = path[jArr]
+            dArr = path[jArr + 1]
+            deltaArr = timeArr[a, cArr] + timeArr[b, dArr] - timeArr[a, b] - timeArr[cArr, dArr]
+            k = numpy.argmin(deltaArr)
+            if deltaArr[k] < -1.0e-6:
+                j = jArr[k]
+                path[i:j + 1] = path[i:j + 1][::-1]
+                didImprove = True
+        if not didImprove:
+            break
+    return [ind - 1 for ind in path[1:-1]]
+
+
+def formatHrMin(sec):
+    """Format a duration in seconds as hours:minutes
+    """
+    minutes = int(round(sec / 60.0))
+    return "%d:%02d" % (minutes // 60, minutes % 60)
+
+
 def getGridDirs():
     """Return grid directories
 
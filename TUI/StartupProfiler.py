@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""Measure where TUI spends its time at startup.
+
+To enable, set environment variable STUI_PROFILE_STARTUP to any non-empty value
+or run runstui.py with the --profile-startup flag. When enabled, TUI records
+the wall time taken by each module import and by each startup task
+(such as each addWindow call), and prints a ranked report once startup is complete.
+
+To check a startup-time budget, also set STUI_STARTUP_BUDGET to the allowed time (sec);
+the report then warns if startup took longer.
+
+Import times are measured for imports done in the main thread.
+For each module that is newly loaded, the report lists the cumulative time
+(including modules it imports) and the self time (excluding those modules).
+"""
+import contextlib
+import os
+import sys
+import threading
+import time
+try:
+    import __builtin__ as builtins
+except ImportError:
+    import builtins
+
+__all__ = ["ProfileFlag", "ProfileEnvVar", "isEnabled", "start", "timeTask", "stopAndReport"]
+
+# command-line flag for runstui.py and environment variable that enable profiling
+ProfileFlag = "--profile-startup"
+ProfileEnvVar = "STUI_PROFILE_STARTUP"
+_BudgetEnvVar = "STUI_STARTUP_BUDGET"
+
+# maximum number of entries in each section of the report
+_MaxReportItems = 25
+
+class StartupProfiler(object):
+    """Record the time taken by imports and startup tasks.
+    """
+    def __init__(self):
+        self.importDict = {} # dict of import name: [cumulative time, self time]
+        self.taskList = [] # list of (task name, time)
+        self.startTime = None
+        self.stopTime = None
+        self._origImport = None
+        self._threadIdent = None
+        self._childTimeStack = []
+        self._nameStack = []
+
+    def start(self):
+        """Start recording imports.
+        """
+        if self._origImport is not None:
+            return
+        self.startTime = time.time()
+        self._threadIdent = threading.current_thread().ident
+        self._origImport = builtins.__import__
+        builtins.__import__ = self._timedImport
+
+    def stop(self):
+        """Stop recording imports.
+        """
+        if self._origImport is None:
+            return
+        builtins.__import__ = self._origImport
+        self._origImport = None
+        self.stopTime = time.time()
+
+    @property
+    def isRunning(self):
+        return self._origImport is not None
+
+    @contextlib.contextmanager
+    def timeTask(self, taskName):
+        """Context manager that records the time taken by a task.
+        """
+        t0 = time.time()
+        try:
+            yield
+        finally:
+            self.taskList.append((taskName, time.time() - t0))
+
+    def getReport(self, budget=None):
+        """Return a report as a string
+
+        Inputs:
+        - budget: startup-time budget (sec), or None if none
+        """
+        totalTime = (self.stopTime or time.time()) - self.startTime
+        lineList = ["Startup profile: total time %.2f sec" % (totalTime,)]
+        if budget is not None:
+            if totalTime > budget:
+                lineList.append("WARNING: startup time exceeds budget of %.2f sec" % (budget,))
+            else:
+                lineList.append("Startup time is within budget of %.2f sec" % (budget,))
+
+        taskList = sorted(self.taskList, key=lambda item: item[1], reverse=True)
+        lineList.append("")
+        lineList.append("Slowest of %d tasks:" % (len(taskList),))
+        lineList.append("   Sec  Task")
+        for taskName, dTime in taskList[0:_MaxReportItems]:
+            lineList.append("%6.3f  %s" % (dTime, taskName))
+
+        importList = sorted(self.importDict.items(), key=lambda item: item[1][0], reverse=True)
+        lineList.append("")
+        lineList.append("Slowest of %d imports:" % (len(importList),))
+        lineList.append("CumSec SelfSec  Module")
+        for name, (cumTime, selfTime) in importList[0:_MaxReportItems]:
+            lineList.append("%6.3f  %6.3f  %s" % (cumTime, selfTime, name))
+        return "\n".join(lineList)
+
+    def _timedImport(self, name, globals=None, locals=None, fromlist=(), *args, **kargs):
+        """Replacement for __import__ that records the time taken to load new modules
+        """
+        if threading.current_thread().ident != self._threadIdent:
+            return self._origImport(name, globals, locals, fromlist, *args, **kargs)
+
+        if name and not name.startswith("."):
+            importName = name
+        else:
+            importerName = (globals or {}).get("__name__", "?")
+            importName = "%s: %s" % (importerName, name or ", ".join(fromlist or ()))
+
+        nModules = len(sys.modules)
+        self._childTimeStack.append(0.0)
+        self._nameStack.append(importName)
+        t0 = time.time()
+        try:
+            return self._origImport(name, globals, locals, fromlist, *args, **kargs)
+        finally:
+            dTime = time.time() - t0
+            childTime = self._childTimeStack.pop()
+            self._nameStack.pop()
+            if self._childTimeStack:
+                self._childTimeStack[-1] += dTime
+            # only record the outermost import of a given name
+            # (an import hook may import the same module again)
+            if len(sys.modules) > nModules and importName not in self._nameStack:
+                timeList = self.importDict.setdefault(importName, [0.0, 0.0])
+                timeList[0] += dTime
+                timeList[1] += dTime - childTime
+
+
+_Profiler = None
+
+def isEnabled():
+    """Return True if startup profiling has been requested.
+    """
+    return bool(os.environ.get(ProfileEnvVar))
+
+def start():
+    """Start profiling, if startup profiling has been requested.
+
+    Call as early as possible, before importing the rest of TUI.
+    """
+    global _Profiler
+    if not isEnabled():
+        return
+    if _Profiler is None:
+        _Profiler = StartupProfiler()
+    _Profiler.start()
+
+def timeTask(taskName):
+    """Return a context manager that records the time taken by a startup task.
+
+    Does nothing if startup profiling is not running.
+    """
+    if _Profiler is None or not _Profiler.isRunning:
+        return _noopContext()
+    return _Profiler.timeTask(taskName)
+
+def stopAndReport():
+    """Stop profiling and print the report to stdout.
+
+    Does nothing if startup profiling is not running.
+    """
+    if _Profiler is None or not _Profiler.isRunning:
+        return
+    _Profiler.stop()
+
+    budget = None
+    budgetStr = os.environ.get(_BudgetEnvVar)
+    if budgetStr:
+        try:
+            budget = float(budgetStr)
+        except ValueError:
+            sys.stderr.write("Ignoring invalid %s=%r\n" % (_BudgetEnvVar, budgetStr))
+    sys.stdout.write(_Profiler.getReport(budget=budget) + "\n")
+
+@contextlib.contextmanager
+def _noopContext():
+    yield
@@ -0,0 +1,41 @@
+"""Manifest of TUI's standard window modules.
+
+Generated by genLoadStdModules.py; do not edit.
+"""
+# one entry per window module, in load order:
+# (module name, ((window name, default visibility), ...), heavy dependencies, lazy)
+WindowModuleList = (
+    ('TUI.TUIMenu.AboutWindow', (('STUI.About STUI', False),), ('PIL', 'astropy', 'matplotlib', 'numpy', 'pyfits', 'pygame'), True),
+    ('TUI.TUIMenu.CallbackProfileWindow', (('STUI.Callback Profile', False),), (), True),
+    ('TUI.TUIMenu.ConnectWindow', (('STUI.Connect', False),), (), False),
+    ('TUI.TUIMenu.DownloadsWindow', (('STUI.Downloads', False),), (), False),
+    ('TUI.TUIMenu.LogWindow', (('STUI.Log 1', True), ('STUI.Log 2', False), ('STUI.Log 3', False), ('STUI.Log 4', False), ('STUI.Log 5', False), ('STUI.Log 6', False), ('STUI.Log 7', False), ('STUI.Log 8', False), ('STUI.Log 9', False), ('STUI.Log 10', False)), (), False),
+    ('TUI.TUIMenu.PreferencesWindow', (('STUI.Preferences', False),), (), False),
+    ('TUI.TUIMenu.PythonWindow', (('STUI.Python', False),), (), False),
+    ('TUI.TUIMenu.UsersWindow', (('STUI.Users', False),), (), False),
+    ('TUI.Inst.APOGEE.APOGEEWindow', (('Inst.APOGEE', False),), (), True),
+    ('TUI.Inst.APOGEEQL.APOGEEQLWindow', (('Inst.APOGEE QuickLook', False),), ('matplotlib', 'numpy'), False),
+    ('TUI.Inst.BOSS.BOSSWindow', (('Inst.BOSS', False),), (), False),
+    ('TUI.Inst.Guide.FocusPlotWindow', (('Inst.Focus Plot', True),), ('matplotlib', 'numpy'), True),
+    ('TUI.Inst.Guide.GuideWindow', (('Inst.Guide', True),), ('matplotlib', 'numpy'), False),
+    ('TUI.Inst.GuideMonitor.BOSSMonitorWindow', (('Inst.BOSS Monitor', False),), ('matplotlib',), False),
+    ('TUI.Inst.GuideMonitor.FluxMonitorWindow', (('Inst.Flux Monitor', False),), ('matplotlib',), False),
+    ('TUI.Inst.GuideMonitor.FocusMonitorWindow', (('Inst.Focus Monitor', False),), ('matplotlib',), False),
+    ('TUI.Inst.GuideMonitor.GuideMonitorWindow', (('Inst.Guide Monitor', False),), ('matplotlib',), False),
+    ('TUI.Inst.GuideMonitor.ScaleMonitorWindow', (('Inst.Scale Monitor', False),), ('matplotlib',), False),
+    ('TUI.Inst.GuideMonitor.SeeingMonitorWindow', (('Inst.Seeing Monitor', False),), ('matplotlib',), False),
+    ('TUI.Inst.SOP.SOPWindow', (('Inst.SOP', True),), (), True),
+    ('TUI.Misc.Alerts.AlertsWindow', (('Misc.Alerts', True),), (), False),
+    ('TUI.Misc.Interlocks.InterlocksWindow', (('Misc.Interlocks', False),), (), True),
+    ('TUI.Misc.MCP.MCPWindow', (('Misc.MCP', False),), (), True),
+    ('TUI.Misc.MessageWindow', (('Misc.Message', True),), (), False),
+    ('TUI.TCC.FiducialsWdg.FiducialsWindow', (('TCC.Fiducials', True),), (), True),
+    ('TUI.TCC.FocalPlaneWindow', (('TCC.Focal Plane', True),), (), True),
+    ('TUI.TCC.FocusWindow', (('TCC.Secondary Focus', True),), (), True),
+    ('TUI.TCC.MirrorStatusWindow', (('TCC.Mirror Status', False),), (), True),
+    ('TUI.TCC.NudgerWindow', (('TCC.Nudger', False),), (), True),
+    ('TUI.TCC.OffsetWdg.OffsetWindow', (('TCC.Offset', True),), (), False),
+    ('TUI.TCC.SkyWindow', (('TCC.Sky', True),), ('numpy',), True),
+    ('TUI.TCC.SlewWdg.SlewWindow', (('TCC.Slew', True),), ('numpy',), False),
+    ('TUI.TCC.StatusWdg.StatusWindow', (('TCC.Status', True),), (), False),
+)
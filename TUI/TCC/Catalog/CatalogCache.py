@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""Cache parsed object catalogs in a compact binary form.
+
+Parsing and checking a large catalog is slow, so parsed catalogs are saved
+in TUI.TUIPaths.getCatalogCacheDir(), one cache file per catalog file,
+and reused as long as the catalog file's path, modification time and size are unchanged,
+as are the TUI version (which determines the parsing and checking rules)
+and the TCC's az/alt limits (against which Mount positions are checked; see SlewValueChecker).
+Catalogs modified very recently are not cached, because a second change
+within the resolution of the file system's modification time would not be noticed.
+
+Each cache file holds the catalog options, the list of rejected lines,
+the value dictionary of each object (name and options) and the numeric data
+of each object as columns (position, date, proper motion, parallax and radial velocity),
+from which TelTargets are restored without any string parsing.
+
+Caching is strictly an optimization: any problem reading or writing a cache file
+simply means the catalog is parsed from scratch.
+"""
+import hashlib
+import os
+import sys
+import time
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+import numpy
+import RO.CoordSys
+import RO.StringUtil
+import TUI.Models
+import TUI.TUIPaths
+import TUI.TCC.TelTarget
+import TUI.Version
+
+__all__ = ["loadCat", "saveCat"]
+
+# increment if the format of the cache file changes
+_CacheVersion = 2
+
+# catalog files modified more recently than this (sec) before parsing started are not cached
+_MinMTimeAge = 2.0
+
+# columns of the numeric data array
+_NumCols = ("pos0", "pos1", "date", "pm0", "pm1", "parlax", "radVel")
+
+def loadCat(filePath):
+    """Load a catalog from the cache.
+
+    Returns two items (as per ParseCat.CatalogParser.parseCat):
+    - objCat: the catalog as a TUI.TCC.TelTarget.Catalog
+    - errList: a list of (line, errMsg) tuples, one per rejected line of object data
+    or None if the catalog is not cached or the cached data is out of date.
+    """
+    try:
+        cacheKey = _getCacheKey(filePath)
+        cachePath = _getCachePath(cacheKey)
+        if not os.path.isfile(cachePath):
+            return None
+        with open(cachePath, "rb") as fp:
+            cacheData = pickle.load(fp)
+        if cacheData.get("version") != _CacheVersion or cacheData.get("key") != cacheKey:
+            return None
+
+        valueDictList = cacheData["valueDictList"]
+        csysConstList = [RO.CoordSys.getSysConst(csysName) for csysName in cacheData["csysNameList"]]
+        csysIndArr = cacheData["csysIndArr"]
+        numArr = cacheData["numArr"]
+        if len(csysIndArr) != len(valueDictList) or len(numArr) != len(valueDictList):
+            return None
+
+        objList = []
+        for valueDict, csysInd, numData in zip(valueDictList, csysIndArr.tolist(), numArr.tolist()):
+            if csysInd < 0:
+                objList.append(TUI.TCC.TelTarget.TelTarget(valueDict))
+                continue
+            pos0, pos1, dateFloat, pm0, pm1, parlax, radVel = numData
+            if numpy.isnan(dateFloat):
+                dateFloat = None
+            objList.append(TUI.TCC.TelTarget.TelTarget.fromParsedData(
+                valueDict = valueDict,
+                csysConst = csysConstList[csysInd],
+                posDeg = (pos0, pos1),
+                dateFloat = dateFloat,
+                pm = [pm0, pm1],
+                parlax = parlax,
+                radVel = radVel,
+            ))
+
+        objCat = TUI.TCC.TelTarget.Catalog(
+            name = os.path.basename(filePath),
+            objList = objList,
+        **cacheData["catOptions"])
+        return objCat, cacheData["errList"]
+    except Exception as e:
+        sys.stderr.write("Could not load cached catalog %s: %s\n" % (filePath, RO.StringUtil.strFromException(e)))
+        return None
+
+def saveCat(filePath, objCat, errList, parseStartTime=None):
+    """Save a parsed catalog to the cache.
+
+    Inputs:
+    - filePath: path to catalog file
+    - objCat, errList: data returned by ParseCat.CatalogParser.parseCat
+    - parseStartTime: time at which parsing started (as returned by time.time());
+        if None then the current time is used.
+        The catalog is not cached if it was modified less than _MinMTimeAge sec before this time,
+        or at any time after it (i.e. while it was being parsed).
+
+    Failure is reported on stderr but is otherwise ignored.
+    """
+    if parseStartTime is None:
+        parseStartTime = time.time()
+    try:
+        cacheKey = _getCacheKey(filePath)
+        if cacheKey[1] + _MinMTimeAge >= parseStartTime:
+            return
+        cachePath = _getCachePath(cacheKey)
+
+        objList = objCat.getObjList()
+        csysNameList = []
+        csysIndDict = {}
+        csysIndArr = numpy.zeros(len(objList), dtype=numpy.int32)
+        numArr = numpy.zeros((len(objList), len(_NumCols)), dtype=float)
+        for ind, obj in enumerate(objList):
+            if obj.csysConst is None:
+                csysIndArr[ind] = -1
+                continue
+            csysName = obj.csysConst.name()
+            csysInd = csysIndDict.get(csysName)
+            if csysInd is None:
+                csysInd = len(csysNameList)
+                csysIndDict[csysName] = csysInd
+                csysNameList.append(csysName)
+            csysIndArr[ind] = csysInd
+            dateFloat = obj.dateFloat
+            if dateFloat is None:
+                dateFloat = numpy.nan
+            numArr[ind] = (obj.posDeg[0], obj.posDeg[1], dateFloat,
+                obj.pm[0], obj.pm[1], obj.parlax, obj.radVel)
+
+        cacheData = dict(
+            version = _CacheVersion,
+            key = cacheKey,
+            catOptions = dict(
+                doDisplay = objCat.getDoDisplay(),
+                dispColor = objCat.getDispColor(),
+            ),
+            errList = errList,
+            valueDictList = [obj.getValueDict() for obj in objList],
+            csysNameList = csysNameList,
+            csysIndArr = csysIndArr,
+            numArr = numArr,
+        )
+
+        cacheDir = os.path.dirname(cachePath)
+        if not os.path.isdir(cacheDir):
+            os.makedirs(cacheDir)
+
+        # write to a temporary file, then rename, so a partial file is never read
+        tempPath = cachePath + ".tmp"
+        with open(tempPath, "wb") as fp:
+            pickle.dump(cacheData, fp, pickle.HIGHEST_PROTOCOL)
+        if os.path.exists(cachePath):
+            os.remove(cachePath)
+        os.rename(tempPath, cachePath)
+    except Exception as e:
+        sys.stderr.write("Could not cache catalog %s: %s\n" % (filePath, RO.StringUtil.strFromException(e)))
+
+def _getCacheKey(filePath):
+    """Return the cache key for a catalog file:
+    (absolute path, modification time, size, TUI version, (az limits, alt limits))
+
+    The az and alt limits are (min, max) as reported by the TCC (None if unknown);
+    they are used to check objects in Mount coordinates.
+    """
+    absPath = os.path.abspath(filePath)
+    fileStat = os.stat(absPath)
+    tccModel = TUI.Models.getModel("tcc")
+    mountLimits = (tuple(tccModel.azLim.valueList[0:2]), tuple(tccModel.altLim.valueList[0:2]))
+    return (absPath, fileStat.st_mtime, fileStat.st_size, TUI.Version.VersionStr, mountLimits)
+
+def _getCachePath(cacheKey):
+    """Return the path of the cache file for a given cache key
+    """
+    absPath = cacheKey[0]
+    if not isinstance(absPath, bytes):
+        absPath = absPath.encode("utf-8")
+    cacheName = hashlib.md5(absPath).hexdigest() + ".cache"
+    return os.path.join(TUI.TUIPaths.getCatalogCacheDir(), cacheName)
@@ -29,6 +29,7 @@ History:
 """
 import os
 import sys
+import time
 import Tkinter
 import tkFileDialog
 import RO.Constants
@@ -37,12 +38,15 @@ import RO.StringUtil
 import RO.Alg
 import RO.TkUtil
 import RO.Wdg
+from opscore.actor import ScriptRunner
 import TUI.Base.Wdg
 import TUI.TCC.UserModel
+from . import CatalogCache
 from . import ParseCat
 
 _NItems = 20    # number of items in partial menu
 _MaxItems = 25  # max # of items in a menu
+_ProgressInterval = 0.5 # interval between catalog loading progress reports (sec)
 
 class CatalogMenuWdg(Tkinter.Frame):
     """Display a catalog pop-up menu.
@@ -68,6 +72,9 @@ class CatalogMenuWdg(Tkinter.Frame):
         userModel = TUI.TCC.UserModel.Model()
         self.userCatDict = userModel.userCatDict
         self.statusBar = statusBar
+        self._loadSR = None
+        self._loadProgress = None
+        self._loadProgressTimer = RO.TkUtil.Timer()
         
         # create file dialog (reusing the same one
         # means the directory is the same each time)
@@ -141,18 +148,71 @@ class CatalogMenuWdg(Tkinter.Frame):
         # in case a Tcl object was returned...
         catFile = RO.CnvUtil.asStr(catFile)
         
-        # parse the catalog file
+        # cancel the previous load, if still executing
+        if self._loadSR and self._loadSR.isExecuting:
+            self._loadSR.cancel()
+        self._loadProgressTimer.cancel()
+        
+        # parse the catalog file in a background thread
         # print "loading catalog %r" % (catFile,)
         self.showMsg("Loading file %s" % (catFile,))
+        self._loadProgress = None
+        
+        def loadCat(sr, self=self, catFile=catFile):
+            self._loadProgressTimer.start(_ProgressInterval, self._reportLoadProgress, catFile)
+            yield sr.waitThread(self._parseCat, catFile)
+            self._loadProgressTimer.cancel()
+            objCat, errList, errMsg = sr.value
+            if errMsg:
+                self.showMsg(
+                    msgStr = "Could not load %s: %s" % (catFile, errMsg),
+                    severity = RO.Constants.sevError,
+                )
+                return
+            self._addCatalog(catFile, objCat, errList)
+        
+        self._loadSR = ScriptRunner(
+            runFunc = loadCat,
+            name = "loadCatalog",
+        )
+        self._loadSR.start()
+    
+    def _parseCat(self, catFile):
+        """Parse a catalog file; run in a background thread.
+        
+        Uses the cached catalog, if the catalog file has not changed since it was cached;
+        otherwise parses the catalog file and caches the result.
+        
+        Returns objCat, errList, errMsg;
+        if parsing failed then errMsg is a string and objCat and errList are None.
+        """
+        cachedData = CatalogCache.loadCat(catFile)
+        if cachedData:
+            objCat, errList = cachedData
+            return (objCat, errList, None)
+        
+        def progFunc(nDone, nTotal):
+            self._loadProgress = (nDone, nTotal)
+        
+        parseStartTime = time.time()
         try:
-            objCat, errList = self._catParser.parseCat(catFile)
+            objCat, errList = self._catParser.parseCat(catFile, progFunc=progFunc)
         except Exception as e:
-            self.showMsg(
-                msgStr = "Could not load %s: %s" % (catFile, e),
-                severity = RO.Constants.sevError,
-            )
-            return
-        
+            return (None, None, RO.StringUtil.strFromException(e))
+        CatalogCache.saveCat(catFile, objCat, errList, parseStartTime=parseStartTime)
+        return (objCat, errList, None)
+    
+    def _reportLoadProgress(self, catFile):
+        """Report catalog loading progress while a catalog is being parsed.
+        """
+        loadProgress = self._loadProgress
+        if loadProgress:
+            self.showMsg("Loading file %s: %d of %d lines" % ((catFile,) + loadProgress))
+        self._loadProgressTimer.start(_ProgressInterval, self._reportLoadProgress, catFile)
+    
+    def _addCatalog(self, catFile, objCat, errList):
+        """Add a newly loaded catalog and report errors, if any.
+        """
         catName = objCat.name
         
         # report errors, if any
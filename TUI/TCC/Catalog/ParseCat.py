@@ -24,17 +24,15 @@ History:
 """
 import os.path
 import re
-import Tkinter
 from . import GetString
+from . import SlewValueChecker
 import RO.Alg
 import RO.CnvUtil
 import RO.OS
 import RO.SeqUtil
 import RO.StringUtil
 import RO.ParseMsg.ParseData as ParseData
-import TUI.TCC.UserModel
 import TUI.TCC.TelTarget
-import TUI.TCC.SlewWdg.InputWdg
 
 def listGet(aList, ind, defValue=None):
     try:
@@ -53,40 +51,36 @@ _CatOptionDict = {
     "dispColor": "black",
 }
 
+# number of lines between calls to the progress function
+_ProgressInterval = 500
+
 class CatalogParser(object):
     """Object that will read in object catalogs, expand abbreviations,
     correct case and check limits.
     
-    Warning: uses a (hidden) Tkinter widget to perform value checking
-    and abbreviation expansion. Thus:
-    - Do not call from a background thread.
-    - Before calling you should already have created a root widget.
+    Values are checked by a SlewValueChecker, which mirrors the limits
+    and abbreviation rules of the slew input widget without using Tk.
+    Thus parseCat may be called from a background thread.
     """
     def __init__(self):
-        # get a local tcc user model and use to create a slew input widget
-        # that I can safely set without affecting other widgets
-        userModel = TUI.TCC.UserModel._Model()
-        tl = Tkinter.Toplevel()
-        tl.withdraw()
-        self._slewInputWdg = TUI.TCC.SlewWdg.InputWdg.InputWdg(
-            master = tl,
-            userModel = userModel,
+        self._valueChecker = SlewValueChecker.SlewValueChecker(
+            extraKeys = list(_CatOptionDict.keys()),
         )
-        self._slewInputWdg.pack()
-
-        defValueDict = self._slewInputWdg.getDefValueDict()
-        defValueDict.update(_CatOptionDict)
-        #print defValueDict
         self._keyMatcher = RO.Alg.MatchList(
-            valueList = list(defValueDict.keys()),
+            valueList = self._valueChecker.getKeys(),
             abbrevOK = True,
             ignoreCase = True,
         )
-        self._catOptions = _CatOptionDict
     
-    def parseCat(self, filePath):
+    def parseCat(self, filePath, progFunc=None):
         """Parse a catalog given its full file path.
         
+        Inputs:
+        - filePath: path to catalog file
+        - progFunc: function to call to report progress, or None;
+            it receives two arguments: number of lines parsed, total number of lines,
+            and is called in the same thread as parseCat
+        
         Returns two items:
         - objCat: the catalog as a TUI.TCC.TelTarget.Catalog
         - errList: a list of (line, errMsg) tuples, one per rejected line of object data
@@ -97,7 +91,13 @@ class CatalogParser(object):
         """
 #       print "parseCat(%r)" % (filePath,)
         fp = RO.OS.openUniv(filePath)
+        try:
+            lineList = fp.readlines()
+        finally:
+            fp.close()
+        nLines = len(lineList)
         catName = os.path.basename(filePath)
+        catOptions = _CatOptionDict.copy()
 
         defOptionDict = self._keyMatcher.matchKeys({
             "CSys": "FK5",
@@ -106,11 +106,12 @@ class CatalogParser(object):
         errList = []
         objList = []
         
-        # save checkWdg data, then use try/finally to restore no matter what
         ii = 0
-        for line in fp:
+        for line in lineList:
             ii += 1
 #           print "Parsing object %d" % ii
+            if progFunc and ii % _ProgressInterval == 0:
+                progFunc(ii, nLines)
             isDefault = False
             line = line.strip()
             try:
@@ -146,7 +147,7 @@ class CatalogParser(object):
                     
                     # merge new defaults into existing defaults
                     # and check the result
-                    self._combineDicts(defOptionDict, optDict)
+                    self._combineDicts(defOptionDict, optDict, catOptions)
                 else:
                     # a line of data
                     # the data dictionary starts with the current defaults
@@ -160,7 +161,7 @@ class CatalogParser(object):
 
                     # merge new data with a copy of the defaults
                     # and check the result
-                    self._combineDicts(dataDict, optDict)
+                    self._combineDicts(dataDict, optDict, catOptions)
                     
                     objList.append(TUI.TCC.TelTarget.TelTarget(dataDict))
             except Exception as e:
@@ -169,21 +170,25 @@ class CatalogParser(object):
                 else:
                     errList.append((line, RO.StringUtil.strFromException(e)))
         
+        if progFunc:
+            progFunc(nLines, nLines)
+
         # convert catalog options as appropriate
-        self._catOptions["doDisplay"] = RO.CnvUtil.asBool(self._catOptions["doDisplay"])
+        catOptions["doDisplay"] = RO.CnvUtil.asBool(catOptions["doDisplay"])
 
         # create catalog
-#       print "parseCat: catOptions =", self._catOptions
+#       print "parseCat: catOptions =", catOptions
         objCat = TUI.TCC.TelTarget.Catalog (
             name = catName,
             objList = objList,
-        **self._catOptions)
+        **catOptions)
 #       print "parseCat returning (%r, %r)" % (objCat, errList)
         return objCat, errList
     
-    def _combineDicts(self, defDict, newDict):
+    def _combineDicts(self, defDict, newDict, catOptions):
         """Combine a new dictionary into an existing default dictionary.
         The default dictionary is modified; newDict is not.
+        Catalog options (see _CatOptionDict) are removed and put into catOptions.
         
         It is assumed that defDict already has been key-matched
         (expanding abbreviations and correcting case).
@@ -193,6 +198,8 @@ class CatalogParser(object):
         - if the new dictionary has certain items (e.g. CSys, RotType)
           then corresponding items are removed from the default dict (e.g. data, rotang).
         - newDict is added to defDict (overriding matching items)
+        - catalog options are moved from defDict to catOptions
+        - defDict is checked, expanding abbreviated values and correcting their case
     
         Raises ValueError if newDict cannot be key-matched
         or the resulting defDict has invalid values.
@@ -222,30 +229,13 @@ class CatalogParser(object):
         # extract catalog options, if present
         for key in _CatOptionDict:
             if key in defDict:
-                self._catOptions[key] = defDict.pop(key)[0]
+                catOptions[key] = defDict.pop(key)[0]
         
         # check the new dictionary
-        self._checkValueDict(defDict)
-    
-    def _checkValueDict(self, valueDict):
-        """Check valudDict.
-
-        Raise ValueError if valueDict has unknown keys
-        or a value would be out of bounds.
-        """
-        self._entryErrMsg = None
-        self._slewInputWdg.setValueDict(valueDict)
-        if self._entryErrMsg:
-            raise ValueError(self._entryErrMsg)
-    
-    def _handleEntryError(self, evt):
-        """Handle entry errors by recording the message."""
-        msgStr = evt.widget.getEntryError()
-        if msgStr:
-            self._entryErrMsg = msgStr
+        self._valueChecker.checkValueDict(defDict)
 
 if __name__ == "__main__":
-    root = Tkinter.Tk()
+    import TUI.Models.TUIModel
     tuiModel = TUI.Models.TUIModel.Model(True)
     catParser = CatalogParser()
     
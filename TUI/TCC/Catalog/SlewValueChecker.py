@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+"""Check slew value dictionaries (e.g. from catalog entries) without using Tk widgets.
+
+SlewValueChecker mirrors the limits and abbreviation rules of the widgets in
+TUI.TCC.SlewWdg.InputWdg, so that catalogs can be checked quickly
+and in a background thread. If you change the limits or menu items of those widgets,
+change them here as well.
+"""
+import RO.Alg
+import RO.CoordSys
+import RO.MathUtil
+import RO.SeqUtil
+import RO.StringUtil
+import TUI.Models
+
+__all__ = ["SlewValueChecker"]
+
+# menu items (see CoordSysWdg, RotWdg and AxisWrapWdg)
+_CoordSysItems = (
+    RO.CoordSys.ICRS,
+    RO.CoordSys.FK5,
+    RO.CoordSys.FK4,
+    RO.CoordSys.Galactic,
+    RO.CoordSys.Geocentric,
+    RO.CoordSys.Topocentric,
+    RO.CoordSys.Observed,
+    RO.CoordSys.Mount,
+)
+_RotTypeItems = ("Object", "Horizon", "Mount", "None")
+_WrapItems = ("Nearest", "Negative", "Middle", "Positive")
+
+# option button names (see KeepOffsetWdg and CalibWdg)
+_KeepNames = ("Arc", "Boresight", "GCorr", "Calib")
+_PtErrorNames = ("FindReference", "RefSlew", "Correct", "Log", "ObjSlew")
+_NegStr = "No"
+
+# numeric limits (see CoordSysWdg, RotWdg, MagPMWdg and DriftScanWdg)
+_DateRange = (0.0, 3000.0)
+_RotAngleRange = (-360.0, 360.0)
+_MagRange = (-999.0, 999.0)
+_NonNegRange = (0.0, None)
+_NoRange = (None, None)
+_MaxScanVel = 3.0 * 3600.0 # arcsec/sec
+
+class SlewValueChecker(object):
+    """Check and neaten slew value dictionaries.
+
+    Value dictionaries have the same form as those used by TUI.TCC.SlewWdg.InputWdg:
+    keys are full, correctly cased names and each value is a string or a sequence of strings.
+
+    Inputs:
+    - extraKeys: additional keys to accept (their values are not checked)
+    """
+    def __init__(self, extraKeys=()):
+        self._csysMatcher = RO.Alg.MatchList(_CoordSysItems, abbrevOK=True, ignoreCase=True)
+        self._rotTypeMatcher = RO.Alg.MatchList(_RotTypeItems, abbrevOK=True, ignoreCase=True)
+        self._wrapMatcher = RO.Alg.MatchList(_WrapItems, abbrevOK=True, ignoreCase=True)
+        self._keepMatcher = RO.Alg.MatchList(_KeepNames, abbrevOK=True, ignoreCase=True)
+        self._ptErrorMatcher = RO.Alg.MatchList(_PtErrorNames, abbrevOK=True, ignoreCase=True)
+
+        # key: (number of values or None if variable, check function or None if no check);
+        # the check function receives:
+        # - the key (for error messages)
+        # - the value list (already checked for length)
+        # - the value dictionary (to look up the coordinate system, etc.)
+        # and returns the (neatened) value list
+        self._checkDict = {
+            "CSys": (1, self._checkCSys),
+            "Date": (1, self._checkDate),
+            "ObjPos": (2, self._checkObjPos),
+            "Name": (1, None),
+            "RotAngle": (1, self._floatChecker(_RotAngleRange)),
+            "RotType": (1, self._menuChecker(self._rotTypeMatcher)),
+            "Magnitude": (1, self._floatChecker(_MagRange)),
+            "PM": (2, self._floatChecker(_NoRange)),
+            "Px": (1, self._floatChecker(_NonNegRange)),
+            "Distance": (1, self._floatChecker(_NonNegRange)),
+            "Rv": (1, self._floatChecker(_NoRange)),
+            "ScanVelocity": (2, self._checkScanVelocity),
+            "Keep": (None, self._optionChecker(self._keepMatcher)),
+            "PtError": (None, self._optionChecker(self._ptErrorMatcher)),
+            "AzWrap": (1, self._menuChecker(self._wrapMatcher)),
+            "RotWrap": (1, self._menuChecker(self._wrapMatcher)),
+        }
+        self._keyList = list(self._checkDict.keys()) + list(extraKeys)
+        self._keySet = set(self._keyList)
+
+        self.tccModel = TUI.Models.getModel("tcc")
+
+    def getKeys(self):
+        """Return a list of all accepted keys.
+        """
+        return self._keyList[:]
+
+    def checkValueDict(self, valueDict):
+        """Check a value dictionary, neatening it in place.
+
+        Abbreviated menu items and option names are expanded and their case corrected
+        (e.g. CSys="icrs" becomes "ICRS"). The form of each value (string or sequence)
+        is preserved.
+
+        Raise ValueError if valueDict has unknown keys
+        or a value is invalid or out of bounds.
+        """
+        for key in valueDict:
+            if key not in self._keySet:
+                raise ValueError("unknown key %r" % (key,))
+
+        # CSys must be checked first, since it affects checking of other values
+        for key in ["CSys"] + [key for key in valueDict if key != "CSys"]:
+            if key not in valueDict or key not in self._checkDict:
+                continue
+            nVals, checkFunc = self._checkDict[key]
+            rawVal = valueDict[key]
+            isSeq = RO.SeqUtil.isSequence(rawVal)
+            valList = list(RO.SeqUtil.asSequence(rawVal))
+            if nVals is not None and len(valList) != nVals:
+                raise ValueError("%s has %d values; %d needed" % (key, len(valList), nVals))
+            if checkFunc is None:
+                continue
+            valList = checkFunc(key, valList, valueDict)
+            if isinstance(rawVal, tuple):
+                valueDict[key] = tuple(valList)
+            elif isSeq:
+                valueDict[key] = valList
+            else:
+                valueDict[key] = valList[0]
+
+    def _getCSysConst(self, valueDict):
+        """Return the coordinate system constant for a value dictionary
+        (FK5 if not specified, to match CoordSysWdg)
+        """
+        csys = RO.SeqUtil.asSequence(valueDict.get("CSys", "FK5"))[0]
+        return RO.CoordSys.getSysConst(csys)
+
+    def _checkCSys(self, key, valList, valueDict):
+        try:
+            return [self._csysMatcher.getUniqueMatch(valList[0])]
+        except ValueError as e:
+            raise ValueError("%s %s" % (key, RO.StringUtil.strFromException(e)))
+
+    def _checkDate(self, key, valList, valueDict):
+        _checkFloat(key, valList[0], _DateRange)
+        return valList
+
+    def _checkObjPos(self, key, valList, valueDict):
+        """Check object position, whose limits depend on the coordinate system
+        (see ObjPosWdg._coordSysChanged).
+        """
+        csysConst = self._getCSysConst(valueDict)
+        coordSys = csysConst.name()
+        if coordSys in RO.CoordSys.AzAlt:
+            if coordSys == RO.CoordSys.Mount:
+                pos1Range = self.tccModel.azLim.valueList[0:2]
+                pos2Range = self.tccModel.altLim.valueList[0:2]
+            else:
+                pos1Range = (0, 360)
+                pos2Range = (0, 90)
+        elif csysConst.eqInHours():
+            pos1Range = (0, 24)
+            pos2Range = (-90, 90)
+        else:
+            raise ValueError("cannot handle coordinate system %r" % (coordSys,))
+
+        posLabels = csysConst.posLabels()
+        for val, valRange, label in zip(valList, (pos1Range, pos2Range), posLabels):
+            _checkNum(label, val, valRange, RO.StringUtil.degFromDMSStr)
+        return valList
+
+    def _checkScanVelocity(self, key, valList, valueDict):
+        for val in valList:
+            _checkNum(key, val, (-_MaxScanVel, _MaxScanVel), RO.StringUtil.secFromDMSStr)
+        return valList
+
+    def _floatChecker(self, valRange):
+        """Return a check function for floating point values in a given range
+        """
+        def checkFunc(key, valList, valueDict):
+            for val in valList:
+                _checkFloat(key, val, valRange)
+            return valList
+        return checkFunc
+
+    def _menuChecker(self, matcher):
+        """Return a check function for a menu item (expanding abbreviations and correcting case)
+        """
+        def checkFunc(key, valList, valueDict):
+            try:
+                return [matcher.getUniqueMatch(valList[0])]
+            except ValueError as e:
+                raise ValueError("%s %s" % (key, RO.StringUtil.strFromException(e)))
+        return checkFunc
+
+    def _optionChecker(self, matcher):
+        """Return a check function for a set of option names,
+        each of which may be prefixed with "No" (as per RO.InputCont.BoolNegCont)
+        """
+        lowerNegStr = _NegStr.lower()
+        def checkFunc(key, valList, valueDict):
+            newValList = []
+            for val in valList:
+                if val.lower().startswith(lowerNegStr):
+                    prefix = _NegStr
+                    name = val[len(_NegStr):]
+                else:
+                    prefix = ""
+                    name = val
+                try:
+                    newValList.append(prefix + matcher.getUniqueMatch(name))
+                except ValueError as e:
+                    raise ValueError("%s %s" % (key, RO.StringUtil.strFromException(e)))
+            return newValList
+        return checkFunc
+
+def _checkFloat(key, val, valRange):
+    """Check a floating-point value the way RO.Wdg.FloatEntry does
+    """
+    _checkNum(key, val, valRange, RO.StringUtil.floatFromStr)
+
+def _checkNum(key, val, valRange, cnvFunc):
+    """Check a numeric value the way RO.Wdg.Entry numeric entry widgets do.
+
+    Inputs:
+    - key: name of item (for error messages)
+    - val: value, as a string (or a number)
+    - valRange: (min, max) value; either may be None for no limit
+    - cnvFunc: function to convert a string to a number
+
+    Raise ValueError if the value cannot be parsed or is out of range.
+    """
+    if val in (None, ""):
+        return
+    minVal, maxVal = valRange
+    if RO.SeqUtil.isString(val):
+        if minVal is not None and minVal >= 0 and "-" in val:
+            raise ValueError("%s - forbidden; min val = %s" % (key, minVal))
+        try:
+            numVal = cnvFunc(val)
+        except ValueError:
+            raise ValueError("%s invalid: %r" % (key, val))
+    else:
+        numVal = val
+    RO.MathUtil.checkRange(numVal, minVal, maxVal, key)
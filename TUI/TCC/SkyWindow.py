@@ -50,6 +50,7 @@ History:
 """
 import math
 import Tkinter
+import numpy
 import RO.CanvasUtil
 import RO.CnvUtil
 import RO.MathUtil
@@ -78,6 +79,10 @@ _HelpURL = "Telescope/SkyWin.html"
 # constants regarding redraw of catalog objects
 _CatRedrawDelay = 5.0
 
+# size of a cell of the catalog object pixel index (pixels);
+# this matches the search radius used for mouse-over and double-click
+_PixIndexCellSize = 5.0
+
 def xyDegFromAzAlt (azAlt):
     """converts a point from az,alt degrees (0 south, 90 east)
     to x,y degrees (x east, y north)
@@ -116,6 +121,67 @@ class AzAltTarget(object):
     def __str__(self):
         return "%r %7.2f, %5.2f Mount" % (self.name, self.posAzAlt[0], self.posAzAlt[1])
 
+class PixPosIndex(object):
+    """A grid index of catalog objects by pixel position, for fast nearest-object lookup.
+    
+    Inputs:
+    - pixPosObjList: a list of (pixPos, obj) pairs
+    - cellSize: size of each grid cell (pixels)
+    
+    A search with a small radius only examines the few cells that the search circle overlaps,
+    so mouse-over lookup stays fast even for very large catalogs.
+    """
+    def __init__(self, pixPosObjList=(), cellSize=_PixIndexCellSize):
+        self.pixPosObjList = pixPosObjList
+        self.cellSize = float(cellSize)
+        self.cellDict = {} # key=(x cell index, y cell index), value=list of (pixPos, obj) pairs
+        for pixPosObj in pixPosObjList:
+            self.cellDict.setdefault(self._cellFromPix(pixPosObj[0]), []).append(pixPosObj)
+
+    def _cellFromPix(self, xyPix):
+        """Return the cell index (as a tuple) containing pixel position xyPix
+        """
+        return (int(math.floor(xyPix[0] / self.cellSize)), int(math.floor(xyPix[1] / self.cellSize)))
+
+    def findNearest(self, xyPix, maxDistSq=9.0e99):
+        """Find the object nearest to xyPix whose squared distance is less than maxDistSq pix^2.
+        
+        Returns (distSq, obj); if no object is found returns (maxDistSq, None).
+        """
+        minObj = None
+        minDistSq = maxDistSq
+        nCellRad = int(math.ceil(math.sqrt(maxDistSq) / self.cellSize))
+        if (2 * nCellRad + 1)**2 < len(self.cellDict):
+            ctrCell = self._cellFromPix(xyPix)
+            cellList = []
+            for xCell in range(ctrCell[0] - nCellRad, ctrCell[0] + nCellRad + 1):
+                for yCell in range(ctrCell[1] - nCellRad, ctrCell[1] + nCellRad + 1):
+                    cellList.append(self.cellDict.get((xCell, yCell), ()))
+        else:
+            # the search area is as large as the index; just look at everything
+            cellList = list(self.cellDict.values())
+
+        for pixPosObjList in cellList:
+            for objPixPos, obj in pixPosObjList:
+                distSq = (objPixPos[0] - xyPix[0])**2 + (objPixPos[1] - xyPix[1])**2
+                if distSq < minDistSq:
+                    minObj = obj
+                    minDistSq = distSq
+        return (minDistSq, minObj)
+
+class _CatItem(object):
+    """Information about the canvas item used to display one catalog object
+    
+    Inputs:
+    - itemID: canvas item ID
+    - xyPix: x,y position of the center of the item (integer pixels)
+    """
+    def __init__(self, itemID, xyPix):
+        self.itemID = itemID
+        self.xyPix = xyPix
+        self.isShown = True
+        self.isCurrent = True # used by SkyWdg._updateCatItems to find items to hide
+
 class SkyWdg (Tkinter.Frame):
     TELCURRENT = "telCurrent"
     TELTARGET = "telTarget"
@@ -182,11 +248,12 @@ class SkyWdg (Tkinter.Frame):
         
         # various dictionaries whose keys are catalog name
         # note: if a catalog is deleted, it is removed from catDict
-        # and catPixPosObjDict, but not necessarily the others
+        # and catPixIndexDict, but not necessarily the others
         self.catDict = {}   # key=catalog name, value = catalog
         self.catRedrawTimerDict = {}    # key=catalog name, value = tk after id
         self.catColorDict = {}  # key=catalog name, value = color
-        self.catPixPosObjDict = {}  # key=catalog name, value = list of (pix pos, obj) pairs
+        self.catPixIndexDict = {}  # key=catalog name, value = PixPosIndex of (pix pos, obj) pairs
+        self.catItemDict = {}   # key=catalog name, value = dict of obj index: _CatItem
         self.catSRDict = {} # key=catalog name, value = scriptrunner script to redisplay catalog
 
         self.telCurrent = None
@@ -357,7 +424,8 @@ class SkyWdg (Tkinter.Frame):
             self.removeCatalogByName(catName)
         
         self.catDict[catName] = catalog
-        self.catPixPosObjDict[catName] = []
+        self.catPixIndexDict[catName] = PixPosIndex()
+        self.catItemDict[catName] = {}
         self.catRedrawTimerDict[catName] = Timer()
         self.catColorDict[catName] = catalog.getDispColor()
         
@@ -367,7 +435,8 @@ class SkyWdg (Tkinter.Frame):
             catTag = "cat_%s" % (catName,)
             
             if not catalog.getDoDisplay():
-                self.catPixPosObjDict[catName] = []
+                self.catPixIndexDict[catName] = PixPosIndex()
+                self.catItemDict[catName] = {}
                 self.cnv.delete(catTag)
                 return
     
@@ -379,27 +448,12 @@ class SkyWdg (Tkinter.Frame):
                 self.catColorDict[catName] = color
                 
 #           print "compute %s thread starting" % catName
-            yield sr.waitThread(_UpdateCatalog, catalog.objList, self.center, self.azAltScale)
-            pixPosObjList = sr.value
+            yield sr.waitThread(_UpdateCatalog, catalog, self.center, self.azAltScale)
+            pixIndex, objIndList = sr.value
 #           print "compute %s thread done" % catName
 
-            catName = catalog.name
-            catTag = "cat_%s" % (catName,)
-    
-            self.catPixPosObjDict[catName] = []
-            self.cnv.delete(catTag)
-    
-            color = catalog.getDispColor()      
-            rad = 2 # for now, eventually may wish to vary by magnitude or window size or...?
-            for pixPos, obj in pixPosObjList:
-                self.cnv.create_oval(
-                    pixPos[0] - rad,     pixPos[1] - rad,
-                    pixPos[0] + rad + 1, pixPos[1] + rad + 1,
-                    tag = (SkyWdg.CATOBJECT, catTag),
-                    fill = color,
-                    outline = color,
-                )
-            self.catPixPosObjDict[catName] = pixPosObjList
+            self._updateCatItems(catalog, pixIndex.pixPosObjList, objIndList)
+            self.catPixIndexDict[catName] = pixIndex
             
             self.catRedrawTimerDict[catName].start(_CatRedrawDelay, self._drawCatalog, catalog)
         
@@ -411,6 +465,60 @@ class SkyWdg (Tkinter.Frame):
         self.catSRDict[catName] = sr
         catalog.addCallback(self._drawCatalog, callNow=True)
 
+    def _updateCatItems(self, catalog, pixPosObjList, objIndList):
+        """Move, show and hide the canvas items for a catalog's objects.
+        
+        Each catalog object keeps one canvas item, which is created the first time
+        the object is visible. Items that have moved by at least a pixel are moved,
+        and items that set or rise are hidden or shown; all of these changes
+        are sent to Tk as a single Tcl script.
+        
+        Inputs:
+        - catalog: the catalog
+        - pixPosObjList: a list of (pixPos, obj) for each visible object
+        - objIndList: index in catalog.objList of each object in pixPosObjList
+        """
+        catName = catalog.name
+        catTag = "cat_%s" % (catName,)
+        color = catalog.getDispColor()
+        itemDict = self.catItemDict.setdefault(catName, {})
+        rad = 2 # for now, eventually may wish to vary by magnitude or window size or...?
+
+        cnvName = str(self.cnv)
+        tclCmdList = []
+        for (pixPos, obj), objInd in zip(pixPosObjList, objIndList):
+            xyPix = (int(round(pixPos[0])), int(round(pixPos[1])))
+            catItem = itemDict.get(objInd)
+            if catItem is None:
+                itemID = self.cnv.create_oval(
+                    xyPix[0] - rad,     xyPix[1] - rad,
+                    xyPix[0] + rad + 1, xyPix[1] + rad + 1,
+                    tag = (SkyWdg.CATOBJECT, catTag),
+                    fill = color,
+                    outline = color,
+                )
+                itemDict[objInd] = _CatItem(itemID, xyPix)
+                continue
+            catItem.isCurrent = True
+            if catItem.xyPix != xyPix:
+                tclCmdList.append("%s coords %d %d %d %d %d" % (cnvName, catItem.itemID,
+                    xyPix[0] - rad, xyPix[1] - rad, xyPix[0] + rad + 1, xyPix[1] + rad + 1))
+                catItem.xyPix = xyPix
+            if not catItem.isShown:
+                tclCmdList.append("%s itemconfigure %d -state normal" % (cnvName, catItem.itemID))
+                catItem.isShown = True
+
+        # hide items for objects that are no longer visible
+        for catItem in itemDict.values():
+            if not catItem.isCurrent:
+                if catItem.isShown:
+                    tclCmdList.append("%s itemconfigure %d -state hidden" % (cnvName, catItem.itemID))
+                    catItem.isShown = False
+            catItem.isCurrent = False
+
+        if tclCmdList:
+            self.cnv.tk.eval("\n".join(tclCmdList))
+
     def removeCatalogByName(self, catName):
         """Remove the specified catalog.
         """
@@ -440,7 +548,7 @@ class SkyWdg (Tkinter.Frame):
         timer.cancel()
         
         # delete entry in other catalog dictionaries
-        for catDict in self.catPixPosObjDict, self.catColorDict:
+        for catDict in self.catPixIndexDict, self.catItemDict, self.catColorDict:
             try:
                 del catDict[catName]
             except KeyError:
@@ -452,12 +560,11 @@ class SkyWdg (Tkinter.Frame):
         Returns the catalog object, or None if none found"""
         minStar = None
         minDistSq = maxDistSq
-        for pixPosCatObjList in self.catPixPosObjDict.values():
-            for objPixPos, catObj in pixPosCatObjList:
-                distSq = (objPixPos[0] - xyPix[0])**2 + (objPixPos[1] - xyPix[1])**2
-                if distSq < minDistSq:
-                    minStar = catObj
-                    minDistSq = distSq
+        for pixIndex in self.catPixIndexDict.values():
+            distSq, catObj = pixIndex.findNearest(xyPix, minDistSq)
+            if catObj is not None:
+                minStar = catObj
+                minDistSq = distSq
         return minStar
     
     def pixFromAzAlt(self, azAlt):
@@ -531,7 +638,8 @@ class SkyWdg (Tkinter.Frame):
     def _drawAllCatalogs(self):
         """Draw all objects in all catalogs, erasing all stars first.
         """
-        self.catPixPosObjDict = {}
+        self.catPixIndexDict = {}
+        self.catItemDict = {}
         self.cnv.delete(SkyWdg.CATOBJECT)
         for catalog in self.catDict.values():
             self._drawCatalog(catalog)
@@ -652,25 +760,31 @@ class SkyWdg (Tkinter.Frame):
         self._telPotentialAnimTimer.start(_CatRedrawDelay, self._drawTelPotential)
 
 
-def _UpdateCatalog(objList, center, azAltScale):
-    """Returns a list of [pixPos, obj] for the specified catalog.
+def _UpdateCatalog(catalog, center, azAltScale):
+    """Returns (PixPosIndex of [pixPos, obj], list of obj index) for the visible objects
+    in the specified catalog, where obj index is the index of the object in catalog.objList.
     Can be run as a background thread.
+    
+    The az/alt of all objects is computed at once by catalog.getPositions().
     """
-    pixPosObjList = []
-    for catObj in objList:
-        azAlt = catObj.getAzAlt()
-        if azAlt[1] < 0:
-            continue
-        
-        xyDeg = xyDegFromAzAlt(azAlt)
-        pixPos = (
-            center[0] - (xyDeg[0] * azAltScale),
-            center[1] - (xyDeg[1] * azAltScale),
-        )
-
-        pixPosObjList.append((pixPos, catObj))
-
-    return pixPosObjList
+    objList = catalog.objList
+    azAltArr = catalog.getPositions().getAzAlt()
+    with numpy.errstate(invalid="ignore"):
+        visInds = numpy.nonzero(azAltArr[:, 1] >= 0)[0]
+    if len(visInds) == 0:
+        return PixPosIndex(), []
+
+    # compute pixel position using the same math as xyDegFromAzAlt
+    azAltArr = azAltArr[visInds]
+    theta = numpy.radians(azAltArr[:, 0] - 90.0)
+    r = 90.0 - azAltArr[:, 1]
+    xPixArr = center[0] - (r * numpy.cos(theta) * azAltScale)
+    yPixArr = center[1] - (r * numpy.sin(theta) * azAltScale)
+
+    objIndList = visInds.tolist()
+    pixPosObjList = [((xPix, yPix), objList[ind]) for xPix, yPix, ind in \
+        zip(xPixArr.tolist(), yPixArr.tolist(), objIndList)]
+    return PixPosIndex(pixPosObjList), objIndList
 
 if __name__ == '__main__':
     import random
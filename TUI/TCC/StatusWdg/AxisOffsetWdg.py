@@ -9,6 +9,7 @@ import RO.CnvUtil
 import RO.CoordSys
 import RO.StringUtil
 import RO.Wdg
+import TUI.Base.Wdg
 import TUI.Models
 
 _HelpURL = "Telescope/StatusWin.html#Offsets"
@@ -31,7 +32,7 @@ class AxisOffsetWdg (Tkinter.Frame):
         gr.gridWdg("Calib Off")
         gr.startNewCol()
         self.calibOffWdgSet = [
-            RO.Wdg.DMSLabel(
+            TUI.Base.Wdg.DMSLabel(
                 master = self,
                 precision = 1,
                 width = _DataWidth,
@@ -55,7 +56,7 @@ class AxisOffsetWdg (Tkinter.Frame):
         gr.gridWdg("Guide Off")
         gr.startNewCol()
         self.guideOffWdgSet = [
-            RO.Wdg.DMSLabel(
+            TUI.Base.Wdg.DMSLabel(
                 master = self,
                 precision = 1,
                 width = _DataWidth,
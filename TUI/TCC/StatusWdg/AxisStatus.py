@@ -67,6 +67,7 @@ import RO.BitDescr
 import RO.StringUtil
 from RO.TkUtil import Timer
 import RO.Wdg
+import TUI.Base.Wdg
 import TUI.PlaySound
 import TUI.Models
 
@@ -167,7 +168,7 @@ class AxisStatusWdg(Tkinter.Frame):
         
         # actual axis position widget set
         self.axePosWdgSet = [
-            RO.Wdg.FloatLabel(
+            TUI.Base.Wdg.FloatLabel(
                 master = self,
                 precision = PosPrec,
                 width = PosWidth,
@@ -180,7 +181,7 @@ class AxisStatusWdg(Tkinter.Frame):
         
         # target axis position widget set
         self.tccPosWdgSet = [
-            RO.Wdg.FloatLabel(
+            TUI.Base.Wdg.FloatLabel(
                 master = self,
                 precision = PosPrec,
                 width = PosWidth,
@@ -193,7 +194,7 @@ class AxisStatusWdg(Tkinter.Frame):
         
         # TCC status widget set (e.g. tracking or halted)
         self.axisCmdStateWdgSet = [
-            RO.Wdg.StrLabel(
+            TUI.Base.Wdg.StrLabel(
                 master = self,
                 width = AxisCmdStateWidth,
                 helpText = "What the TCC is telling the axis to do",
@@ -208,7 +209,7 @@ class AxisStatusWdg(Tkinter.Frame):
         
         # axis error code widet set (why the TCC is not moving the axis)
         self.axisErrCodeWdgSet = [
-            RO.Wdg.StrLabel(
+            TUI.Base.Wdg.StrLabel(
                 master = self,
                 width = AxisErrCodeWidth,
                 helpText = "Why the TCC halted the axis",
@@ -221,7 +222,7 @@ class AxisStatusWdg(Tkinter.Frame):
     
         # controller status widget set (the status word)
         self.ctrlStatusWdgSet = [
-            RO.Wdg.StrLabel(
+            TUI.Base.Wdg.StrLabel(
                 master = self,
                 width = CtrlStatusWidth,
                 helpText = "Status reported by the axis controller",
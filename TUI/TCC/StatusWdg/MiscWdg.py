@@ -59,6 +59,8 @@ import RO.PhysConst
 import RO.StringUtil
 from RO.TkUtil import Timer
 import RO.Wdg
+import TUI.Base.KeyVarGroup
+import TUI.Base.Wdg
 import TUI.PlaySound
 import TUI.TCC.TelConst
 import TUI.Models
@@ -85,7 +87,7 @@ class MiscWdg (Tkinter.Frame):
         
         gr = RO.Wdg.Gridder(self, sticky="e")
 
-        self.haWdg = RO.Wdg.DMSLabel(
+        self.haWdg = TUI.Base.Wdg.DMSLabel(
             master = self,
             precision = 0,
             nFields = 3,
@@ -96,7 +98,7 @@ class MiscWdg (Tkinter.Frame):
         )
         gr.gridWdg("HA", self.haWdg, "hms")
         
-        self.designHAWdg = RO.Wdg.DMSLabel(
+        self.designHAWdg = TUI.Base.Wdg.DMSLabel(
             master = self,
             precision = 0,
             nFields = 3,
@@ -107,7 +109,7 @@ class MiscWdg (Tkinter.Frame):
         )
         gr.gridWdg("Design HA", self.designHAWdg, "hms")
         
-        self.deltaHAWdg = RO.Wdg.DMSLabel(
+        self.deltaHAWdg = TUI.Base.Wdg.DMSLabel(
             master = self,
             precision = 0,
             nFields = 3,
@@ -118,7 +120,7 @@ class MiscWdg (Tkinter.Frame):
         )
         gr.gridWdg("Des-Curr HA", self.deltaHAWdg, "hms")
         
-        self.taiWdg = RO.Wdg.StrLabel(
+        self.taiWdg = TUI.Base.Wdg.StrLabel(
             master = self,
             width=19,
             helpText = "International Atomic Time",
@@ -127,7 +129,7 @@ class MiscWdg (Tkinter.Frame):
         gr.gridWdg("TAI", self.taiWdg, colSpan=2)
 
         # secondary focus
-        self.secFocusWdg = RO.Wdg.FloatLabel(
+        self.secFocusWdg = TUI.Base.Wdg.FloatLabel(
             master = self,
             precision = 0,
             width = 5,
@@ -146,7 +148,7 @@ class MiscWdg (Tkinter.Frame):
         
         gr._nextCol -= 2 # allow overlap with widget to the right
 
-        self.airmassWdg = RO.Wdg.FloatLabel(
+        self.airmassWdg = TUI.Base.Wdg.FloatLabel(
             master = self,
             precision=3,
             width = 5,
@@ -155,7 +157,7 @@ class MiscWdg (Tkinter.Frame):
         )
         gr.gridWdg("Airmass", self.airmassWdg)
         
-        self.zdWdg = RO.Wdg.FloatLabel(
+        self.zdWdg = TUI.Base.Wdg.FloatLabel(
             master = self,
             precision = 1,
             helpText = "Zenith distance (90 - altitude)",
@@ -164,7 +166,7 @@ class MiscWdg (Tkinter.Frame):
         )
         gr.gridWdg("ZD", self.zdWdg, RO.StringUtil.DegStr)
 
-        self.lmstWdg = RO.Wdg.DMSLabel(
+        self.lmstWdg = TUI.Base.Wdg.DMSLabel(
             master = self,
             precision = 0,
             nFields = 3,
@@ -175,7 +177,7 @@ class MiscWdg (Tkinter.Frame):
         )
         gr.gridWdg("LMST", self.lmstWdg, "hms")
         
-        self.sjdWdg = RO.Wdg.IntLabel(
+        self.sjdWdg = TUI.Base.Wdg.IntLabel(
             master = self,
             helpText = "SDSS MJD (rolls over at TAI MJD-0.3)",
             helpURL = _HelpURL,
@@ -183,7 +185,7 @@ class MiscWdg (Tkinter.Frame):
         )
         gr.gridWdg("SJD", self.sjdWdg, "days")
 
-        self.scaleWdg = RO.Wdg.FloatLabel(
+        self.scaleWdg = TUI.Base.Wdg.FloatLabel(
             master = self,
             precision = 1,
             width = 8,
@@ -200,7 +202,7 @@ class MiscWdg (Tkinter.Frame):
         # start the third column of widgets
         gr.startNewCol(spacing=1)
         
-        self.instNameWdg = RO.Wdg.StrLabel(
+        self.instNameWdg = TUI.Base.Wdg.StrLabel(
             master = self,
             width = 10,
             helpText = "Current instrument (from the TCC)",
@@ -209,7 +211,7 @@ class MiscWdg (Tkinter.Frame):
         gr.gridWdg("Inst", self.instNameWdg, units=False)
         self.tccModel.inst.addValueCallback(self.instNameWdg.set)
         
-        self.cartridgeIDWdg = RO.Wdg.StrLabel(
+        self.cartridgeIDWdg = TUI.Base.Wdg.StrLabel(
             master = self,
             width = 13,
             helpText = "currently mounted cartridge (from MCP and guider)",
@@ -217,7 +219,7 @@ class MiscWdg (Tkinter.Frame):
         )
         gr.gridWdg("Cartridge", self.cartridgeIDWdg)
 
-        self.plateIDWdg = RO.Wdg.IntLabel(
+        self.plateIDWdg = TUI.Base.Wdg.IntLabel(
             master = self,
             width = 8,
             helpText = "currently mounted plug plate (from the guider)",
@@ -225,7 +227,7 @@ class MiscWdg (Tkinter.Frame):
         )
         gr.gridWdg("Plate", self.plateIDWdg)
 
-        self.platePointingWdg = RO.Wdg.StrLabel(
+        self.platePointingWdg = TUI.Base.Wdg.StrLabel(
             master = self,
             width = 8,
             helpText = "plug-plate pointing (from the guider)",
@@ -234,7 +236,7 @@ class MiscWdg (Tkinter.Frame):
         gr.gridWdg("Pointing", self.platePointingWdg)
 
         # state of guiding
-        self.guideWdg = RO.Wdg.StrLabel(
+        self.guideWdg = TUI.Base.Wdg.StrLabel(
             master = self,
             anchor = "e",
             helpText = "State of guiding",
@@ -251,10 +253,13 @@ class MiscWdg (Tkinter.Frame):
         gr.allGridded()
         
         # add callbacks
-        self.tccModel.axePos.addCallback(self._setAxePos)
-        self.guiderModel.cartridgeLoaded.addCallback(self.setCartridgeInfo)
-        self.mcpModel.instrumentNum.addCallback(self.setCartridgeInfo)
-        self.plateDBModel.pointingInfo.addCallback(self._setAxePos)
+        self._cartridgeKeyVars = (self.guiderModel.cartridgeLoaded, self.mcpModel.instrumentNum)
+        self.keyVarGroup = TUI.Base.KeyVarGroup.KeyVarGroup(
+            master = self,
+            keyVarList = self._cartridgeKeyVars + (self.tccModel.axePos, self.plateDBModel.pointingInfo),
+            callFunc = self._updCartridgeAndAxePos,
+            callNow = True,
+        )
         self.guiderModel.guideState.addCallback(self._guideStateCallback)
         
         # start clock updates       
@@ -313,6 +318,19 @@ class MiscWdg (Tkinter.Frame):
             deltaHA = (ha - designHA)
         self.deltaHAWdg.set(deltaHA, isCurrent=axePosIsCurrent and plateInfoIsCurrent)
 
+    def _updCartridgeAndAxePos(self, changedKeyVars):
+        """Update cartridge info (if changed) and the data based on axePos
+
+        Inputs:
+        - changedKeyVars: keyVars that have changed
+        """
+        cartridgeIDSet = set(id(keyVar) for keyVar in self._cartridgeKeyVars)
+        if any(id(keyVar) in cartridgeIDSet for keyVar in changedKeyVars):
+            # this also calls _setAxePos
+            self.setCartridgeInfo()
+        else:
+            self._setAxePos()
+
     def setCartridgeInfo(self, keyVar=None):
         """Set cartridge info based on guider and MCP.
         """
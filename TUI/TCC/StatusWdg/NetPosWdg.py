@@ -25,6 +25,7 @@ import RO.CnvUtil
 import RO.CoordSys
 import RO.StringUtil
 import RO.Wdg
+import TUI.Base.Wdg
 import TUI.Models
 
 _HelpURL = "Telescope/StatusWin.html#NetPos"
@@ -67,7 +68,7 @@ class NetPosWdg (Tkinter.Frame):
         gr = RO.Wdg.Gridder(self, sticky="w")
 
         # object name
-        self.objNameWdg = RO.Wdg.StrLabel(
+        self.objNameWdg = TUI.Base.Wdg.StrLabel(
             master = self,
             width = 25,
             anchor = "w",
@@ -84,7 +85,7 @@ class NetPosWdg (Tkinter.Frame):
         # object net position
         self.netPos1Wdg = gr.gridWdg(
             label = "",
-            dataWdg = RO.Wdg.DMSLabel(
+            dataWdg = TUI.Base.Wdg.DMSLabel(
                 master = self,
                 precision = 2,
                 width = 13,
@@ -96,7 +97,7 @@ class NetPosWdg (Tkinter.Frame):
 
         self.netPos2Wdg = gr.gridWdg (
             label = "",
-            dataWdg = RO.Wdg.DMSLabel(
+            dataWdg = TUI.Base.Wdg.DMSLabel(
                 master = self,
                 precision = 2,
                 width = 13,
@@ -109,7 +110,7 @@ class NetPosWdg (Tkinter.Frame):
             cnvFunc=RO.CnvUtil.posFromPVT)
 
         # coordinate system
-        self.csysWdg = RO.Wdg.StrLabel(
+        self.csysWdg = TUI.Base.Wdg.StrLabel(
             master = self,
             width = 13,
             anchor = "w",
@@ -125,7 +126,7 @@ class NetPosWdg (Tkinter.Frame):
 
         # rotation angle and type
         rotFrame = Tkinter.Frame(self)
-        self.rotPosWdg = RO.Wdg.FloatLabel(
+        self.rotPosWdg = TUI.Base.Wdg.FloatLabel(
             master = rotFrame,
             precision = 2,
             width = 8,
@@ -135,7 +136,7 @@ class NetPosWdg (Tkinter.Frame):
         self.rotPosWdg.pack(side="left")
         rotUnitsLabel = Tkinter.Label(rotFrame, text=RO.StringUtil.DegStr)
         rotUnitsLabel.pack(side="left")
-        self.rotTypeWdg = RO.Wdg.StrLabel(
+        self.rotTypeWdg = TUI.Base.Wdg.StrLabel(
             master = rotFrame,
             width = 8,
             anchor = "w",
@@ -32,6 +32,7 @@ import RO.CnvUtil
 import RO.CoordSys
 import RO.StringUtil
 import RO.Wdg
+import TUI.Base.Wdg
 import TUI.Models
 
 _HelpURL = "Telescope/StatusWin.html#Offsets"
@@ -57,7 +58,7 @@ class OffsetWdg (Tkinter.Frame):
         # object offset (tcc arc offset)
         self.objLabelSet = []
         self.objOffWdgSet = [   # arc offset position
-            RO.Wdg.DMSLabel(
+            TUI.Base.Wdg.DMSLabel(
                 master = self,
                 precision = 1,
                 width = _DataWidth,
@@ -78,7 +79,7 @@ class OffsetWdg (Tkinter.Frame):
         # sky offset
         gr.startNewCol()
         self.objXYOffWdgSet = [
-            RO.Wdg.DMSLabel(
+            TUI.Base.Wdg.DMSLabel(
                 master = self,
                 precision = 1,
                 width = _DataWidth,
@@ -99,7 +100,7 @@ class OffsetWdg (Tkinter.Frame):
         gr.gridWdg("Bore")
         gr.startNewCol()
         self.boreWdgSet = [
-            RO.Wdg.DMSLabel(
+            TUI.Base.Wdg.DMSLabel(
                 master = self,
                 precision = 1,
                 width = _DataWidth,
@@ -17,19 +17,37 @@ History:
 2015-11-03 ROwen    Replace "== None" with "is None" and "!= None" with "is not None" to modernize the code.
 """
 import sys
+import time
+import numpy
 import RO.AddCallback
 import RO.SeqUtil
 import RO.StringUtil
 import RO.Astro.Cnv
 import RO.Astro.Sph
+import RO.Astro.Tm
 import RO.CoordSys
 import RO.MathUtil
+import RO.PhysConst
 import RO.TkUtil
 from . import TelConst
 
 # default color for displaying catalog objects
 _DefColor = 'black'
 
+# maximum age (sec) of a cached conversion from mean positions to topocentric;
+# the sky turns 15"/sec, which is negligible at the resolution of the sky display
+_CnvMaxAge = 2.0
+
+# distance (au) at which to place the basis vectors used to compute a conversion;
+# far enough that the offset of the observer from the solar system barycenter is negligible
+_BasisDistAU = RO.PhysConst.AUPerParsec / 1.0e-7
+
+# constants used to convert proper motion, parallax and radial velocity to space motion
+# (these match RO.Astro.Sph.ccFromSCPV)
+_MinParallax = 1.0e-7  # arcsec
+_RadPerYear_per_ASPerCy = RO.PhysConst.RadPerDeg / (RO.PhysConst.ArcSecPerDeg * 100.0)
+_AUPerYear_per_KMPerSec = RO.PhysConst.SecPerDay * RO.PhysConst.DayPerYear / RO.PhysConst.KmPerAU
+
 class TelTarget(object):
     """A potential target position for the telescope.
     It is primarily used to display that position on an az/alt display.
@@ -46,6 +64,38 @@ class TelTarget(object):
     def __init__(self, valueDict=None):
         self.setValueDict(valueDict)
 
+    @classmethod
+    def fromParsedData(cls, valueDict, csysConst, posDeg, dateFloat, pm, parlax, radVel):
+        """Create a TelTarget from already-parsed data, skipping string parsing.
+
+        Inputs:
+        - valueDict: value dictionary (as for setValueDict); it must include CSys
+        - csysConst: RO.CoordSys constant for the approximate coordinate system
+            (i.e. Topocentric for Observed, Physical and Mount)
+        - posDeg: position (deg)
+        - dateFloat: date as a float, or None
+        - pm: proper motion (a pair of floats)
+        - parlax: parallax (arcsec)
+        - radVel: radial velocity (km/sec)
+
+        The numeric data must match valueDict; this is intended for
+        restoring a TelTarget that was previously created with setValueDict.
+        """
+        self = cls.__new__(cls)
+        self.valueDict = valueDict
+        self.name = valueDict.get("Name")
+        self.posStr = valueDict.get("ObjPos")
+        self.dateFloat = dateFloat
+        self.dateStr = valueDict.get("Date") or ""
+        self.csysStr = valueDict.get("CSys")
+        self.approxCSys = csysConst.name()
+        self.csysConst = csysConst
+        self.posDeg = posDeg
+        self.pm = pm
+        self.parlax = parlax
+        self.radVel = radVel
+        return self
+
     def getAzAlt(self):
         """Returns the current (az, alt) of the object, in degrees"""
         if self.csysConst is None:
@@ -158,6 +208,172 @@ class TelTarget(object):
             csysStr = "=".join((csysStr, self.dateStr))
         return "%r %s, %s %s" % (self.name, self.posStr[0], self.posStr[1], csysStr)
 
+# dict of cached conversions: key=(coordsys name, date); value=(time computed, (matrix, offset))
+_CnvCache = {}
+
+def _getCnv(csysName, date):
+    """Return a linear conversion of unit vectors in a given coordinate system and date
+    to topocentric direction vectors at the current time.
+    
+    Returns (cnvMat, cnvOff): topocentric direction = numpy.dot(cnvMat, p) + cnvOff,
+    where p is a cartesian unit vector. The result is not normalized.
+    
+    The conversion is computed by converting +/- each basis vector with RO.Astro.Cnv.coordConv:
+    the normalized half-difference is the rotation and the mean half-sum is the shift due to
+    annual and diurnal aberration. The result matches coordConv to within several arcseconds,
+    far finer than the resolution of the sky display.
+    Conversions are cached for _CnvMaxAge seconds so catalogs drawn together share them.
+    
+    Inputs:
+    - csysName: name of coordinate system
+    - date: date of coordinate system, or None for the default
+    """
+    key = (csysName, date)
+    currTime = time.time()
+    cnvTime, cnvData = _CnvCache.get(key, (None, None))
+    if cnvTime is not None and currTime - cnvTime < _CnvMaxAge:
+        return cnvData
+
+    cnvMat = numpy.zeros((3, 3), dtype=float)
+    cnvOff = numpy.zeros(3, dtype=float)
+    for ind in range(3):
+        toPList = []
+        for sign in (1.0, -1.0):
+            fromP = numpy.zeros(3, dtype=float)
+            fromP[ind] = sign * _BasisDistAU
+            toP, toV = RO.Astro.Cnv.coordConv(
+                fromP, (0.0, 0.0, 0.0),
+                csysName, date,
+                TelTarget.TopoConst.name(), None,
+                TelTarget.ObsData,
+            )
+            toPList.append(numpy.asarray(toP, dtype=float) / _BasisDistAU)
+        halfDiff = (toPList[0] - toPList[1]) * 0.5
+        cnvMat[:, ind] = halfDiff / numpy.sqrt(numpy.dot(halfDiff, halfDiff))
+        cnvOff += (toPList[0] + toPList[1]) * (0.5 / 3.0)
+    cnvData = (cnvMat, cnvOff)
+    _CnvCache[key] = (currTime, cnvData)
+    return cnvData
+
+class _CSysGroup(object):
+    """Positions of catalog objects that share one coordinate system and date.
+    
+    Inputs:
+    - csysConst: coordinate system constant (as returned by RO.CoordSys.getSysConst)
+    - date: date of coordinate system, or None for the default
+    - objIndList: index (in the catalog object list) of each object
+    - objList: the objects (TelTarget objects), in the same order as objIndList
+    
+    Positions are stored as cartesian unit vectors and space motion as unit vectors per year,
+    computed the same way as RO.Astro.Sph.ccFromSCPV (but divided by the object's distance).
+    """
+    def __init__(self, csysConst, date, objIndList, objList):
+        self.csysName = csysConst.name()
+        self.date = date
+        self.indArr = numpy.array(objIndList, dtype=int)
+
+        posArr = numpy.radians(numpy.array([obj.posDeg for obj in objList], dtype=float))
+        pmArr = numpy.array([obj.pm for obj in objList], dtype=float)
+        parlaxArr = numpy.array([obj.parlax for obj in objList], dtype=float)
+        radVelArr = numpy.array([obj.radVel for obj in objList], dtype=float)
+
+        sinP0 = numpy.sin(posArr[:, 0])
+        cosP0 = numpy.cos(posArr[:, 0])
+        sinP1 = numpy.sin(posArr[:, 1])
+        cosP1 = numpy.cos(posArr[:, 1])
+        self.posArr = numpy.column_stack((cosP1 * cosP0, cosP1 * sinP0, sinP1))
+
+        # space motion is only meaningful for mean coordinate systems;
+        # coordConv ignores it for apparent coordinate systems
+        self.epoch = None
+        self.velArr = None
+        if not csysConst.isMean() or not csysConst.dateIsYears():
+            return
+        if date is not None:
+            self.epoch = date
+        else:
+            self.epoch = csysConst.defaultDate()
+        if self.epoch is None or (not numpy.any(pmArr) and not numpy.any(radVelArr)):
+            self.epoch = None
+            return
+
+        atInf = parlaxArr < _MinParallax
+        parlaxArr = numpy.where(atInf, _MinParallax, parlaxArr)
+        radVelArr = numpy.where(atInf, 0.0, radVelArr)
+        # radial velocity in radians/year = (au/year) / distance (au)
+        radVelRadPerYr = radVelArr * _AUPerYear_per_KMPerSec * parlaxArr / RO.PhysConst.AUPerParsec
+        pmRadPerYr = pmArr * _RadPerYear_per_ASPerCy
+        self.velArr = numpy.column_stack((
+            - pmRadPerYr[:, 0]*cosP1*sinP0 - pmRadPerYr[:, 1]*sinP1*cosP0 + radVelRadPerYr*cosP1*cosP0,
+              pmRadPerYr[:, 0]*cosP1*cosP0 - pmRadPerYr[:, 1]*sinP1*sinP0 + radVelRadPerYr*cosP1*sinP0,
+                                             pmRadPerYr[:, 1]*cosP1       + radVelRadPerYr*sinP1,
+        ))
+
+    def getTopoArr(self, currEpoch):
+        """Return topocentric cartesian positions as an N x 3 array.
+        
+        Inputs:
+        - currEpoch: current date as a Julian epoch; used to apply space motion
+        """
+        posArr = self.posArr
+        if self.velArr is not None:
+            posArr = posArr + (self.velArr * (currEpoch - self.epoch))
+        cnvMat, cnvOff = _getCnv(self.csysName, self.date)
+        return numpy.dot(posArr, cnvMat.T) + cnvOff
+
+class CatalogPositions(object):
+    """Mean positions of a list of catalog objects stored as numeric arrays,
+    so the az/alt of every object can be computed at once.
+    
+    Objects are grouped by coordinate system and date; each group is converted
+    with a single matrix product, and the conversion is shared with any other catalog
+    drawn at the same time.
+    Objects that are not TelTarget objects (e.g. fixed az/alt markers)
+    are handled by calling their getAzAlt method.
+    
+    Inputs:
+    - objList: a sequence of TelTarget objects (or other objects with a getAzAlt method)
+    """
+    def __init__(self, objList):
+        self.nObj = len(objList)
+        self.otherIndList = []
+        self.otherObjList = []
+        groupDict = {} # key=(coordsys name, date); value=(csys const, list of obj index, list of obj)
+        for ind, obj in enumerate(objList):
+            if not isinstance(obj, TelTarget):
+                self.otherIndList.append(ind)
+                self.otherObjList.append(obj)
+                continue
+            if obj.csysConst is None:
+                continue
+            key = (obj.csysConst.name(), obj.dateFloat)
+            groupData = groupDict.setdefault(key, (obj.csysConst, [], []))
+            groupData[1].append(ind)
+            groupData[2].append(obj)
+
+        self.groupList = [_CSysGroup(csysConst, key[1], indList, grObjList) \
+            for key, (csysConst, indList, grObjList) in groupDict.items()]
+
+    def getAzAlt(self):
+        """Return the current az/alt (deg) of each object as an N x 2 array;
+        the az/alt of objects whose position is unknown is NaN.
+        """
+        azAltArr = numpy.empty((self.nObj, 2), dtype=float)
+        azAltArr.fill(numpy.nan)
+        if self.groupList:
+            currEpoch = RO.Astro.Tm.epJFromMJD(RO.Astro.Tm.utcFromPySec())
+            for group in self.groupList:
+                topoArr = group.getTopoArr(currEpoch)
+                azAltArr[group.indArr, 0] = numpy.degrees(numpy.arctan2(topoArr[:, 1], topoArr[:, 0]))
+                azAltArr[group.indArr, 1] = numpy.degrees(numpy.arctan2(
+                    topoArr[:, 2], numpy.hypot(topoArr[:, 0], topoArr[:, 1])))
+
+        for ind, obj in zip(self.otherIndList, self.otherObjList):
+            azAlt = obj.getAzAlt()
+            if azAlt is not None:
+                azAltArr[ind] = azAlt[0:2]
+        return azAltArr
+
 class Catalog(RO.AddCallback.BaseMixin):
     """A catalog of TelTarget objects.
     
@@ -186,6 +402,7 @@ class Catalog(RO.AddCallback.BaseMixin):
         if not RO.SeqUtil.isSequence(objList):
             raise RuntimeError("objList=%r; must be a sequence" % objList)
         self.objList = objList
+        self._positions = None
 
         self.setDoDisplay(doDisplay)
         self.setDispColor(dispColor)
@@ -210,6 +427,15 @@ class Catalog(RO.AddCallback.BaseMixin):
         """
         return self.objList
 
+    def getPositions(self):
+        """Return a CatalogPositions object for the object list.
+        
+        It is computed when first requested and then cached.
+        """
+        if self._positions is None:
+            self._positions = CatalogPositions(self.objList)
+        return self._positions
+
     def setDispColor(self, color=None):
         """Set the color with which to display objects on a sky grid.
         If None, uses default color.
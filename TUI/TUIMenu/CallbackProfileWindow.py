@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""Callback Profile window: show the time taken by keyVar callbacks.
+
+Use this window to start, stop and reset TUI.Base.CallbackProfiler
+and to see the data it has recorded, sorted as you like.
+Also shows how many label updates were skipped because nothing changed
+(see TUI.Base.Wdg.Label).
+"""
+import Tkinter
+import RO.TkUtil
+import RO.Wdg
+import TUI.Base.CallbackProfiler
+import TUI.Base.Wdg
+import TUI.Version
+
+WindowName = "%s.Callback Profile" % (TUI.Version.ApplicationName,)
+
+# interval between updates of the display while profiling (sec)
+_UpdateInterval = 2.0
+
+# dict of sort menu item: TUI.Base.CallbackProfiler sort key
+_SortNameDict = {
+    "Total Time": "totalTime",
+    "Max Time": "maxTime",
+    "Mean Time": "meanTime",
+    "Calls": "numCalls",
+    "Keyword": "keyword",
+    "Owner": "owner",
+}
+_SortNames = ("Total Time", "Max Time", "Mean Time", "Calls", "Keyword", "Owner")
+
+def addWindow(tlSet):
+    tlSet.createToplevel(
+        name = WindowName,
+        defGeom = "700x400+30+30",
+        visible = False,
+        resizable = True,
+        wdgFunc = CallbackProfileWdg,
+    )
+
+class CallbackProfileWdg(Tkinter.Frame):
+    """Show data from TUI.Base.CallbackProfiler
+
+    Inputs:
+    - master: parent widget
+    - other keyword arguments are used for the frame
+    """
+    def __init__(self, master=None, **kargs):
+        Tkinter.Frame.__init__(self, master, **kargs)
+        self.updateTimer = RO.TkUtil.Timer()
+
+        ctrlFrame = Tkinter.Frame(self)
+        self.startStopWdg = RO.Wdg.Button(
+            master = ctrlFrame,
+            text = "Start",
+            callFunc = self._doStartStop,
+            helpText = "Start or stop timing keyVar callbacks",
+        )
+        self.startStopWdg.pack(side="left")
+        self.resetWdg = RO.Wdg.Button(
+            master = ctrlFrame,
+            text = "Reset",
+            callFunc = self._doReset,
+            helpText = "Discard the data recorded so far (including label update counts)",
+        )
+        self.resetWdg.pack(side="left")
+        RO.Wdg.StrLabel(master = ctrlFrame, text = " Sort by").pack(side="left")
+        self.sortWdg = RO.Wdg.OptionMenu(
+            master = ctrlFrame,
+            items = _SortNames,
+            defValue = _SortNames[0],
+            callFunc = self._doSort,
+            helpText = "How to sort the callbacks",
+        )
+        self.sortWdg.pack(side="left")
+        ctrlFrame.grid(row=0, column=0, columnspan=2, sticky="w")
+
+        self.yscroll = Tkinter.Scrollbar(
+            master = self,
+            orient = "vertical",
+        )
+        self.text = Tkinter.Text(
+            master = self,
+            yscrollcommand = self.yscroll.set,
+            wrap = "none",
+            height = 20,
+            width = 90,
+        )
+        self.yscroll.configure(command=self.text.yview)
+        self.text.grid(row=1, column=0, sticky="nsew")
+        self.yscroll.grid(row=1, column=1, sticky="ns")
+        RO.Wdg.Bindings.makeReadOnly(self.text)
+
+        self.rowconfigure(1, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.bind("<Map>", self._doMap)
+        self.updDisplay()
+
+    def updDisplay(self):
+        """Display current data, and schedule the next update if profiling
+        """
+        self.updateTimer.cancel()
+        isRunning = TUI.Base.CallbackProfiler.isRunning()
+        self.startStopWdg["text"] = "Stop" if isRunning else "Start"
+
+        sortBy = _SortNameDict[self.sortWdg.getString()]
+        reportStr = TUI.Base.CallbackProfiler.getReport(sortBy=sortBy)
+        numSet, numSkipped = TUI.Base.Wdg.getLabelUpdateCounts()
+        reportStr = "Label updates: %d; skipped (unchanged): %d\n\n%s" % (numSet, numSkipped, reportStr)
+        yview = self.text.yview()
+        self.text.delete("1.0", "end")
+        self.text.insert("end", reportStr)
+        self.text.yview_moveto(yview[0])
+
+        if isRunning and self.winfo_ismapped():
+            self.updateTimer.start(_UpdateInterval, self.updDisplay)
+
+    def _doMap(self, evt=None):
+        """Window shown; update the display
+        """
+        self.updDisplay()
+
+    def _doReset(self, wdg=None):
+        TUI.Base.CallbackProfiler.reset()
+        TUI.Base.Wdg.resetLabelUpdateCounts()
+        self.updDisplay()
+
+    def _doSort(self, wdg=None):
+        self.updDisplay()
+
+    def _doStartStop(self, wdg=None):
+        if TUI.Base.CallbackProfiler.isRunning():
+            TUI.Base.CallbackProfiler.stop()
+        else:
+            TUI.Base.CallbackProfiler.start()
+        self.updDisplay()
+
+
+if __name__ == "__main__":
+    import TUI.Models.TUIModel
+    tuiModel = TUI.Models.TUIModel.Model(True)
+    addWindow(tuiModel.tlSet)
+    tuiModel.tlSet.makeVisible(WindowName)
+    tuiModel.reactor.run()
@@ -24,6 +24,7 @@ import time
 import Tkinter
 import opscore.utility.timer
 import RO.Wdg
+import TUI.Base.IdleCaller
 import TUI.Models
 import TUI.Version
 
@@ -169,6 +170,8 @@ class UsersWdg(Tkinter.Frame):
         self.userDict = dict()
         
         self.updateTimer = opscore.utility.timer.Timer()
+        # update when idle, to handle bursts of data efficiently
+        self._updDisplayCaller = TUI.Base.IdleCaller.IdleCaller(self, self.updDisplay)
                 
         self.yscroll = Tkinter.Scrollbar (
             master = self,
@@ -209,6 +212,7 @@ class UsersWdg(Tkinter.Frame):
         """Display current data.
         """
         self.updateTimer.cancel()
+        self._updDisplayCaller.cancel()
         
         myCmdr = self.tuiModel.getCmdr()
         maxDisplayTime = time.time() - self._retainSec
@@ -282,7 +286,7 @@ class UsersWdg(Tkinter.Frame):
             if userObj.isConnected:
                 userObj.setDisconnected()
 
-        self.updDisplay()
+        self._updDisplayCaller.schedule()
 
 
 if __name__ == "__main__":
@@ -56,6 +56,37 @@ def getAddPaths(ifExists=True):
 
     return addPathList
 
+def getCatalogCacheDir():
+    """Return the directory in which to cache parsed object catalogs.
+    
+    The directory may not exist.
+    """
+    prefsDir = RO.OS.getPrefsDirs(inclNone=True)[0]
+    if prefsDir is None:
+        raise RuntimeError("Cannot determine prefs dir")
+    cacheName = "%s%sCatalogCache" % (RO.OS.getPrefsPrefix(), TUI.Version.ApplicationName)
+    return os.path.join(prefsDir, cacheName)
+
+def getScriptCacheDir():
+    """Return the directory in which to cache compiled scripts.
+    
+    The directory may not exist.
+    """
+    prefsDir = RO.OS.getPrefsDirs(inclNone=True)[0]
+    if prefsDir is None:
+        raise RuntimeError("Cannot determine prefs dir")
+    cacheName = "%s%sScriptCache" % (RO.OS.getPrefsPrefix(), TUI.Version.ApplicationName)
+    return os.path.join(prefsDir, cacheName)
+
+def getWindowModuleCacheFile():
+    """Return the path of the file in which to cache the list of window modules in additions directories.
+    """
+    prefsDir = RO.OS.getPrefsDirs(inclNone=True)[0]
+    if prefsDir is None:
+        raise RuntimeError("Cannot determine prefs dir")
+    cacheName = "%s%sWindowModuleCache" % (RO.OS.getPrefsPrefix(), TUI.Version.ApplicationName)
+    return os.path.join(prefsDir, cacheName)
+
 def getGeomFile():
     geomDir = RO.OS.getPrefsDirs(inclNone=True)[0]
     if geomDir is None:
@@ -84,5 +115,8 @@ def getResourceDir(*args):
 if __name__ == "__main__":
     print("TUI Prefs =", getPrefsFile())
     print("TUI Geom = ", getGeomFile())
+    print("TUI Catalog Cache =", getCatalogCacheDir())
+    print("TUI Script Cache =", getScriptCacheDir())
+    print("TUI Window Module Cache =", getWindowModuleCacheFile())
     print("TUI Additions =", getAddPaths())
     print("TUI Sounds =", getResourceDir("Sounds"))
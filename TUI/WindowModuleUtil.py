@@ -9,11 +9,27 @@
                     Modified to run paths through normpath to make the code more robust.
 2015-11-05 ROwen    Modernized "except" syntax.
 """
+import json
 import os
 import sys
+import threading
+import time
 import traceback
 import RO.Constants
 import RO.OS
+import RO.StringUtil
+import TUI.StartupProfiler
+import TUI.TUIPaths
+
+# number of threads used to prefetch window module files
+_NumPrefetchThreads = 4
+
+# increment if the format of the window module cache file changes
+_CacheVersion = 1
+
+# directories modified more recently than this (sec) are not cached,
+# in case they change again within the resolution of the file system's modification time
+_MinMTimeAge = 2.0
 
 def findWindowsModules(
     path,
@@ -30,7 +46,7 @@ def findWindowsModules(
     - There are no missing __init__.py files in the directory hierarchy.
     - The the path is on the python path.
     
-    Warning: temporarily changes the current working directory.
+    Does not change the current working directory, so is safe to call from a background thread.
     
     Inputs:
     - path      root of path to search
@@ -38,14 +54,35 @@ def findWindowsModules(
                 should be included as part of the name of any module loaded.
     - loadFirst name of subdir to load first;
     """
-    try:
-        currDir = os.getcwd()
-        os.chdir(path)
-        windowModulePathList = RO.OS.findFiles(os.curdir, "*Window.py")
-    finally:
-        os.chdir(currDir)
-    windowModulePathList = [os.path.normpath(wmPath) for wmPath in windowModulePathList]
+    windowModulePathList = _findWindowsModulePaths(path)[0]
+    for moduleName in _getModuleNames(path, windowModulePathList, isPackage=isPackage, loadFirst=loadFirst):
+        yield moduleName
+
+def _findWindowsModulePaths(path):
+    """Find window module files in a given path.
+
+    Returns:
+    - a list of paths to window modules, relative to path
+    - a dict of relative directory path: modification time for each directory searched
+    
+    Raise RuntimeError if path is not a directory.
+    """
+    if not os.path.isdir(path):
+        raise RuntimeError("%r is not a directory" % (path,))
+    windowModulePathList = []
+    dirMTimeDict = {}
+    for dirPath, dirNames, fileNames in os.walk(path):
+        relDirPath = os.path.normpath(os.path.relpath(dirPath, path))
+        dirMTimeDict[relDirPath] = os.stat(dirPath).st_mtime
+        for fileName in fileNames:
+            if fileName.endswith("Window.py"):
+                windowModulePathList.append(os.path.normpath(os.path.join(relDirPath, fileName)))
+    windowModulePathList.sort()
+    return windowModulePathList, dirMTimeDict
 
+def _getModuleNames(path, windowModulePathList, isPackage, loadFirst):
+    """Return a list of window module names given a list of window module paths relative to path
+    """
     if loadFirst and windowModulePathList:
         # rearrange so modules in specified subdir come first
         # use decorate/sort/undecorate pattern
@@ -53,6 +90,7 @@ def findWindowsModules(
         decList.sort()
         windowModulePathList = list(zip(*decList))[1]
 
+    moduleNameList = []
     for windowModulePath in windowModulePathList:
         # generate the module name:
         # <rootmodulename>.subdir1.subdir2...lastsubdir.<modulename>
@@ -65,7 +103,152 @@ def findWindowsModules(
             pkgName = os.path.basename(path)
             pathList.insert(0, pkgName)
         moduleName = ".".join(pathList)
-        yield moduleName
+        moduleNameList.append(moduleName)
+    return moduleNameList
+
+
+class WindowModuleFinder(object):
+    """Find window modules in a set of paths using a background thread.
+
+    Finding window modules in large additions directories on slow storage can be slow,
+    so this starts the search as soon as it is constructed, allowing other work to proceed.
+    The list of window module files in each path is cached between runs (see TUIPaths.getWindowModuleCacheFile)
+    and is reused if no directory in the path has been modified.
+    Once the window modules are found, their source and compiled files are read
+    by several threads, so that importing them (which must be done in the Tk thread) is faster.
+
+    Inputs:
+    - pathList: paths to search
+    - isPackage, loadFirst: see findWindowsModules
+    """
+    def __init__(self,
+        pathList,
+        isPackage = False,
+        loadFirst = None,
+    ):
+        self.pathList = [os.path.abspath(path) for path in pathList]
+        self.isPackage = bool(isPackage)
+        self.loadFirst = loadFirst
+        self._pathDict = {} # dict of abs path: list of window module paths relative to path
+        self._errDict = {} # dict of abs path: error message
+        self._foundEvent = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="WindowModuleFinder")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def getModuleNames(self, path):
+        """Return a list of the names of the window modules in path; wait for the search to finish, if necessary.
+
+        Raise RuntimeError if the path was not searched or could not be searched.
+        """
+        self._foundEvent.wait()
+        absPath = os.path.abspath(path)
+        errMsg = self._errDict.get(absPath)
+        if errMsg:
+            raise RuntimeError("Could not search %r for window modules: %s" % (path, errMsg))
+        windowModulePathList = self._pathDict.get(absPath)
+        if windowModulePathList is None:
+            raise RuntimeError("Path %r was not searched for window modules" % (path,))
+        return _getModuleNames(absPath, windowModulePathList, isPackage=self.isPackage, loadFirst=self.loadFirst)
+
+    def _run(self):
+        """Find window modules, then prefetch their files; runs in a background thread
+        """
+        try:
+            cacheDict = self._readCache()
+            newCacheDict = {}
+            for path in self.pathList:
+                try:
+                    cachedData = cacheDict.get(path)
+                    if cachedData and self._cacheIsCurrent(path, cachedData["dirMTimeDict"]):
+                        windowModulePathList = cachedData["windowModulePathList"]
+                        dirMTimeDict = cachedData["dirMTimeDict"]
+                    else:
+                        windowModulePathList, dirMTimeDict = _findWindowsModulePaths(path)
+                    self._pathDict[path] = windowModulePathList
+                    newCacheDict[path] = dict(
+                        windowModulePathList = windowModulePathList,
+                        dirMTimeDict = dirMTimeDict,
+                    )
+                except Exception as e:
+                    self._errDict[path] = RO.StringUtil.strFromException(e)
+        finally:
+            self._foundEvent.set()
+
+        if newCacheDict != cacheDict:
+            self._writeCache(newCacheDict)
+        self._prefetch()
+
+    def _cacheIsCurrent(self, path, dirMTimeDict):
+        """Return True if no directory in a cached search of path has been modified
+        """
+        for relDirPath, mtime in dirMTimeDict.items():
+            try:
+                if os.stat(os.path.join(path, relDirPath)).st_mtime != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _readCache(self):
+        """Read the window module cache file; return an empty dict if unavailable
+        """
+        try:
+            cacheFile = TUI.TUIPaths.getWindowModuleCacheFile()
+            if not os.path.isfile(cacheFile):
+                return {}
+            with open(cacheFile, "r") as fp:
+                cacheData = json.load(fp)
+            if cacheData.get("version") != _CacheVersion:
+                return {}
+            return cacheData["pathDict"]
+        except Exception:
+            return {}
+
+    def _writeCache(self, pathDict):
+        """Write the window module cache file, omitting any recently modified paths
+        """
+        minAge = time.time() - _MinMTimeAge
+        pathDict = dict((path, data) for path, data in pathDict.items()
+            if max(list(data["dirMTimeDict"].values()) + [0]) < minAge)
+        try:
+            cacheFile = TUI.TUIPaths.getWindowModuleCacheFile()
+            with open(cacheFile, "w") as fp:
+                json.dump(dict(version=_CacheVersion, pathDict=pathDict), fp)
+        except Exception as e:
+            sys.stderr.write("Could not write window module cache: %s\n" % (RO.StringUtil.strFromException(e),))
+
+    def _prefetch(self):
+        """Read the source and compiled files of all window modules, using several threads
+        """
+        filePathList = []
+        for path, windowModulePathList in self._pathDict.items():
+            for windowModulePath in windowModulePathList:
+                sourcePath = os.path.join(path, windowModulePath)
+                filePathList += [sourcePath, _getCompiledPath(sourcePath)]
+
+        def readFiles(filePathSubList):
+            for filePath in filePathSubList:
+                try:
+                    with open(filePath, "rb") as fp:
+                        fp.read()
+                except Exception:
+                    pass
+
+        threadList = [threading.Thread(target=readFiles, args=(filePathList[i::_NumPrefetchThreads],))
+            for i in range(_NumPrefetchThreads)]
+        for thread in threadList:
+            thread.daemon = True
+            thread.start()
+
+def _getCompiledPath(sourcePath):
+    """Return the path of the compiled file for a python source file
+    """
+    try:
+        import importlib.util
+        return importlib.util.cache_from_source(sourcePath)
+    except ImportError:
+        return sourcePath + "c"
 
 
 def loadWindows(
@@ -74,6 +257,7 @@ def loadWindows(
     isPackage = False,
     loadFirst = None,
     logFunc = None,
+    moduleNameList = None,
 ):
     """Automatically load all windows in any subdirectory of the path.
     The path is assumed to be on the python path (sys.path).
@@ -90,20 +274,25 @@ def loadWindows(
                 - the text to log
                 - severity (by name): one of the RO.Constant.sev constants,
                     defaulting to RO.Constants.sevNormal.
+    - moduleNameList names of window modules to load (e.g. from WindowModuleFinder.getModuleNames),
+                or None to search path
     
     Raises RuntimeError if loadFirst is specified and no modules are found.
     """
     if logFunc:
         logFunc("Searching for additions in %r" % (path,))
-    for moduleName in findWindowsModules(
-        path = path,
-        isPackage = isPackage,
-        loadFirst = loadFirst,
-    ):
+    if moduleNameList is None:
+        moduleNameList = findWindowsModules(
+            path = path,
+            isPackage = isPackage,
+            loadFirst = loadFirst,
+        )
+    for moduleName in moduleNameList:
         # import the module
         try:
-            module = __import__(moduleName, globals(), locals(), "addWindow")
-            module.addWindow(tlSet)
+            with TUI.StartupProfiler.timeTask("%s.addWindow" % (moduleName,)):
+                module = __import__(moduleName, globals(), locals(), "addWindow")
+                module.addWindow(tlSet)
             if logFunc:
                 logFunc("Added %r" % (moduleName,))
         except Exception as e:
@@ -1,49 +1,227 @@
 #!/usr/bin/env python
 """genLoadStdModules.py.
 
-Create the python module TUI.LoadStdModules
-and function loadAll()
-to load all of TUI's standard window modules.
+Create the python module TUI.StdWindowManifest:
+a manifest of TUI's standard window modules,
+which TUI.LoadStdModules.loadAll uses to load TUI's standard windows.
+
+For each window module the manifest records:
+- the module name
+- the name and default visibility of each window it adds
+- the heavy packages (e.g. numpy or matplotlib) it imports, directly or via other TUI modules
+- whether its windows are lazy (see TUI.Base.LazyToplevelSet), as specified by _LazyModuleNames;
+    loadAll registers lazy windows without importing their modules
 
 This speeds startup (over searching for modules
 at startup) and potentialy simplifies distribution
 as prebuilt packages by allowing TUI's python code
 to be run from a zip file.
 
-On the down side, one must remember to run this file
-and thus regenerate LoadStdModules whenever the list
-of TUI's standard windows modules changes.
+Run this file to regenerate the manifest whenever TUI's standard windows change
+(a window module is added, deleted or moved, or a window is renamed
+or has its default visibility changed).
+To check the manifest without changing it, run with --check;
+the exit status is nonzero if the manifest is out of date.
+releaseNewVersion.py runs this check, and loadAll reports modules listed in the manifest
+that are missing and windows that do not match the manifest.
+
+Window names and visibility are recorded by calling each module's addWindow function
+with a stand-in for the toplevel set, so this requires a display and all of TUI's
+dependencies. Heavy dependencies are found by examining import statements
+that run at import time; no extra modules are imported to find them.
 
 History:
 2005-08-01 ROwen
 2005-08-08 ROwen    Modified to use TUI.WindowModuleUtil
 2005-09-22 ROwen    Modified to not use TUI.TUIPaths.
 """
+import ast
+import importlib
 import os
+import sys
+import Tkinter
+import TUI.Models.TUIModel
 import TUI.WindowModuleUtil
 
+# window modules whose windows are lazy: built when first shown, instead of at startup.
+# Do not add a module whose windows must record data or play sounds while hidden,
+# e.g. strip charts (the guide monitors) or tables built from keyword history (APOGEE QuickLook).
+_LazyModuleNames = set((
+    "TUI.TUIMenu.AboutWindow",
+    "TUI.TUIMenu.CallbackProfileWindow",
+    "TUI.Inst.APOGEE.APOGEEWindow",
+    "TUI.Inst.Guide.FocusPlotWindow",
+    "TUI.Inst.SOP.SOPWindow",
+    "TUI.Misc.Interlocks.InterlocksWindow",
+    "TUI.Misc.MCP.MCPWindow",
+    "TUI.TCC.FiducialsWdg.FiducialsWindow",
+    "TUI.TCC.FocalPlaneWindow",
+    "TUI.TCC.FocusWindow",
+    "TUI.TCC.MirrorStatusWindow",
+    "TUI.TCC.NudgerWindow",
+    "TUI.TCC.SkyWindow",
+))
+
+# packages that are slow to import
+_HeavyPackageNames = set(("astropy", "matplotlib", "numpy", "PIL", "pyfits", "pygame", "scipy"))
+
+_ManifestHeader = '''"""Manifest of TUI's standard window modules.
+
+Generated by genLoadStdModules.py; do not edit.
+"""
+# one entry per window module, in load order:
+# (module name, ((window name, default visibility), ...), heavy dependencies, lazy)
+'''
+
 # get location to look for standard windows
 tuiPath = os.path.dirname(TUI.__file__)
+manifestPath = os.path.join(tuiPath, "StdWindowManifest.py")
 
-modNames = list(TUI.WindowModuleUtil.findWindowsModules(
-    path = tuiPath,
-    isPackage = True,
-    loadFirst="TUIMenu",
-))
-modFilePath = os.path.join(tuiPath, "LoadStdModules.py")
-modFile = file(modFilePath, "w")
-try:
-    modFile.write("import TUI.Models.TUIModel\n")
-    for modName in modNames:
-        modFile.write("import %s\n" % modName)
+class _RecordingToplevelSet(object):
+    """Stand-in for RO.Wdg.ToplevelSet that records the windows an addWindow function creates
+    """
+    def __init__(self):
+        self.windowList = [] # list of (window name, default visibility)
+
+    def createToplevel(self, name, master=None, defGeom="", defVisible=None, **kargs):
+        if defVisible is None:
+            defVisible = kargs.get("visible", True)
+        self.windowList.append((name, bool(defVisible)))
+
+    def getToplevel(self, name):
+        return None
 
-    modFile.write("""
-def loadAll():
-    tuiModel = TUI.Models.TUIModel.Model()
-    tlSet = tuiModel.tlSet
-""")
+def getWindowList(modName):
+    """Return a list of (window name, default visibility) for each window a window module adds
+    """
+    windowModule = importlib.import_module(modName)
+    recordingTLSet = _RecordingToplevelSet()
+    windowModule.addWindow(recordingTLSet)
+    if not recordingTLSet.windowList:
+        raise RuntimeError("%s.addWindow added no windows" % (modName,))
+    return recordingTLSet.windowList
+
+def getHeavyDeps(modName):
+    """Return a sorted list of the heavy packages a TUI module imports,
+    directly or via the TUI modules it imports, when it is imported
+    """
+    heavySet = set()
+    doneSet = set()
+    todoList = [modName]
+    while todoList:
+        currModName = todoList.pop()
+        if currModName in doneSet:
+            continue
+        doneSet.add(currModName)
+        modPath = _getTUIModulePath(currModName)
+        if not modPath:
+            continue
+        isPackage = os.path.basename(modPath) == "__init__.py"
+        for importName in _getImportNames(modPath, currModName, isPackage):
+            topName = importName.split(".")[0]
+            if topName in _HeavyPackageNames:
+                heavySet.add(topName)
+            elif topName == "TUI":
+                # include the parent packages, which are imported first
+                nameList = importName.split(".")
+                for i in range(2, len(nameList) + 1):
+                    todoList.append(".".join(nameList[0:i]))
+    return sorted(heavySet)
+
+def _getTUIModulePath(modName):
+    """Return the path to the source of a TUI module or package, or None if not found
+    """
+    basePath = os.path.join(tuiPath, *modName.split(".")[1:])
+    for modPath in (basePath + ".py", os.path.join(basePath, "__init__.py")):
+        if os.path.isfile(modPath):
+            return modPath
+    return None
+
+def _getImportNames(modPath, modName, isPackage):
+    """Return the full names of the modules (and possibly module attributes)
+    imported by a TUI module when it is imported.
+
+    Imports inside functions are ignored. Implicit relative imports are resolved
+    (by checking for a TUI module of that name), as are explicit relative imports.
+    """
+    with open(modPath, "rU") as modFile:
+        try:
+            tree = ast.parse(modFile.read(), modPath)
+        except SyntaxError as e:
+            sys.stderr.write("Cannot find imports in %s: %s\n" % (modPath, e))
+            return []
+    pkgName = modName if isPackage else modName.rsplit(".", 1)[0]
+
+    nameList = []
+    nodeList = list(tree.body)
+    while nodeList:
+        node = nodeList.pop()
+        if isinstance(node, (ast.FunctionDef, ast.Lambda)):
+            continue
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                nameList.append(_resolveName(alias.name, pkgName))
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                baseName = pkgName.rsplit(".", node.level - 1)[0] if node.level > 1 else pkgName
+                if node.module:
+                    baseName = "%s.%s" % (baseName, node.module)
+            else:
+                baseName = _resolveName(node.module, pkgName)
+            nameList.append(baseName)
+            for alias in node.names:
+                if alias.name != "*":
+                    nameList.append("%s.%s" % (baseName, alias.name))
+        else:
+            nodeList += list(ast.iter_child_nodes(node))
+    return nameList
+
+def _resolveName(importName, pkgName):
+    """Resolve an implicit relative import name to a full name
+    """
+    relName = "%s.%s" % (pkgName, importName)
+    if _getTUIModulePath(relName):
+        return relName
+    return importName
+
+def getManifestStr():
+    """Return the contents of TUI/StdWindowManifest.py for the current window modules
+    """
+    modNames = list(TUI.WindowModuleUtil.findWindowsModules(
+        path = tuiPath,
+        isPackage = True,
+        loadFirst="TUIMenu",
+    ))
+
+    # window modules require the TUI model (which requires a Tk root)
+    root = Tkinter.Tk()
+    root.withdraw()
+    TUI.Models.TUIModel.Model(True)
+
+    lineList = [_ManifestHeader + "WindowModuleList = ("]
     for modName in modNames:
-        modFile.write("    %s.addWindow(tlSet)\n" % modName)
-    
-finally:
-    modFile.close()
\ No newline at end of file
+        windowList = getWindowList(modName)
+        heavyDeps = getHeavyDeps(modName)
+        lineList.append("    (%r, %r, %r, %r)," % (
+            modName, tuple(windowList), tuple(heavyDeps), modName in _LazyModuleNames))
+    lineList.append(")\n")
+    return "\n".join(lineList)
+
+if __name__ == "__main__":
+    doCheck = "--check" in sys.argv[1:]
+    manifestStr = getManifestStr()
+    if os.path.isfile(manifestPath):
+        with open(manifestPath, "rU") as manifestFile:
+            oldManifestStr = manifestFile.read()
+    else:
+        oldManifestStr = None
+
+    if manifestStr == oldManifestStr:
+        print("%s is up to date" % (manifestPath,))
+    elif doCheck:
+        print("%s is out of date; run genLoadStdModules.py to regenerate it" % (manifestPath,))
+        sys.exit(1)
+    else:
+        with open(manifestPath, "w") as manifestFile:
+            manifestFile.write(manifestStr)
+        print("Wrote %s" % (manifestPath,))
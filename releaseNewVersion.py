@@ -44,6 +44,12 @@ with file(os.path.join("TUI", "Help", "VersionHistory.html")) as vhist:
                 print("Error: version in VersionHistory.html = %s != %s" % (histVersStr, fullVersStr))
                 sys.exit(0)
 
+print("Checking the standard window manifest")
+status = subprocess.call([sys.executable, "genLoadStdModules.py", "--check"])
+if status != 0:
+    print("Error: regenerate the standard window manifest and commit it")
+    sys.exit(1)
+
 print("Status of git repository:")
 subprocess.call(["git", "status"])
 
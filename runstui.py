@@ -11,6 +11,17 @@ History:
                     because execution was part of importing.
                     Fixed by first importing TUI.Main and then running the app.
 2007-01-23 ROwen    Changed #!/usr/local/bin/python to #!/usr/bin/env python
+
+To measure startup time, run with --profile-startup (see TUI.StartupProfiler).
 """
+import os
+import sys
+
+import TUI.StartupProfiler
+if TUI.StartupProfiler.ProfileFlag in sys.argv[1:]:
+    sys.argv.remove(TUI.StartupProfiler.ProfileFlag)
+    os.environ[TUI.StartupProfiler.ProfileEnvVar] = "1"
+TUI.StartupProfiler.start()
+
 import TUI.Main
 TUI.Main.runTUI()